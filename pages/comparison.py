@@ -1,8 +1,8 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from utils.data_manager import load_architecture_data, get_comparison_data
-from utils.metrics_analyzer import calculate_overall_scores, get_best_pattern_for_metrics, get_pattern_scores
+from utils.data_manager import load_architecture_data, get_comparison_data, get_metric_matrix
+from utils.metrics_analyzer import calculate_overall_scores, get_best_pattern_for_metrics
 from utils.visualization import (
     create_comparison_radar_chart, 
     create_bar_chart_comparison, 
@@ -20,6 +20,7 @@ def show():
     
     # Load comparison data as DataFrame
     comparison_df = get_comparison_data()
+    matrix = get_metric_matrix(arch_data)
     
     st.markdown("""
     This tool helps you compare different architecture patterns based on performance metrics. 
@@ -42,7 +43,7 @@ def show():
     st.subheader("Select Metrics to Compare")
     
     # Get all available metrics
-    metrics = list(arch_data[pattern_names[0]]["metrics"].keys())
+    metrics = matrix.metrics
     
     selected_metrics = st.multiselect(
         "Choose performance metrics:",
@@ -85,12 +86,12 @@ def show():
         st.plotly_chart(bar_fig)
         
         # Add explanation about the metric
-        if selected_metric in arch_data[pattern_names[0]]["metrics"]:
-            st.markdown(f"**{selected_metric}**: {arch_data[pattern_names[0]]['metrics'][selected_metric]['description']}")
-            st.markdown(f"Unit: {arch_data[pattern_names[0]]['metrics'][selected_metric]['unit']}")
+        if selected_metric in matrix.metric_index:
+            st.markdown(f"**{selected_metric}**: {matrix.descriptions[selected_metric]}")
+            st.markdown(f"Unit: {matrix.units[selected_metric]}")
             
             # Add note about interpretation
-            if selected_metric in ["Latency", "Resource Utilization"]:
+            if matrix.lower_is_better[matrix.metric_index[selected_metric]]:
                 st.markdown("**Note**: For this metric, lower values are better.")
             else:
                 st.markdown("**Note**: For this metric, higher values are better.")
@@ -114,7 +115,7 @@ def show():
         st.markdown("This heat map shows the normalized performance of each pattern across all metrics.")
         
         # Create heat map
-        heat_map_fig = create_heat_map(filtered_df)
+        heat_map_fig = create_heat_map(selected_patterns, arch_data=arch_data)
         st.plotly_chart(heat_map_fig)
         
         st.markdown("""
@@ -165,19 +166,9 @@ def show():
     # Comparison table
     st.subheader("Detailed Comparison Table")
     
-    # Create a detailed comparison table
-    table_metrics = []
-    for metric in selected_metrics:
-        metric_values = {}
-        metric_values["Metric"] = metric
-        
-        for pattern in selected_patterns:
-            metric_values[pattern] = get_pattern_scores(pattern, metric, arch_data)
-        
-        table_metrics.append(metric_values)
-    
-    # Convert to DataFrame
-    table_df = pd.DataFrame(table_metrics)
+    # Create a detailed comparison table, one row per metric
+    table_df = pd.DataFrame(matrix.select(selected_patterns, selected_metrics).T, columns=selected_patterns)
+    table_df.insert(0, "Metric", selected_metrics)
     
     # Display table
     st.dataframe(table_df, hide_index=True)
@@ -1,9 +1,322 @@
 import streamlit as st
 import pandas as pd
-import time
-from utils.data_manager import load_architecture_data, save_test_results
-from utils.test_runner import run_custom_test_plan, simulate_scaling_comparison
-from utils.visualization import create_radar_chart, create_before_after_chart
+import os
+from contextlib import nullcontext
+from utils.data_manager import load_architecture_data, save_test_results, save_test_results_batch, save_scalability_fit
+from utils.run_history import record_run, record_runs, scalar_summary
+from utils.job_runner import FINISHED_STATES, get_job_executor
+from utils.test_runner import (
+    run_custom_test_plan,
+    run_pattern_comparison,
+    simulate_scaling_comparison,
+    real_tests_enabled,
+    run_latency_test,
+    run_scalability_sweep,
+    run_adaptive_concurrency_test,
+    run_fault_tolerance_test,
+    run_capacity_search,
+    stream_throughput_test,
+    url_results_to_metrics,
+    rescale_local_target_metrics
+)
+from utils.metrics_analyzer import get_best_pattern_from_trials
+from utils.scalability_model import fit_usl, get_concurrency_model, predict_concurrency_throughput
+from utils.scenario import list_scenarios
+from utils.target_server import start_target_server
+from utils.resource_monitor import PROC_AVAILABLE, ProcessSampler, describe_saturation
+from utils.visualization import (
+    create_radar_chart,
+    create_before_after_chart,
+    create_live_throughput_chart,
+    create_usl_fit_chart,
+    create_capacity_curve_chart,
+    create_phase_breakdown_chart,
+    create_resource_usage_chart,
+    create_adaptive_concurrency_chart
+)
+from utils.concurrency_control import CONTROLLERS
+
+# Seconds between job status polls while a test runs
+JOB_POLL_INTERVAL = 0.5
+
+# Length of a live throughput test in seconds
+LIVE_TEST_DURATION = 10
+
+# Service-time multiplier of the local target server
+LOCAL_TARGET_TIME_SCALE = 0.1
+
+def _single_test_job(job, pattern, test_type, url, engine, scenario, fault_injection=False, target_pid=None,
+                     capacity_search=False, slo_p99_ms=500, max_error_rate=1.0):
+    """
+    Test one pattern in the background
+    
+    Live tests stream their intervals into job.items; a capacity search
+    instead steps the load up until the SLO breaks and reports each probe.
+    """
+    if test_type != "Local Target Test" and not (url and real_tests_enabled()):
+        job.update(message="Running simulated test...")
+        if url:
+            test_results = run_custom_test_plan(url=url, pattern=pattern, engine=engine)
+        else:
+            test_results = run_custom_test_plan(pattern=pattern)
+        save_test_results(pattern, test_results)
+        record_run(pattern, test_results, test_type=test_type,
+                   parameters={"url": url, "engine": engine, "simulated": True})
+        return {"test_results": test_results, "endpoint_results": None, "phase_results": None, "fault_results": None,
+                "resource_results": None, "load_generator": None, "capacity_results": None}
+    
+    if test_type == "Local Target Test":
+        target = start_target_server(pattern, time_scale=LOCAL_TARGET_TIME_SCALE)
+    else:
+        target = nullcontext()
+    
+    with target as server:
+        live_url = server.url if server else url
+        job.update(message="Measuring latency...")
+        latency_results = run_latency_test(live_url, engine=engine)
+        job.check_cancelled()
+        
+        # Leave part of the progress bar for the fault-injection run
+        throughput_share = 0.5 if fault_injection else 0.9
+        job.update(0.1, "Measuring throughput...")
+        throughput_results = None
+        
+        capacity_results = None
+        
+        # Sample the target's CPU and memory under load; the local target serves from one thread of this process.
+        # A capacity search varies the load, so there is no single operating point to attribute resources to.
+        sampler = None
+        if server and PROC_AVAILABLE and not capacity_search:
+            sampler = ProcessSampler(os.getpid(), [server.thread_id])
+        elif target_pid and not capacity_search:
+            sampler = ProcessSampler(target_pid)
+        
+        if capacity_search:
+            job.update(message="Raising the load until the SLO breaks...")
+            capacity_results = run_capacity_search(
+                live_url,
+                slo_p99_ms=slo_p99_ms,
+                max_error_rate=max_error_rate,
+                engine=engine,
+                scenario=scenario,
+                stop_event=job.cancel_event,
+                progress=lambda point: job.update(
+                    message=f"Concurrency {point['load']}: p99 {point['p99_latency']:.0f} ms "
+                            f"({'meets' if point['meets_slo'] else 'breaks'} the SLO)",
+                    item={"type": "capacity_probe", "slo_p99_ms": slo_p99_ms, **point}
+                )
+            )
+            job.check_cancelled()
+            throughput = capacity_results["max_sustainable_throughput"]
+        else:
+            stream = stream_throughput_test(live_url, duration=LIVE_TEST_DURATION, engine=engine, scenario=scenario)
+            try:
+                if sampler:
+                    sampler.start()
+                for item in stream:
+                    if job.cancelled:
+                        break
+                    if item["type"] == "interval":
+                        job.update(0.1 + throughput_share * min(item["second"] / LIVE_TEST_DURATION, 1.0), item=item)
+                    else:
+                        throughput_results = item["results"]
+            finally:
+                # Stops the load if the job was cancelled mid-run
+                stream.close()
+                if sampler:
+                    sampler.stop()
+            job.check_cancelled()
+            throughput = throughput_results["throughput"]
+        
+        resource_results = None
+        if sampler:
+            resource_results = {
+                **sampler.summary(throughput),
+                "timeline": sampler.samples
+            }
+        
+        fault_results = None
+        if fault_injection:
+            job.update(0.1 + throughput_share, "Injecting faults to measure fault tolerance...")
+            fault_results = run_fault_tolerance_test(live_url, engine=engine, stop_event=job.cancel_event)
+            job.check_cancelled()
+    
+    test_results = url_results_to_metrics(latency_results, throughput, fault_results, resource_results)
+    if test_type == "Local Target Test":
+        # Save in the pattern's time base; the next local target is built from these values
+        test_results = rescale_local_target_metrics(test_results, LOCAL_TARGET_TIME_SCALE)
+    save_test_results(pattern, test_results)
+    record_run(
+        pattern,
+        test_results,
+        test_type=test_type,
+        parameters={"url": url, "engine": engine, "scenario": scenario, "fault_injection": fault_injection,
+                    "duration": None if capacity_search else LIVE_TEST_DURATION, "capacity_search": capacity_search,
+                    "slo_p99_ms": slo_p99_ms if capacity_search else None},
+        summary={
+            "latency": scalar_summary(latency_results),
+            "throughput": scalar_summary(throughput_results),
+            "capacity": scalar_summary(capacity_results),
+            "fault_tolerance": scalar_summary(fault_results),
+            "resources": scalar_summary(resource_results)
+        }
+    )
+    return {
+        "test_results": test_results,
+        "endpoint_results": throughput_results.get("endpoints") if throughput_results else None,
+        "phase_results": throughput_results["phases"] if throughput_results else None,
+        "fault_results": fault_results,
+        "resource_results": resource_results,
+        "load_generator": throughput_results["load_generator"] if throughput_results else None,
+        "capacity_results": capacity_results
+    }
+
+def _comparison_job(job, pattern_names, mode, trials, parallelism):
+    """Test every pattern in parallel in the background and save the means in one write"""
+    job.update(message=f"Testing {len(pattern_names)} patterns, {parallelism} at a time...")
+    all_results = run_pattern_comparison(
+        pattern_names,
+        mode=mode,
+        trials=trials,
+        parallelism=parallelism,
+        time_scale=LOCAL_TARGET_TIME_SCALE,
+        stop_event=job.cancel_event,
+        progress=lambda done, total, pattern: job.update(done / total, f"Finished {pattern} ({done} of {total})")
+    )
+    job.check_cancelled()
+    
+    # Save the mean results to data; local target means are already in the patterns' own time base
+    mean_results = {
+        pattern: {metric: round(stats["mean"], 2) for metric, stats in trial_results["metrics"].items()}
+        for pattern, trial_results in all_results.items()
+    }
+    save_test_results_batch(mean_results)
+    parameters = {"mode": mode, "trials": trials}
+    if mode == "local_target":
+        parameters["time_scale"] = LOCAL_TARGET_TIME_SCALE
+    record_runs([
+        {
+            "pattern": pattern,
+            "metrics": mean_results[pattern],
+            "test_type": "Comparison",
+            "parameters": parameters,
+            "summary": trial_results["metrics"]
+        }
+        for pattern, trial_results in all_results.items()
+    ])
+    return all_results
+
+def _scaling_job(job, pattern):
+    """Simulate a pattern before and after scaling in the background"""
+    job.update(message=f"Scaling {pattern}...")
+    return simulate_scaling_comparison(pattern)
+
+def _usl_fit_job(job, pattern, url, levels, duration, local_target):
+    """Measure a concurrency sweep in the background and fit the USL to it"""
+    job.update(message="Measuring throughput at each concurrency level...")
+    sweep = run_scalability_sweep(
+        url=url,
+        concurrency_levels=levels,
+        duration=duration,
+        engine="asyncio",
+        pattern=pattern,
+        local_target=local_target,
+        time_scale=LOCAL_TARGET_TIME_SCALE,
+        stop_event=job.cancel_event,
+        progress=lambda done, total: job.update(done / total, f"Measured {done} of {total} concurrency levels")
+    )
+    job.check_cancelled()
+    fit = fit_usl(sweep)
+    saved_fit = fit
+    if local_target:
+        # Store the rates in the pattern's own time base; sigma, kappa and the peak load have no time unit
+        saved_fit = {
+            **fit,
+            "lambda": fit["lambda"] * LOCAL_TARGET_TIME_SCALE,
+            "peak_throughput": None if fit["peak_throughput"] is None
+            else fit["peak_throughput"] * LOCAL_TARGET_TIME_SCALE
+        }
+    save_scalability_fit(pattern, saved_fit)
+    return {"pattern": pattern, "sweep": sweep, "fit": fit}
+
+def _adaptive_concurrency_job(job, pattern, url, controller, duration, local_target):
+    """Let a concurrency controller search for the best operating point in the background"""
+    job.update(message=f"Running the {controller.upper()} controller...")
+    result = run_adaptive_concurrency_test(
+        url=url,
+        duration=duration,
+        controller=controller,
+        engine="asyncio",
+        pattern=pattern,
+        local_target=local_target,
+        stop_event=job.cancel_event,
+        progress=lambda done, total, window: job.update(
+            done / total, f"Window {done} of {total}: concurrency {window['concurrency']}"
+        )
+    )
+    job.check_cancelled()
+    return result
+
+def _submit_job(state_key, fn, *args, name=None):
+    """Start a background job unless the one tracked under state_key is still running"""
+    if st.session_state.get(state_key) is None:
+        st.session_state[state_key] = get_job_executor().submit(fn, *args, name=name)
+
+def _follow_job(state_key, on_complete, success_message, render_progress=None):
+    """
+    Show the progress of the job tracked under state_key until it finishes
+    
+    Only the progress panel reruns while the job is active; it reads the
+    job's state and never waits on it. Once the job has finished its result
+    is handed to on_complete and the whole page reruns to show it.
+    """
+    job_id = st.session_state.get(state_key)
+    if job_id is not None:
+        executor = get_job_executor()
+        
+        @st.fragment(run_every=JOB_POLL_INTERVAL)
+        def job_panel():
+            job = executor.status(job_id)
+            if job is None or job["status"] in FINISHED_STATES:
+                st.session_state[state_key] = None
+                executor.forget(job_id)
+                if job is None:
+                    st.session_state[f"{state_key}_notice"] = ("warning", "The test was lost, e.g. after a server restart.")
+                elif job["status"] == "completed":
+                    on_complete(job["result"])
+                    st.session_state[f"{state_key}_notice"] = ("success", success_message)
+                elif job["status"] == "failed":
+                    st.session_state[f"{state_key}_notice"] = ("error", f"{job['name']} failed: {job['error']}")
+                else:
+                    st.session_state[f"{state_key}_notice"] = ("warning", f"{job['name']} was cancelled.")
+                st.rerun()
+            
+            st.progress(job["progress"], text=job["message"] or f"{job['name']}...")
+            if render_progress:
+                render_progress(job)
+            st.button("Cancel", key=f"cancel_{state_key}", on_click=executor.cancel, args=(job_id,))
+        
+        job_panel()
+    
+    notice = st.session_state.pop(f"{state_key}_notice", None)
+    if notice:
+        kind, text = notice
+        getattr(st, kind)(text)
+
+def _show_single_test_progress(job):
+    items = job["items"]
+    if not items:
+        return
+    if items[0]["type"] == "capacity_probe":
+        # The knee is only known once the search ends
+        st.plotly_chart(create_capacity_curve_chart({
+            "curve": sorted(items, key=lambda point: point["load"]),
+            "search": "concurrency",
+            "slo_p99_ms": items[0]["slo_p99_ms"],
+            "knee_load": None
+        }))
+    else:
+        st.plotly_chart(create_live_throughput_chart(items))
 
 def show():
     """Show the Custom Test Plan page"""
@@ -40,41 +353,90 @@ def show():
             
             test_type = st.radio(
                 "Select test type:",
-                ["Simulated Test", "URL Test"],
-                index=0
+                ["Simulated Test", "URL Test", "Local Target Test"],
+                index=0,
+                help="Local Target Test runs real load against an offline server that emulates the selected pattern."
             )
             
             if test_type == "URL Test":
                 test_url = st.text_input("Enter URL to test:", "https://example.com")
-                st.caption("Note: URL tests will be simulated in this environment.")
+                test_engine = st.radio(
+                    "Load engine:",
+                    ["threads", "asyncio"],
+                    index=0,
+                    horizontal=True,
+                    help="asyncio keeps many requests in flight on one event loop and scales to thousands of connections."
+                )
+                if real_tests_enabled():
+                    st.caption("Throughput is charted live while the test runs. Use Cancel to stop a bad run early.")
+                    if PROC_AVAILABLE:
+                        target_pid = st.number_input(
+                            "Target process ID (optional):",
+                            min_value=0,
+                            value=0,
+                            step=1,
+                            help="When the target runs on this machine, its CPU, memory, threads and open files "
+                                 "are sampled during the test to measure Resource Utilization and Cost Efficiency."
+                        ) or None
+                else:
+                    st.caption("Note: URL tests will be simulated in this environment.")
             else:
                 test_url = None
+                test_engine = "asyncio" if test_type == "Local Target Test" else "threads"
+            if test_type != "URL Test" or not (real_tests_enabled() and PROC_AVAILABLE):
+                target_pid = None
+            
+            test_scenario = None
+            fault_injection = False
+            capacity_search = False
+            slo_p99_ms = 500
+            max_error_rate = 1.0
+            if test_type != "Simulated Test":
+                test_scenario = st.selectbox(
+                    "Traffic mix:",
+                    [None] + list_scenarios(),
+                    format_func=lambda path: "GET the URL only" if path is None else os.path.basename(path),
+                    help="Replay a weighted mix of requests from a JSONL scenario file; paths are resolved against the URL."
+                )
+                fault_injection = st.checkbox(
+                    "Inject faults",
+                    help="Adds a ~25 second run through a proxy that injects latency spikes, connection resets, "
+                         "5xx bursts and blackholes, to measure Fault Tolerance, recovery time and Availability."
+                )
+                capacity_search = st.checkbox(
+                    "Find capacity",
+                    help="Instead of one fixed-load run, doubles the concurrency until the p99 latency SLO or the "
+                         "error-rate limit breaks, then narrows down the highest load that still meets it. "
+                         "Throughput is the maximum sustainable throughput."
+                )
+                if capacity_search:
+                    slo_p99_ms = st.number_input("p99 latency SLO (ms):", min_value=1, value=500, step=50)
+                    max_error_rate = st.number_input("Error rate limit (%):", min_value=0.0, max_value=100.0,
+                                                     value=1.0, step=0.5)
             
             st.info("The test will generate performance metrics for the selected pattern.")
             
-            # Run test button
-            if st.button("Run Test", key="run_single_test"):
-                with st.spinner("Running test..."):
-                    # Add a small delay for UX
-                    time.sleep(2)
-                    
-                    # Run the test
-                    if test_url:
-                        test_results = run_custom_test_plan(url=test_url, pattern=test_pattern)
-                    else:
-                        test_results = run_custom_test_plan(pattern=test_pattern)
-                    
-                    # Store results in session state
-                    st.session_state.test_results = test_results
-                    
-                    # Save results to data
-                    save_test_results(test_pattern, test_results)
-                
-                st.success("Test completed! Results are displayed below.")
+            # Run test button; the test runs as a background job
+            if st.button("Run Test", key="run_single_test", disabled=st.session_state.get("single_test_job") is not None):
+                _submit_job("single_test_job", _single_test_job, test_pattern, test_type, test_url, test_engine,
+                            test_scenario, fault_injection, target_pid, capacity_search, slo_p99_ms, max_error_rate,
+                            name=f"{test_pattern} test")
         
         with col2:
             st.markdown("### Test Results")
             
+            def store_single_test(result):
+                st.session_state.test_results = result["test_results"]
+                st.session_state.endpoint_results = result["endpoint_results"]
+                st.session_state.phase_results = result["phase_results"]
+                st.session_state.fault_results = result["fault_results"]
+                st.session_state.resource_results = result["resource_results"]
+                st.session_state.load_generator = result["load_generator"]
+                st.session_state.capacity_results = result["capacity_results"]
+            
+            _follow_job("single_test_job", store_single_test, "Test completed! Results are displayed below.",
+                        render_progress=_show_single_test_progress)
+            
             if 'test_results' in st.session_state and st.session_state.test_results:
                 results = st.session_state.test_results
                 
@@ -92,12 +454,103 @@ def show():
                 results_df = pd.DataFrame(results_table)
                 st.dataframe(results_df, hide_index=True)
                 
+                # Results measured by an overloaded client are not the target's
+                saturation_warning = describe_saturation(st.session_state.get("load_generator"))
+                if saturation_warning:
+                    st.warning(saturation_warning)
+                
                 # Update the architecture data with test results
                 updated_arch_data = load_architecture_data()  # Reload to get updated data
                 
                 # Create radar chart with updated data
                 radar_fig = create_radar_chart(test_pattern, updated_arch_data)
                 st.plotly_chart(radar_fig)
+                
+                # Latency-vs-load curve behind a capacity search's Throughput
+                capacity_results = st.session_state.get("capacity_results")
+                if capacity_results:
+                    st.markdown("#### Capacity")
+                    capacity_col1, capacity_col2, capacity_col3 = st.columns(3)
+                    capacity_col1.metric("Max sustainable throughput",
+                                         f"{capacity_results['max_sustainable_throughput']:,.0f} req/sec")
+                    capacity_col2.metric("At concurrency",
+                                         capacity_results["knee_load"] if capacity_results["knee_load"] is not None
+                                         else "n/a")
+                    capacity_col3.metric("p99 at that load",
+                                         f"{capacity_results['knee_p99_latency']:.0f} ms"
+                                         if capacity_results["knee_p99_latency"] is not None else "n/a",
+                                         help=f"SLO {capacity_results['slo_p99_ms']:g} ms")
+                    if not capacity_results["slo_broken"]:
+                        st.caption("The SLO held up to the largest load probed; capacity may be higher.")
+                    if test_type == "Local Target Test":
+                        st.caption(f"Measured against the local target, which serves {1 / LOCAL_TARGET_TIME_SCALE:g}x "
+                                   "faster than the pattern; the saved Throughput is converted back.")
+                    st.plotly_chart(create_capacity_curve_chart(capacity_results))
+                
+                # Per-endpoint breakdown of a scenario replay
+                endpoint_results = st.session_state.get("endpoint_results")
+                if endpoint_results:
+                    st.markdown("#### Per-Endpoint Results")
+                    endpoint_df = pd.DataFrame([
+                        {
+                            "Endpoint": name,
+                            "Requests": endpoint["requests"],
+                            "Share (%)": round(endpoint["share"], 1),
+                            "Error Rate (%)": round(endpoint["error_rate"], 2),
+                            "Avg (ms)": round(endpoint["avg_latency"], 1),
+                            "p50 (ms)": round(endpoint["p50_latency"], 1),
+                            "p99 (ms)": round(endpoint["p99_latency"], 1)
+                        }
+                        for name, endpoint in endpoint_results.items()
+                    ])
+                    st.dataframe(endpoint_df, hide_index=True)
+                
+                # Where the time of each request went under load
+                phase_results = st.session_state.get("phase_results")
+                if phase_results:
+                    st.plotly_chart(create_phase_breakdown_chart(phase_results, test_pattern))
+                
+                # Target resource usage behind Resource Utilization and Cost Efficiency
+                resource_results = st.session_state.get("resource_results")
+                if resource_results:
+                    st.markdown("#### Target Resource Usage")
+                    usage_col1, usage_col2, usage_col3, usage_col4 = st.columns(4)
+                    usage_col1.metric("Mean CPU", f"{resource_results['mean_cpu_percent']:.1f}%",
+                                      help=f"Of {resource_results['capacity_cores']} core(s); "
+                                           f"peak {resource_results['peak_cpu_percent']:.1f}%")
+                    throughput_per_core = resource_results.get("throughput_per_core")
+                    usage_col2.metric("Throughput per core",
+                                      f"{throughput_per_core:,.0f} req/sec" if throughput_per_core else "n/a")
+                    usage_col3.metric("Peak RSS", f"{resource_results['peak_rss_mb']:.0f} MB")
+                    usage_col4.metric(
+                        "Threads / open files",
+                        f"{resource_results['max_threads']} / "
+                        f"{resource_results['max_fds'] if resource_results['max_fds'] is not None else 'n/a'}"
+                    )
+                    st.plotly_chart(create_resource_usage_chart(resource_results["timeline"], test_pattern))
+                
+                # How the target coped with each injected fault
+                fault_results = st.session_state.get("fault_results")
+                if fault_results:
+                    st.markdown("#### Fault Injection")
+                    fault_col1, fault_col2, fault_col3 = st.columns(3)
+                    fault_col1.metric("Fault tolerance score", f"{fault_results['fault_tolerance_score']:.2f} / 5")
+                    fault_col2.metric("Mean recovery time", f"{fault_results['recovery_time']:.2f} s",
+                                      help=f"Recovery score {fault_results['recovery_score']:.2f} / 5")
+                    fault_col3.metric("Availability outside faults", f"{fault_results['availability']:.2f}%",
+                                      help=f"{fault_results['availability_under_faults']:.1f}% including the fault windows")
+                    fault_df = pd.DataFrame([
+                        {
+                            "Fault": fault["type"],
+                            "Start (s)": fault["start"],
+                            "Duration (s)": fault["duration"],
+                            "Goodput Kept (%)": round(fault["tolerance"] * 100, 1),
+                            "Recovery (s)": round(fault["recovery_time"], 2) if fault["recovered"]
+                                            else f"> {fault['recovery_time']:.2f}"
+                        }
+                        for fault in fault_results["faults"]
+                    ])
+                    st.dataframe(fault_df, hide_index=True)
             else:
                 st.info("Run a test to see results here.")
     
@@ -105,50 +558,72 @@ def show():
         st.subheader("Compare All Patterns")
         
         st.markdown("""
-        This tool will run simulated tests for all architecture patterns and compare their performance metrics.
-        The results will be displayed in a table for easy comparison.
+        This tool will run tests for all architecture patterns at the same time and compare their performance metrics.
+        Simulated tests run each pattern many times; the table shows the mean and the confidence interval of the results.
         """)
         
-        if st.button("Run Comparison Test", key="run_comparison_test"):
-            with st.spinner("Running tests for all patterns..."):
-                # Add a small delay for UX
-                time.sleep(3)
-                
-                # Run tests for all patterns
-                all_results = {}
-                for pattern in pattern_names:
-                    results = run_custom_test_plan(pattern=pattern)
-                    all_results[pattern] = results
-                    
-                    # Save results to data
-                    save_test_results(pattern, results)
-                
-                # Store results in session state
-                st.session_state.comparison_data = all_results
-            
-            st.success("All tests completed! Results are displayed below.")
+        comparison_mode = st.radio(
+            "Test each pattern with:",
+            ["simulated", "local_target"],
+            format_func=lambda mode: "Simulated trials" if mode == "simulated" else "Local target load test",
+            horizontal=True,
+            help="Local target load tests run real load against a stand-in server per pattern, each in its own process."
+        )
+        trials = 1
+        if comparison_mode == "simulated":
+            trials = st.select_slider("Simulated trials per pattern", options=[100, 500, 1000, 2000, 5000], value=2000)
+        parallelism = st.slider(
+            "Patterns tested at once",
+            min_value=1,
+            max_value=len(pattern_names),
+            value=min(len(pattern_names), os.cpu_count() or 1)
+        )
+        
+        if st.button("Run Comparison Test", key="run_comparison_test",
+                     disabled=st.session_state.get("comparison_job") is not None):
+            _submit_job("comparison_job", _comparison_job, pattern_names, comparison_mode, trials, parallelism,
+                        name="Comparison test")
+        
+        _follow_job(
+            "comparison_job",
+            lambda result: st.session_state.update(comparison_data=result),
+            "All tests completed! Results are displayed below."
+        )
         
         if 'comparison_data' in st.session_state and st.session_state.comparison_data:
+            comparison_data = st.session_state.comparison_data
+            confidence = comparison_data[pattern_names[0]]["confidence"]
+            
             # Create comparison table
             comparison_table = []
-            metrics = list(st.session_state.comparison_data[pattern_names[0]].keys())
+            metrics = list(comparison_data[pattern_names[0]]["metrics"].keys())
             
             # Create a row for each metric
             for metric in metrics:
                 row = {"Metric": metric}
                 
                 for pattern in pattern_names:
-                    if pattern in st.session_state.comparison_data:
-                        row[pattern] = st.session_state.comparison_data[pattern][metric]
+                    if pattern in comparison_data:
+                        stats = comparison_data[pattern]["metrics"][metric]
+                        row[pattern] = f"{stats['mean']:.2f} [{stats['ci_low']:.2f}, {stats['ci_high']:.2f}]"
                 
                 comparison_table.append(row)
             
             comparison_df = pd.DataFrame(comparison_table)
             
+            st.caption(
+                f"Mean [{confidence:.0%} confidence interval of the mean] over "
+                f"{comparison_data[pattern_names[0]]['trials']} trials per pattern"
+            )
             st.dataframe(comparison_df, hide_index=True)
             
             # Add a download button for the comparison data
-            csv = comparison_df.to_csv(index=False)
+            csv_rows = []
+            for pattern in pattern_names:
+                if pattern in comparison_data:
+                    for metric, stats in comparison_data[pattern]["metrics"].items():
+                        csv_rows.append({"Pattern": pattern, "Metric": metric, **stats})
+            csv = pd.DataFrame(csv_rows).to_csv(index=False)
             st.download_button(
                 label="Download Comparison Data as CSV",
                 data=csv,
@@ -161,28 +636,17 @@ def show():
             
             best_patterns = []
             for metric in metrics:
-                best_pattern = None
-                best_value = None
-                
-                for pattern in pattern_names:
-                    if pattern in st.session_state.comparison_data:
-                        value = st.session_state.comparison_data[pattern][metric]
-                        
-                        # For latency and resource utilization, lower is better
-                        if metric in ["Latency", "Resource Utilization"]:
-                            if best_value is None or value < best_value:
-                                best_value = value
-                                best_pattern = pattern
-                        else:
-                            # For all other metrics, higher is better
-                            if best_value is None or value > best_value:
-                                best_value = value
-                                best_pattern = pattern
+                best = get_best_pattern_from_trials(comparison_data, metric)
                 
                 best_patterns.append({
                     "Metric": metric,
-                    "Best Pattern": best_pattern,
-                    "Value": best_value
+                    "Best Pattern": best["pattern"],
+                    "Value": round(best["mean"], 2),
+                    "Interval": f"[{best['ci_low']:.2f}, {best['ci_high']:.2f}]",
+                    "Significance": (
+                        "Not sampled" if best["significant"] is None
+                        else "Clear winner" if best["significant"] else f"Tied with {best['runner_up']}"
+                    )
                 })
             
             best_patterns_df = pd.DataFrame(best_patterns)
@@ -206,18 +670,14 @@ def show():
             key="scaling_pattern"
         )
         
-        if st.button("Run Scaling Test"):
-            with st.spinner("Running scaling test..."):
-                # Add a small delay for UX
-                time.sleep(2)
-                
-                # Run the scaling test
-                scaling_results = simulate_scaling_comparison(scaling_pattern)
-                
-                # Store results in session state
-                st.session_state.before_after_data = scaling_results
-            
-            st.success("Scaling test completed! Results are displayed below.")
+        if st.button("Run Scaling Test", disabled=st.session_state.get("scaling_job") is not None):
+            _submit_job("scaling_job", _scaling_job, scaling_pattern, name=f"{scaling_pattern} scaling test")
+        
+        _follow_job(
+            "scaling_job",
+            lambda result: st.session_state.update(before_after_data=result),
+            "Scaling test completed! Results are displayed below."
+        )
         
         if 'before_after_data' in st.session_state and st.session_state.before_after_data:
             # Display before and after data
@@ -294,6 +754,133 @@ def show():
                 st.error(f"{scaling_pattern} is not recommended for applications that need to scale significantly.")
         else:
             st.info("Run a scaling test to see results here.")
+        
+        # Fit a scalability model from real measurements
+        st.subheader("Fit Scalability from Measured Runs")
+        
+        st.markdown("""
+        Measure throughput at several concurrency levels and fit the Universal Scalability Law to it.
+        The fitted parameters are stored with the selected pattern as its concurrency model; the node-count
+        scaling curves on the dashboard keep their own parameters.
+        """)
+        
+        fit_source = st.radio("Measure against:", ["Local Target", "URL"], horizontal=True, key="fit_source")
+        fit_url = None
+        if fit_source == "URL":
+            fit_url = st.text_input("URL to measure:", "https://example.com", key="fit_url")
+        fit_levels = st.multiselect(
+            "Concurrency levels:",
+            [1, 2, 4, 8, 16, 32, 64, 128, 256, 512],
+            default=[1, 4, 16, 64, 128, 256],
+            key="fit_levels"
+        )
+        fit_duration = st.slider("Seconds per level", min_value=1, max_value=30, value=3, key="fit_duration")
+        
+        if fit_source == "URL" and not real_tests_enabled():
+            st.info("Real load tests are disabled in this environment; measure against the local target instead.")
+        elif st.button("Measure and Fit", key="run_usl_fit", disabled=st.session_state.get("usl_fit_job") is not None):
+            _submit_job("usl_fit_job", _usl_fit_job, scaling_pattern, fit_url, sorted(fit_levels), fit_duration,
+                        fit_source == "Local Target", name="Scalability fit")
+        
+        _follow_job(
+            "usl_fit_job",
+            lambda result: st.session_state.update(usl_fit=result),
+            "Fitted parameters saved to the pattern."
+        )
+        
+        usl_fit = st.session_state.get("usl_fit")
+        if usl_fit:
+            fit = usl_fit["fit"]
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("Contention (σ)", f"{fit['sigma']:.4f}")
+            col2.metric("Coherency (κ)", f"{fit['kappa']:.6f}")
+            col3.metric("R²", f"{fit['r_squared']:.3f}", help=f"RMSE {fit['rmse']:.1f} req/sec over {fit['points']} points")
+            col4.metric(
+                "Extrapolated capacity",
+                f"{fit['peak_throughput']:,.0f} req/sec" if fit["peak_throughput"] is not None else "Unbounded",
+                help=f"Peak at {fit['peak_load']:.0f} concurrent requests" if fit["peak_load"] is not None else None
+            )
+            st.plotly_chart(create_usl_fit_chart(usl_fit["sweep"], fit))
+            
+            saturated_levels = [point["concurrency"] for point in usl_fit["sweep"] if point["load_generator"]["saturated"]]
+            if saturated_levels:
+                st.warning(
+                    "The load generator was saturated at concurrency "
+                    f"{', '.join(str(level) for level in saturated_levels)}; those points understate the target "
+                    "and skew the fit. " + describe_saturation(
+                        next(point["load_generator"] for point in usl_fit["sweep"] if point["load_generator"]["saturated"])
+                    )
+                )
+        
+        # Predictions from the stored fit need no new load
+        concurrency_model = get_concurrency_model(scaling_pattern)
+        if concurrency_model is not None:
+            st.markdown(f"**Stored concurrency model for {scaling_pattern}** "
+                        f"(R² {concurrency_model['fit']['r_squared']:.3f} over {concurrency_model['fit']['points']} points)")
+            predict_at = st.number_input("Predict throughput at concurrency:", min_value=1, max_value=100000, value=64,
+                                         step=1, key="predict_concurrency")
+            prediction = predict_concurrency_throughput(scaling_pattern, predict_at)
+            col1, col2 = st.columns(2)
+            col1.metric(f"Predicted throughput at {predict_at}", f"{float(prediction['throughput']):,.0f} req/sec")
+            col2.metric(
+                "Peak concurrency",
+                f"{prediction['peak_concurrency']:,}" if prediction["peak_concurrency"] is not None else "Unbounded",
+                help=f"{prediction['peak_throughput']:,.0f} req/sec at the peak"
+                if prediction["peak_throughput"] is not None else None
+            )
+    
+        # Let a controller find the operating point
+        st.subheader("Adaptive Concurrency")
+        
+        st.markdown("""
+        Instead of a fixed sweep, a controller adjusts concurrency between short windows: it adds load while
+        latency stays flat and backs off when latency or errors rise. The best operating point is the concurrency
+        with the highest throughput per unit of latency.
+        """)
+        
+        adaptive_source = st.radio("Run against:", ["Local Target", "URL"], horizontal=True, key="adaptive_source")
+        adaptive_url = None
+        if adaptive_source == "URL":
+            adaptive_url = st.text_input("URL to test:", "https://example.com", key="adaptive_url")
+        col1, col2 = st.columns(2)
+        with col1:
+            adaptive_controller = st.selectbox(
+                "Controller",
+                CONTROLLERS,
+                format_func=lambda name: {"aimd": "AIMD", "gradient": "Gradient"}[name],
+                key="adaptive_controller"
+            )
+        with col2:
+            adaptive_duration = st.slider("Test duration (s)", min_value=10, max_value=120, value=30,
+                                          key="adaptive_duration")
+        
+        if adaptive_source == "URL" and not real_tests_enabled():
+            st.info("Real load tests are disabled in this environment; run against the local target instead.")
+        elif st.button("Find Operating Point", key="run_adaptive",
+                       disabled=st.session_state.get("adaptive_job") is not None):
+            _submit_job("adaptive_job", _adaptive_concurrency_job, scaling_pattern, adaptive_url, adaptive_controller,
+                        adaptive_duration, adaptive_source == "Local Target", name="Adaptive concurrency test")
+        
+        _follow_job(
+            "adaptive_job",
+            lambda result: st.session_state.update(adaptive_result=result),
+            "Adaptive concurrency test completed."
+        )
+        
+        adaptive_result = st.session_state.get("adaptive_result")
+        if adaptive_result and adaptive_result["history"]:
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("Best concurrency", adaptive_result["best_concurrency"])
+            col2.metric("Throughput", f"{adaptive_result['best_throughput']:,.0f} req/sec")
+            col3.metric("Mean latency", f"{adaptive_result['best_avg_latency']:.1f} ms",
+                        help=f"p99 {adaptive_result['best_p99_latency']:.1f} ms")
+            col4.metric("Final concurrency", adaptive_result["final_concurrency"])
+            st.plotly_chart(create_adaptive_concurrency_chart(adaptive_result["history"],
+                                                              adaptive_result["best_concurrency"]))
+            
+            if any(point["load_generator_saturated"] for point in adaptive_result["history"]):
+                st.warning("The load generator was saturated during some windows; latency rises there may come from "
+                           "the client rather than the target.")
     
     # Additional information
     st.markdown("---")
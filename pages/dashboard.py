@@ -1,9 +1,25 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+import time
 from utils.data_manager import load_architecture_data
 from utils.metrics_analyzer import get_pattern_scores, get_pattern_characteristics, get_pattern_description, get_pattern_sources, compare_before_after_scaling
-from utils.visualization import create_radar_chart, create_before_after_chart
+from utils.scalability_model import compute_scaling_curves, get_scaling_limits
+from utils.run_history import get_latest_runs, get_rolling_median
+from utils.visualization import (
+    create_radar_chart,
+    create_before_after_chart,
+    create_scaling_curve_chart,
+    create_metric_history_chart
+)
+
+# Run history windows offered on the dashboard, in seconds (None for everything)
+HISTORY_RANGES = {
+    "Last 24 hours": 24 * 3600,
+    "Last 7 days": 7 * 24 * 3600,
+    "Last 30 days": 30 * 24 * 3600,
+    "All time": None
+}
 
 def show():
     """Show the Pattern Dashboard page"""
@@ -94,6 +110,64 @@ def show():
     else:
         st.info("No scaling comparison data available for this pattern.")
     
+    # Scaling curves across node counts
+    max_nodes = st.slider("Maximum node count", min_value=8, max_value=256, value=64, step=8)
+    curves = compute_scaling_curves(max_nodes=max_nodes, arch_data=arch_data)
+    limits = get_scaling_limits(arch_data=arch_data)
+    
+    curve_metric = st.radio("Scaling curve", ["Throughput", "Latency", "Efficiency", "Utilization", "Overhead"],
+                            horizontal=True)
+    st.plotly_chart(create_scaling_curve_chart(curves, selected_pattern, limits, metric=curve_metric))
+    if curve_metric in ("Utilization", "Overhead"):
+        st.caption("Each node is as busy as a single node; Utilization is the part of it that produces throughput "
+                   "and Overhead the part spent on contention and coordination with other nodes.")
+    
+    limit = limits[selected_pattern]
+    if limit["peak_nodes"] is not None:
+        st.markdown(f"""
+        **{selected_pattern}** stops scaling at about **{limit['peak_nodes']} nodes**
+        ({limit['peak_throughput']:,.0f} req/sec). Beyond that point, coordination costs between nodes
+        make every added node reduce total throughput.
+        """)
+    else:
+        st.markdown(f"**{selected_pattern}** has no coherency cost in its model, so throughput never peaks.")
+    
+    # Recorded test runs
+    st.subheader("Run History")
+    metric_names = list(arch_data[selected_pattern]["metrics"].keys())
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        history_metric = st.selectbox("Metric", metric_names, key="history_metric")
+    with col2:
+        history_range = st.selectbox("Time range", list(HISTORY_RANGES), index=len(HISTORY_RANGES) - 1,
+                                     key="history_range")
+    with col3:
+        history_window = st.slider("Rolling median over runs", min_value=1, max_value=20, value=5,
+                                   key="history_window")
+    
+    range_seconds = HISTORY_RANGES[history_range]
+    history = get_rolling_median(
+        selected_pattern,
+        history_metric,
+        window=history_window,
+        start=time.time() - range_seconds if range_seconds else None
+    )
+    if history.empty:
+        st.info("No recorded test runs for this pattern yet. Runs from the Custom Test Plan page appear here.")
+    else:
+        unit = arch_data[selected_pattern]["metrics"][history_metric]["unit"]
+        st.plotly_chart(create_metric_history_chart(history, history_metric, selected_pattern, unit))
+        
+        latest_runs = get_latest_runs(selected_pattern, limit=10)
+        st.dataframe(pd.DataFrame([
+            {
+                "Time": pd.to_datetime(run["timestamp"], unit="s").strftime("%Y-%m-%d %H:%M:%S"),
+                "Test": run["test_type"],
+                **run["metrics"]
+            }
+            for run in latest_runs
+        ]), hide_index=True)
+    
     # Source citations
     st.subheader("Data Sources")
     sources = get_pattern_sources(selected_pattern, arch_data)
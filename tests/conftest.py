@@ -0,0 +1,16 @@
+import os
+import sys
+import pytest
+
+# Let the tests import the app's utils package when run from anywhere
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import data_manager
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Point the pattern catalog at an empty temporary directory"""
+    monkeypatch.setattr(data_manager, "DATA_DIR", str(tmp_path))
+    data_manager.clear_architecture_cache()
+    yield tmp_path
+    data_manager.clear_architecture_cache()
@@ -0,0 +1,43 @@
+import asyncio
+from utils.async_engine import run_open_loop_workers
+from utils.target_server import start_target_server
+
+# Serves 4 requests at a time at ~100 ms each
+SLOW_PATTERN = {
+    "Slow": {
+        "metrics": {
+            "Latency": {"value": 100},
+            "Availability": {"value": 100},
+            "Throughput": {"value": 40}
+        }
+    }
+}
+
+class _TaskCounter:
+    # Stands in for an IntervalRecorder and notes how many tasks exist whenever a request finishes
+    def __init__(self):
+        self.max_tasks = 0
+    
+    def restart(self):
+        pass
+    
+    def record(self, latency, success):
+        self.max_tasks = max(self.max_tasks, len(asyncio.all_tasks()))
+
+def test_open_loop_spawns_tasks_only_for_requests_in_flight():
+    # 200 req/sec offered to a generator that can send ~20 req/sec
+    offsets = [i / 200 for i in range(300)]
+    counter = _TaskCounter()
+    
+    with start_target_server("Slow", arch_data=SLOW_PATTERN, seed=1) as server:
+        worker_results, _, _ = run_open_loop_workers(server.url, offsets, duration=1.5, concurrency=2,
+                                                     recorder=counter)
+    
+    results = worker_results[0]
+    # The test's own task plus one per in-flight request
+    assert counter.max_tasks <= 3
+    assert results["requests"] + results["unsent_requests"] == len(offsets)
+    assert results["unsent_requests"] > 0
+    # Arrivals that waited for a slot are charged the wait from their scheduled send time
+    assert results["send_lag"].max > 500
+    assert results["latencies"].max >= results["send_lag"].max + results["service_latencies"].min
@@ -0,0 +1,47 @@
+import pytest
+from utils.concurrency_control import AIMDController, GradientController, create_controller
+
+def test_aimd_increases_while_latency_is_flat():
+    controller = AIMDController(initial=4, increase=4)
+    
+    assert controller.update(10.0, 0.0) == (8, "increase")
+    assert controller.update(12.0, 0.0) == (12, "increase")
+
+def test_aimd_backs_off_on_latency_or_errors():
+    controller = AIMDController(initial=16, backoff=0.5, latency_tolerance=1.3)
+    controller.update(10.0, 0.0)
+    
+    assert controller.update(20.0, 0.0) == (10, "decrease")
+    assert controller.update(10.0, 5.0) == (5, "decrease")
+
+def test_aimd_respects_limits():
+    controller = AIMDController(initial=2, min_limit=2, max_limit=4, increase=4, backoff=0.5)
+    
+    assert controller.update(10.0, 0.0) == (4, "increase")
+    assert controller.update(10.0, 0.0) == (4, "hold")
+    assert controller.update(10.0, 50.0) == (2, "decrease")
+    assert controller.update(10.0, 50.0) == (2, "hold")
+
+def test_aimd_first_window_without_latency():
+    controller = AIMDController(initial=4, increase=4)
+    
+    assert controller.update(0.0, 0.0) == (8, "increase")
+    assert controller.min_latency is None
+    assert controller.update(0.0, 5.0) == (6, "decrease")
+
+def test_gradient_shrinks_when_latency_rises():
+    controller = GradientController(initial=20)
+    for _ in range(5):
+        controller.update(10.0, 0.0)
+    before = controller.limit
+    
+    limit, action = controller.update(40.0, 0.0)
+    
+    assert action == "decrease"
+    assert limit < before
+
+def test_create_controller():
+    assert isinstance(create_controller("aimd"), AIMDController)
+    assert isinstance(create_controller("gradient", initial=8), GradientController)
+    with pytest.raises(ValueError):
+        create_controller("pid")
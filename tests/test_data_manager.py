@@ -0,0 +1,102 @@
+import os
+import pytest
+from utils import data_manager
+from utils.data_manager import (
+    MAX_UPDATE_ATTEMPTS, VersionConflictError, get_cache_stats, get_default_patterns, load_architecture_data,
+    load_architecture_data_versioned, save_architecture_data, save_test_results_batch, update_architecture_data
+)
+
+PATTERN = "Monolithic Architecture"
+
+def _set_latency(value):
+    def apply(arch_data):
+        arch_data[PATTERN]["metrics"]["Latency"]["value"] = value
+    return apply
+
+def test_missing_catalog_falls_back_to_defaults(data_dir):
+    data, version = load_architecture_data_versioned()
+    
+    assert version is None
+    assert data == get_default_patterns()
+
+def test_loads_are_cached_until_the_file_changes(data_dir):
+    save_architecture_data(get_default_patterns())
+    first = load_architecture_data()
+    hits = get_cache_stats()["hits"]
+    
+    assert load_architecture_data() is first
+    assert get_cache_stats()["hits"] == hits + 1
+    
+    update_architecture_data(_set_latency(1.0))
+    assert load_architecture_data() is not first
+    assert load_architecture_data()[PATTERN]["metrics"]["Latency"]["value"] == 1.0
+
+def test_writes_leave_no_temp_files(data_dir):
+    save_architecture_data(get_default_patterns())
+    update_architecture_data(_set_latency(2.0))
+    
+    assert not [name for name in os.listdir(data_dir) if name.endswith(".tmp")]
+
+def test_save_rejects_a_stale_version(data_dir):
+    save_architecture_data(get_default_patterns())
+    data, version = load_architecture_data_versioned()
+    update_architecture_data(_set_latency(3.0))
+    
+    with pytest.raises(VersionConflictError):
+        save_architecture_data(data, expected_version=version)
+    assert load_architecture_data()[PATTERN]["metrics"]["Latency"]["value"] == 3.0
+
+def test_update_reapplies_a_change_that_lost_the_race(data_dir):
+    save_architecture_data(get_default_patterns())
+    calls = []
+    
+    def add_note(arch_data):
+        calls.append(arch_data[PATTERN]["metrics"]["Latency"]["value"])
+        if len(calls) == 1:
+            # Another writer saves between our read and our write
+            update_architecture_data(_set_latency(4.0))
+        arch_data[PATTERN]["note"] = "kept"
+    
+    written = update_architecture_data(add_note)
+    
+    assert len(calls) == 2
+    assert calls[1] == 4.0
+    assert written[PATTERN]["note"] == "kept"
+    assert written[PATTERN]["metrics"]["Latency"]["value"] == 4.0
+    assert load_architecture_data() is written
+
+def test_update_gives_up_after_max_attempts(data_dir):
+    save_architecture_data(get_default_patterns())
+    calls = []
+    
+    def always_loses(arch_data):
+        calls.append(1)
+        update_architecture_data(_set_latency(float(len(calls))))
+        arch_data[PATTERN]["note"] = "lost"
+    
+    with pytest.raises(VersionConflictError):
+        update_architecture_data(always_loses)
+    assert len(calls) == MAX_UPDATE_ATTEMPTS
+    assert "note" not in load_architecture_data()[PATTERN]
+
+def test_update_without_changes_skips_the_write(data_dir, monkeypatch):
+    save_architecture_data(get_default_patterns())
+    value = load_architecture_data()[PATTERN]["metrics"]["Latency"]["value"]
+    writes = []
+    write_catalog = data_manager._write_catalog
+    monkeypatch.setattr(data_manager, "_write_catalog", lambda data: writes.append(1) or write_catalog(data))
+    
+    save_test_results_batch({PATTERN: {"Latency": value}, "Unknown Pattern": {"Latency": 1.0}})
+    assert writes == []
+    
+    save_test_results_batch({PATTERN: {"Latency": value + 1}})
+    assert writes == [1]
+
+def test_updates_do_not_touch_the_shared_snapshot(data_dir):
+    save_architecture_data(get_default_patterns())
+    snapshot = load_architecture_data()
+    before = snapshot[PATTERN]["metrics"]["Latency"]["value"]
+    
+    update_architecture_data(_set_latency(before + 10))
+    
+    assert snapshot[PATTERN]["metrics"]["Latency"]["value"] == before
@@ -0,0 +1,98 @@
+import urllib.error
+import urllib.request
+import pytest
+from utils.data_manager import get_default_patterns
+from utils.fault_proxy import FaultProxy, parse_fault_schedule
+from utils.target_server import start_target_server
+from utils.test_runner import score_fault_tolerance
+
+def test_parse_fault_schedule_fills_defaults_and_sorts():
+    faults = parse_fault_schedule([
+        {"type": "error", "start": 5, "duration": 1},
+        {"type": "latency", "start": 1, "duration": 2, "delay_ms": 50, "probability": 0.5}
+    ])
+    
+    assert [fault["type"] for fault in faults] == ["latency", "error"]
+    assert faults[0] == {"type": "latency", "start": 1.0, "duration": 2.0, "probability": 0.5, "delay_ms": 50.0,
+                         "end": 3.0}
+    assert faults[1]["status"] == 503
+    assert faults[1]["probability"] == 1.0
+
+@pytest.mark.parametrize("fault", [
+    {"type": "meteor", "start": 0, "duration": 1},
+    {"type": "reset", "start": 0, "duration": 0},
+    {"type": "reset", "start": -1, "duration": 1},
+    {"type": "reset", "duration": 1},
+    {"type": "reset", "start": 0, "duration": 1, "probability": 1.5}
+])
+def test_parse_fault_schedule_rejects_invalid_faults(fault):
+    with pytest.raises(ValueError):
+        parse_fault_schedule([fault])
+
+def _interval(second, requests, errors=0, p99_latency=10.0):
+    return {"second": second, "requests": requests, "errors": errors,
+            "error_rate": errors / requests * 100 if requests else 0.0, "p99_latency": p99_latency}
+
+def test_score_fault_tolerance_measures_goodput_and_recovery():
+    schedule = parse_fault_schedule([{"type": "error", "start": 2, "duration": 2}])
+    intervals = [
+        _interval(1, 100), _interval(2, 100),
+        _interval(3, 100, errors=50), _interval(4, 100, errors=50),
+        _interval(5, 100, errors=30), _interval(6, 100), _interval(7, 100)
+    ]
+    
+    scores = score_fault_tolerance(intervals, schedule)
+    
+    assert scores["baseline_goodput"] == 100
+    fault = scores["faults"][0]
+    assert fault["tolerance"] == pytest.approx(0.5)
+    assert fault["recovered"]
+    assert fault["recovery_time"] == pytest.approx(1.0)
+    assert scores["fault_tolerance_score"] == pytest.approx(3.0)
+    # The slow interval after the fault counts against availability, the fault window itself does not
+    assert scores["availability"] == pytest.approx((100 + 100 + 70 + 100 + 100) / 500 * 100)
+
+def test_score_fault_tolerance_charges_unrecovered_faults_the_whole_gap():
+    schedule = parse_fault_schedule([{"type": "blackhole", "start": 1, "duration": 1}])
+    intervals = [_interval(1, 100), _interval(2, 0), _interval(3, 10), _interval(4, 10)]
+    
+    scores = score_fault_tolerance(intervals, schedule)
+    
+    assert scores["faults"][0]["tolerance"] == 0.0
+    assert not scores["faults"][0]["recovered"]
+    assert scores["faults"][0]["recovery_time"] == pytest.approx(2.0)
+
+def test_score_fault_tolerance_needs_a_baseline():
+    schedule = parse_fault_schedule([{"type": "reset", "start": 0, "duration": 1}])
+    with pytest.raises(ValueError):
+        score_fault_tolerance([_interval(1, 100)], schedule)
+
+def _get(url):
+    try:
+        with urllib.request.urlopen(url, timeout=5) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+def test_proxy_relays_injects_and_shuts_down_cleanly():
+    arch_data = get_default_patterns()
+    with start_target_server("Monolithic Architecture", arch_data, time_scale=0.01, seed=1) as target:
+        proxy = FaultProxy(target.url, [{"type": "error", "start": 60, "duration": 1, "status": 503}], seed=1)
+        with proxy:
+            assert proxy._thread.is_alive()
+            assert _get(proxy.url) in (200, 500)
+            proxy.epoch -= 60
+            assert _get(proxy.url) == 503
+        
+        assert not proxy._thread.is_alive()
+        assert proxy.stats["forwarded"] == 1
+        assert proxy.stats["injected_error"] == 1
+        assert target.stats["requests"] == 1
+
+def test_startup_error_is_raised_from_start():
+    with start_target_server("Monolithic Architecture", get_default_patterns(), time_scale=0.01) as target:
+        proxy = FaultProxy(target.url, port=target.port)
+        with pytest.raises(OSError):
+            proxy.start()
+        proxy._thread.join(timeout=5)
+        assert not proxy._thread.is_alive()
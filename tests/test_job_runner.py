@@ -0,0 +1,56 @@
+import threading
+import pytest
+from utils.job_runner import JobExecutor
+
+@pytest.fixture
+def executor():
+    executor = JobExecutor(max_workers=2)
+    yield executor
+    executor.shutdown()
+
+def _run_until_cancelled(executor, fn):
+    # Start fn, cancel it once it is running, then let it finish
+    started = threading.Event()
+    release = threading.Event()
+    
+    def job_fn(job):
+        started.set()
+        release.wait(5)
+        return fn(job)
+    
+    job_id = executor.submit(job_fn)
+    assert started.wait(5)
+    assert executor.cancel(job_id)
+    release.set()
+    executor.shutdown(cancel=False)
+    return executor.status(job_id)
+
+def test_job_that_returns_after_cancel_completes(executor):
+    status = _run_until_cancelled(executor, lambda job: "saved")
+    
+    assert status["status"] == "completed"
+    assert status["result"] == "saved"
+
+def test_job_that_stops_on_cancel_is_cancelled(executor):
+    def stop_early(job):
+        job.check_cancelled()
+        return "saved"
+    
+    status = _run_until_cancelled(executor, stop_early)
+    
+    assert status["status"] == "cancelled"
+    assert status["result"] is None
+
+def test_cancelled_pending_job_never_runs(executor):
+    release = threading.Event()
+    ran = []
+    blockers = [executor.submit(lambda job: release.wait(5)) for _ in range(2)]
+    job_id = executor.submit(lambda job: ran.append(job.id))
+    
+    assert executor.cancel(job_id)
+    release.set()
+    executor.shutdown(cancel=False)
+    
+    assert executor.status(job_id)["status"] == "cancelled"
+    assert ran == []
+    assert all(executor.status(blocker)["status"] == "completed" for blocker in blockers)
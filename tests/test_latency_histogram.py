@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+from utils.latency_histogram import LatencyHistogram, latency_result_fields
+
+def _exact_percentile(samples, percentile):
+    # Nearest-rank percentile, the definition the histogram estimates
+    ordered = np.sort(samples)
+    return ordered[max(int(np.ceil(percentile / 100 * len(ordered))), 1) - 1]
+
+@pytest.mark.parametrize("percentile", [1, 50, 90, 99, 99.9])
+def test_percentiles_within_relative_accuracy(percentile):
+    samples = np.random.default_rng(2).lognormal(3, 1, 20000)
+    histogram = LatencyHistogram(relative_accuracy=0.01)
+    histogram.record_many(samples)
+    
+    assert histogram.percentile(percentile) == pytest.approx(_exact_percentile(samples, percentile), rel=0.01)
+
+def test_record_and_record_many_agree():
+    samples = np.random.default_rng(4).exponential(20, 1000)
+    one_by_one = LatencyHistogram()
+    for value in samples:
+        one_by_one.record(value)
+    batched = LatencyHistogram()
+    batched.record_many(samples)
+    
+    assert np.array_equal(one_by_one.counts, batched.counts)
+    assert one_by_one.summary() == pytest.approx(batched.summary())
+
+def test_extremes_and_mean_are_exact():
+    histogram = LatencyHistogram()
+    histogram.record_many([2.5, 7.0, 1000.0])
+    
+    assert histogram.min == 2.5
+    assert histogram.max == 1000.0
+    assert histogram.mean() == pytest.approx(1009.5 / 3)
+    # Estimates stay within the accuracy and never leave the recorded range
+    assert histogram.percentile(0) == pytest.approx(2.5, rel=0.01)
+    assert histogram.percentile(0) >= 2.5
+    assert histogram.percentile(100) == pytest.approx(1000.0, rel=0.01)
+    assert histogram.percentile(100) <= 1000.0
+
+def test_out_of_range_values_land_in_edge_buckets():
+    histogram = LatencyHistogram(min_value=1.0, max_value=100.0)
+    histogram.record_many([0.0, 1e6])
+    
+    assert histogram.counts[0] == 1
+    assert histogram.counts[-1] == 1
+    assert histogram.max == 1e6
+    assert histogram.percentile(100) == pytest.approx(100.0, rel=0.01)
+
+def test_merge_matches_a_single_histogram():
+    rng = np.random.default_rng(9)
+    parts = [rng.lognormal(2, 0.5, 500) for _ in range(4)]
+    merged = LatencyHistogram()
+    for part in parts:
+        shard = LatencyHistogram()
+        shard.record_many(part)
+        merged.merge(shard)
+    whole = LatencyHistogram()
+    whole.record_many(np.concatenate(parts))
+    
+    assert np.array_equal(merged.counts, whole.counts)
+    assert merged.count == 2000
+    assert merged.summary() == pytest.approx(whole.summary())
+
+def test_merge_keeps_empty_histograms_neutral():
+    histogram = LatencyHistogram()
+    histogram.record(5.0)
+    
+    histogram.merge(LatencyHistogram())
+    
+    assert histogram.summary()["min"] == 5.0
+    assert histogram.count == 1
+
+def test_merge_rejects_different_layouts():
+    with pytest.raises(ValueError):
+        LatencyHistogram(relative_accuracy=0.01).merge(LatencyHistogram(relative_accuracy=0.02))
+
+def test_empty_histogram_summary():
+    fields = latency_result_fields(LatencyHistogram())
+    
+    assert fields["avg_latency"] == 0.0
+    assert fields["min_latency"] == 0.0
+    assert fields["p99_latency"] == 0.0
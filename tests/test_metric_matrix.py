@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+from utils.data_manager import MetricMatrix
+
+def _catalog(**patterns):
+    return {
+        name: {"metrics": {metric: {"value": value} for metric, value in metrics.items()}}
+        for name, metrics in patterns.items()
+    }
+
+ARCH_DATA = _catalog(
+    a={"Throughput": 100, "Latency": 50, "Elasticity": 3},
+    b={"Throughput": 300, "Latency": 150, "Elasticity": 3},
+    c={"Throughput": 200, "Latency": 100, "Elasticity": 3}
+)
+
+def test_select_and_value():
+    matrix = MetricMatrix(ARCH_DATA)
+    
+    assert matrix.value("b", "Latency") == 150
+    assert matrix.value("b", "Unknown") == 0
+    assert matrix.select(["c", "a"], ["Latency", "Unknown"]).tolist() == [[100, 0], [50, 0]]
+
+def test_normalized_scores_best_pattern_highest():
+    scores = MetricMatrix(ARCH_DATA).normalized(metrics=["Throughput", "Latency", "Elasticity"])
+    
+    np.testing.assert_allclose(scores, [[0.0, 1.0, 1.0], [1.0, 0.0, 1.0], [0.5, 0.5, 1.0]])
+
+def test_normalized_over_selected_patterns():
+    scores = MetricMatrix(ARCH_DATA).normalized(patterns=["a", "c"], metrics=["Throughput"])
+    
+    assert scores[:, 0] == pytest.approx([0.0, 1.0])
+
+def test_values_are_read_only():
+    matrix = MetricMatrix(ARCH_DATA)
+    
+    with pytest.raises(ValueError):
+        matrix.values[0, 0] = 1
+
+def test_heat_map_shows_matrix_scores():
+    from utils.visualization import create_heat_map
+    
+    fig = create_heat_map(["a", "b", "c"], arch_data=ARCH_DATA)
+    
+    assert list(fig.data[0].x) == ["Throughput", "Latency", "Elasticity"]
+    np.testing.assert_allclose(fig.data[0].z, MetricMatrix(ARCH_DATA).normalized())
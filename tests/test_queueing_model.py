@@ -0,0 +1,64 @@
+import math
+import numpy as np
+import pytest
+from utils.queueing_model import erlang_c, evaluate_queue
+
+def _erlang_c_reference(c, a):
+    # Textbook formula, fine for small server counts
+    top = a ** c / math.factorial(c) * c / (c - a)
+    return top / (sum(a ** k / math.factorial(k) for k in range(c)) + top)
+
+@pytest.mark.parametrize("servers, traffic", [(1, 0.5), (2, 1.5), (5, 3.0), (10, 9.5)])
+def test_erlang_c_matches_formula(servers, traffic):
+    assert erlang_c(servers, traffic) == pytest.approx(_erlang_c_reference(servers, traffic))
+
+def test_erlang_c_single_server_is_utilization():
+    traffic = np.array([0.1, 0.5, 0.9])
+    
+    np.testing.assert_allclose(erlang_c(1, traffic), traffic)
+
+def test_erlang_c_edges_and_broadcasting():
+    result = erlang_c([4, 4, 4, 8], [0.0, 4.0, 6.0, 2.0])
+    
+    assert result[0] == 0.0
+    assert result[1] == 1.0
+    assert result[2] == 1.0
+    assert result[3] == pytest.approx(_erlang_c_reference(8, 2.0))
+
+def test_erlang_c_stays_finite_for_many_servers():
+    result = erlang_c(5000, 4900.0)
+    
+    assert np.isfinite(result)
+    assert 0 < result < 1
+
+def test_evaluate_queue_mm1_mean_latency():
+    # M/M/1: mean response time 1 / (mu - lambda)
+    queue = evaluate_queue(1, 10.0, 50.0)
+    
+    assert queue["utilization"] == pytest.approx(0.5)
+    assert queue["throughput"] == pytest.approx(50.0)
+    assert queue["wait_probability"] == pytest.approx(0.5)
+    assert queue["mean_latency"] == pytest.approx(1000 / (100 - 50))
+
+def test_evaluate_queue_variability_scales_waiting():
+    poisson = evaluate_queue(4, 20.0, 150.0)
+    smooth = evaluate_queue(4, 20.0, 150.0, service_cv=0.0, arrival_cv=0.0)
+    
+    poisson_wait = poisson["mean_latency"] - 20.0
+    assert smooth["mean_latency"] - 20.0 == pytest.approx(0.0)
+    assert poisson_wait > 0
+    assert evaluate_queue(4, 20.0, 150.0, service_cv=2.0)["mean_latency"] - 20.0 == pytest.approx(2.5 * poisson_wait)
+
+def test_evaluate_queue_overload():
+    queue = evaluate_queue(2, 100.0, [10.0, 30.0])
+    
+    assert queue["throughput"].tolist() == pytest.approx([10.0, 20.0])
+    assert queue["utilization"][1] == 1.0
+    assert np.isinf(queue["mean_latency"][1])
+    assert np.isinf(queue["p99_latency"][1])
+
+def test_evaluate_queue_tails_are_ordered():
+    queue = evaluate_queue(8, 25.0, np.linspace(10, 300, 10))
+    
+    assert np.all(queue["p99_latency"] > queue["p95_latency"])
+    assert np.all(np.diff(queue["mean_latency"]) > 0)
@@ -0,0 +1,55 @@
+import threading
+import time
+import pytest
+from utils.resource_monitor import PROC_AVAILABLE, LoadGeneratorMonitor, build_saturation_report
+
+pytestmark = pytest.mark.skipif(not PROC_AVAILABLE, reason="needs /proc")
+
+def _burn(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+def _monitored_run(burn_in_run):
+    # One thread stands in for the run's worker; CPU burns either in it or on an unrelated thread
+    worker_ready = threading.Event()
+    
+    def worker(monitor):
+        monitor.add_thread()
+        worker_ready.set()
+        if burn_in_run:
+            _burn(1.0)
+        else:
+            time.sleep(1.0)
+    
+    bystander = threading.Thread(target=_burn, args=(1.0,), daemon=True)
+    with LoadGeneratorMonitor(interval=0.05) as monitor:
+        run = threading.Thread(target=worker, args=(monitor,))
+        run.start()
+        worker_ready.wait()
+        if not burn_in_run:
+            bystander.start()
+        run.join()
+        if not burn_in_run:
+            bystander.join()
+    return monitor.report(concurrency=1)
+
+def test_unrelated_threads_are_not_charged_to_the_run():
+    report = _monitored_run(burn_in_run=False)
+    
+    assert report["cpu_cores"] < 0.2
+    assert not report["saturated"]
+
+def test_run_threads_are_counted():
+    report = _monitored_run(burn_in_run=True)
+    
+    assert report["cpu_cores"] > 0.6
+
+def test_saturation_report_suggests_more_processes():
+    report = build_saturation_report(cpu_cores=0.95, peak_cpu_cores=1.0, available=8, run_queue_ratio=0.0,
+                                     loop_lag_p99=None, timer_lag_p99=None, concurrency=100)
+    
+    assert report["saturated"]
+    assert report["suggested_processes"] == 2
+    assert report["suggested_concurrency_per_process"] == 50
+    assert not build_saturation_report(0.3, 0.4, 8, 0.0, 5.0, 5.0, 100)["saturated"]
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+from utils.run_history import (
+    get_latest_runs, get_metric_history, get_rolling_median, record_run, record_runs, scalar_summary
+)
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "run_history.db")
+
+def test_record_and_read_back_a_run(db_path):
+    run_id = record_run("A", {"Latency": 12.5, "Throughput": np.float64(300), "Skipped": None},
+                        test_type="Local Target Test", parameters={"engine": "asyncio", "concurrency": np.int64(20)},
+                        summary={"p99": 40.0}, timestamp=1000.0, db_path=db_path)
+    
+    [run] = get_latest_runs(db_path=db_path)
+    assert run["id"] == run_id
+    assert run["pattern"] == "A"
+    assert run["timestamp"] == 1000.0
+    assert run["test_type"] == "Local Target Test"
+    assert run["parameters"] == {"engine": "asyncio", "concurrency": 20}
+    assert run["summary"] == {"p99": 40.0}
+    assert run["metrics"] == {"Latency": 12.5, "Throughput": 300.0}
+
+def test_latest_runs_newest_first_with_filter_and_limit(db_path):
+    record_runs([
+        {"pattern": "A", "metrics": {"Latency": 1}, "timestamp": 1.0},
+        {"pattern": "B", "metrics": {"Latency": 2}, "timestamp": 2.0},
+        {"pattern": "A", "metrics": {"Latency": 3}, "timestamp": 3.0}
+    ], db_path=db_path)
+    
+    assert [run["timestamp"] for run in get_latest_runs(db_path=db_path)] == [3.0, 2.0, 1.0]
+    assert [run["metrics"]["Latency"] for run in get_latest_runs("A", db_path=db_path)] == [3.0, 1.0]
+    assert len(get_latest_runs(limit=2, db_path=db_path)) == 2
+    assert get_latest_runs("C", db_path=db_path) == []
+
+def test_metric_history_filters(db_path):
+    record_runs([
+        {"pattern": "A", "metrics": {"Latency": 10, "Throughput": 100}, "timestamp": 10.0},
+        {"pattern": "A", "metrics": {"Latency": 20, "Throughput": 200}, "timestamp": 20.0},
+        {"pattern": "B", "metrics": {"Latency": 30}, "timestamp": 30.0},
+        {"pattern": "A", "metrics": {"Latency": 40}, "timestamp": 40.0}
+    ], db_path=db_path)
+    
+    history = get_metric_history("A", ["Latency"], start=15.0, end=40.0, db_path=db_path)
+    
+    assert history["value"].tolist() == [20.0, 40.0]
+    assert set(history["metric"]) == {"Latency"}
+    assert str(history["timestamp"].dtype).startswith("datetime64")
+    assert len(get_metric_history(db_path=db_path)) == 6
+    assert get_metric_history("C", db_path=db_path).empty
+
+def test_rolling_median(db_path):
+    record_runs([
+        {"pattern": "A", "metrics": {"Latency": value}, "timestamp": float(i)}
+        for i, value in enumerate([10, 50, 20, 30, 1000])
+    ], db_path=db_path)
+    
+    history = get_rolling_median("A", "Latency", window=3, db_path=db_path)
+    
+    assert history["value"].tolist() == [10, 50, 20, 30, 1000]
+    assert history["rolling_median"].tolist() == [10, 30, 20, 30, 30]
+
+def test_scalar_summary_drops_nested_fields():
+    summary = scalar_summary({"throughput": np.float64(5.5), "aborted": False, "error": None,
+                              "timeline": [1, 2], "histogram": {"p50": 1}})
+    
+    assert summary == {"throughput": 5.5, "aborted": False, "error": None}
+    assert isinstance(summary["throughput"], float)
+    assert scalar_summary(None) is None
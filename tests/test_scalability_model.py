@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+from utils.data_manager import get_default_patterns, load_architecture_data, save_architecture_data, save_scalability_fit
+from utils.scalability_model import (
+    _solve_usl, compute_scaling_curves, fit_usl, get_concurrency_model, get_usl_parameters,
+    predict_concurrency_throughput, usl_throughput
+)
+
+PATTERN = "Monolithic Architecture"
+
+def _sweep(loads, lam, sigma, kappa):
+    return [{"concurrency": load, "successful_throughput": float(usl_throughput(load, lam, sigma, kappa))}
+            for load in loads]
+
+def test_solve_usl_recovers_exact_coefficients():
+    loads = np.array([1.0, 2.0, 4.0, 8.0, 16.0])
+    throughput = usl_throughput(loads, 200.0, 0.1, 0.01)
+    
+    coefficients = _solve_usl(loads, throughput, [0, 1, 2])
+    
+    assert coefficients == pytest.approx([1 / 200.0, 0.1 / 200.0, 0.01 / 200.0])
+
+def test_solve_usl_leaves_dropped_terms_at_zero():
+    loads = np.array([1.0, 2.0, 4.0, 8.0])
+    throughput = usl_throughput(loads, 100.0, 0.2, 0.0)
+    
+    coefficients = _solve_usl(loads, throughput, [0, 1])
+    
+    assert coefficients[2] == 0
+    assert coefficients[:2] == pytest.approx([1 / 100.0, 0.2 / 100.0])
+
+def test_fit_usl_recovers_parameters_and_peak():
+    fit = fit_usl(_sweep([1, 2, 4, 8, 16, 32, 64], 150.0, 0.05, 0.001))
+    
+    assert fit["lambda"] == pytest.approx(150.0)
+    assert fit["sigma"] == pytest.approx(0.05)
+    assert fit["kappa"] == pytest.approx(0.001)
+    assert fit["r_squared"] == pytest.approx(1.0)
+    assert fit["points"] == 7
+    assert fit["peak_load"] == pytest.approx(np.sqrt(0.95 / 0.001))
+    assert fit["peak_throughput"] == pytest.approx(float(usl_throughput(fit["peak_load"], 150.0, 0.05, 0.001)))
+
+def test_fit_usl_drops_negative_terms():
+    # Linear scaling has neither contention nor coherency cost
+    fit = fit_usl(_sweep([1, 2, 4, 8], 100.0, 0.0, 0.0))
+    
+    assert fit["sigma"] >= 0
+    assert fit["kappa"] >= 0
+    assert fit["lambda"] == pytest.approx(100.0)
+    assert fit["peak_load"] is None
+    assert fit["peak_throughput"] is None
+
+def test_fit_usl_needs_three_points():
+    with pytest.raises(ValueError):
+        fit_usl(_sweep([1, 2], 100.0, 0.1, 0.0))
+
+def test_concurrency_fit_does_not_replace_node_model(data_dir):
+    save_architecture_data(get_default_patterns())
+    node_model = get_usl_parameters(PATTERN)
+    fit = fit_usl(_sweep([1, 4, 16, 64], 40.0, 0.2, 0.005))
+    
+    save_scalability_fit(PATTERN, fit)
+    
+    assert get_usl_parameters(PATTERN) == node_model
+    stored = load_architecture_data()[PATTERN]["usl_concurrency"]
+    assert stored["lambda"] == pytest.approx(40.0)
+    assert stored["fit"]["points"] == 4
+
+def test_scaling_curves_split_each_node_into_useful_work_and_overhead():
+    arch_data = get_default_patterns()
+    parameters = get_usl_parameters(PATTERN, arch_data)
+    
+    curves = compute_scaling_curves([PATTERN], max_nodes=16, arch_data=arch_data)
+    
+    assert curves["Nodes"].tolist() == list(range(1, 17))
+    single = curves.iloc[0]
+    assert single["Efficiency"] == pytest.approx(100)
+    assert single["Utilization"] == pytest.approx(parameters["utilization"])
+    assert single["Overhead"] == pytest.approx(0)
+    np.testing.assert_allclose(curves["Utilization"] + curves["Overhead"], parameters["utilization"])
+    assert curves["Overhead"].is_monotonic_increasing
+    np.testing.assert_allclose(curves["Throughput"],
+                               usl_throughput(curves["Nodes"], parameters["lambda"], parameters["sigma"],
+                                              parameters["kappa"]))
+
+def test_stored_concurrency_fit_predicts_without_load(data_dir):
+    save_architecture_data(get_default_patterns())
+    assert get_concurrency_model(PATTERN) is None
+    save_scalability_fit(PATTERN, fit_usl(_sweep([1, 4, 16, 64], 40.0, 0.2, 0.005)))
+    
+    prediction = predict_concurrency_throughput(PATTERN, [8, 32])
+    
+    np.testing.assert_allclose(prediction["throughput"], usl_throughput([8, 32], 40.0, 0.2, 0.005), rtol=1e-6)
+    assert prediction["peak_concurrency"] == 13
+    assert prediction["peak_throughput"] == pytest.approx(float(usl_throughput(13, 40.0, 0.2, 0.005)), rel=1e-6)
+    with pytest.raises(KeyError):
+        predict_concurrency_throughput("Serverless Architecture", 8)
@@ -0,0 +1,77 @@
+import json
+from collections import Counter
+import pytest
+from utils.scenario import ScenarioMix, read_scenario, validate_scenario
+from utils.test_runner import run_throughput_test
+
+def _write_scenario(tmp_path, lines):
+    path = tmp_path / "scenario.jsonl"
+    path.write_text("\n".join(line if isinstance(line, str) else json.dumps(line) for line in lines) + "\n")
+    return str(path)
+
+def test_read_scenario_parses_requests(tmp_path):
+    path = _write_scenario(tmp_path, [
+        "# browse and order",
+        "",
+        {"path": "/items?page=2"},
+        {"path": "/orders", "method": "post", "body": {"sku": 1}, "weight": 0.5, "name": "order"}
+    ])
+    
+    requests = list(read_scenario(path, "http://shop.local:8080/api/"))
+    
+    assert [request["name"] for request in requests] == ["GET /items?page=2", "order"]
+    assert requests[0]["url"] == "http://shop.local:8080/items?page=2"
+    assert requests[0]["target"] == "/items?page=2"
+    assert requests[0]["body"] == b""
+    assert requests[1]["method"] == "POST"
+    assert requests[1]["body"] == b'{"sku": 1}'
+    assert requests[1]["headers"] == {"Content-Type": "application/json"}
+    assert requests[1]["weight"] == 0.5
+
+@pytest.mark.parametrize("line", ['{"path": "/a"', '{"method": "GET"}', '{"path": "/a", "weight": -1}'])
+def test_read_scenario_reports_the_bad_line(tmp_path, line):
+    path = _write_scenario(tmp_path, [{"path": "/ok"}, line])
+    
+    with pytest.raises(ValueError, match=":2:"):
+        list(read_scenario(path))
+
+def test_same_origin_rejects_other_hosts(tmp_path):
+    path = _write_scenario(tmp_path, [{"path": "/local"}, {"path": "http://other.local/remote"}])
+    
+    assert validate_scenario(path, "http://shop.local/") == 2
+    with pytest.raises(ValueError, match=":2:.*other.local"):
+        validate_scenario(path, "http://shop.local/", same_origin=True)
+
+def test_same_origin_accepts_explicit_default_port(tmp_path):
+    path = _write_scenario(tmp_path, [{"path": "https://shop.local:443/checkout"}])
+    
+    assert validate_scenario(path, "https://SHOP.local/", same_origin=True) == 1
+
+def test_scenario_mix_follows_weights(tmp_path):
+    path = _write_scenario(tmp_path, [{"path": "/heavy", "weight": 3}, {"path": "/light"}, {"path": "/off", "weight": 0}])
+    mix = ScenarioMix(path, "http://shop.local/", buffer_size=64, seed=7)
+    
+    counts = Counter(next(mix)["name"] for _ in range(4000))
+    
+    assert "GET /off" not in counts
+    assert counts["GET /heavy"] / counts["GET /light"] == pytest.approx(3, rel=0.1)
+
+def test_scenario_mix_interleaves_entries(tmp_path):
+    path = _write_scenario(tmp_path, [{"path": "/a", "weight": 50}, {"path": "/b", "weight": 50}])
+    mix = ScenarioMix(path, buffer_size=100, seed=1)
+    
+    first = [next(mix)["name"] for _ in range(20)]
+    
+    assert len(set(first)) == 2
+
+def test_scenario_mix_needs_a_positive_weight(tmp_path):
+    path = _write_scenario(tmp_path, [{"path": "/a", "weight": 0}])
+    
+    with pytest.raises(ValueError, match="positive weight"):
+        next(ScenarioMix(path))
+
+def test_asyncio_engine_rejects_cross_origin_scenarios_before_sending(tmp_path):
+    path = _write_scenario(tmp_path, [{"path": "/a"}, {"path": "http://other.local/b"}])
+    
+    with pytest.raises(ValueError, match="same host"):
+        run_throughput_test("http://127.0.0.1:9/", duration=1, concurrency=1, engine="asyncio", scenario=path)
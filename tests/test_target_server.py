@@ -0,0 +1,63 @@
+import pytest
+from utils.data_manager import get_default_patterns, load_architecture_data, save_architecture_data, save_test_results
+from utils.target_server import get_server_profile
+from utils.test_runner import rescale_local_target_metrics
+
+PATTERN = "Monolithic Architecture"
+
+def test_profile_scales_service_time_and_capacity():
+    arch_data = get_default_patterns()
+    metrics = arch_data[PATTERN]["metrics"]
+    
+    profile = get_server_profile(PATTERN, arch_data, time_scale=0.1)
+    
+    assert profile["mean_latency_ms"] == pytest.approx(metrics["Latency"]["value"] * 0.1)
+    assert profile["capacity"] == pytest.approx(metrics["Throughput"]["value"] / 0.1)
+    assert profile["time_scale"] == 0.1
+
+def test_rescale_inverts_time_scale():
+    results = {"Latency": 12.0, "Throughput": 800.0, "Availability": 99.5}
+    
+    rescaled = rescale_local_target_metrics(results, 0.1)
+    
+    assert rescaled["Latency"] == pytest.approx(120.0)
+    assert rescaled["Throughput"] == pytest.approx(80.0)
+    assert rescaled["Availability"] == 99.5
+    assert results["Latency"] == 12.0
+
+def test_saved_local_target_results_do_not_drift(data_dir):
+    save_architecture_data(get_default_patterns())
+    first = get_server_profile(PATTERN, time_scale=0.1)
+    
+    # A local target that performs exactly as its profile says, run and saved a few times
+    for _ in range(3):
+        profile = get_server_profile(PATTERN, time_scale=0.1)
+        measured = {"Latency": profile["mean_latency_ms"], "Throughput": profile["capacity"]}
+        save_test_results(PATTERN, rescale_local_target_metrics(measured, profile["time_scale"]))
+    
+    last = get_server_profile(PATTERN, time_scale=0.1)
+    assert last["mean_latency_ms"] == pytest.approx(first["mean_latency_ms"])
+    assert last["capacity"] == pytest.approx(first["capacity"])
+    assert load_architecture_data()[PATTERN]["metrics"]["Latency"]["value"] == pytest.approx(
+        get_default_patterns()[PATTERN]["metrics"]["Latency"]["value"])
+
+def test_local_target_comparison_reports_unscaled_metrics(data_dir, monkeypatch):
+    from utils import test_runner
+    
+    save_architecture_data(get_default_patterns())
+    metrics = get_default_patterns()[PATTERN]["metrics"]
+    run_custom_test_plan = test_runner.run_custom_test_plan
+    
+    def measure_as_profiled(**kwargs):
+        # Start the real local target, but report what its profile promises instead of load testing it
+        if kwargs.get("local_target"):
+            return run_custom_test_plan(**kwargs)
+        profile = get_server_profile(PATTERN, time_scale=0.1)
+        return {"Latency": profile["mean_latency_ms"], "Throughput": profile["capacity"]}
+    
+    monkeypatch.setattr(test_runner, "run_custom_test_plan", measure_as_profiled)
+    
+    trial = test_runner._run_local_target_trial(PATTERN, "asyncio", 0.1, 0.95)
+    
+    assert trial["metrics"]["Latency"]["mean"] == pytest.approx(metrics["Latency"]["value"])
+    assert trial["metrics"]["Throughput"]["mean"] == pytest.approx(metrics["Throughput"]["value"])
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+from utils.metrics_analyzer import get_best_pattern_from_trials
+from utils.test_runner import _t_critical, simulate_test_trials, summarize_trials
+
+def test_t_critical_matches_tables():
+    assert _t_critical(0.95, 5) == pytest.approx(2.5706, abs=0.005)
+    assert _t_critical(0.95, 30) == pytest.approx(2.0423, abs=0.001)
+    assert _t_critical(0.99, 100) == pytest.approx(2.6259, abs=0.001)
+
+def test_summarize_trials_reports_interval_of_the_mean():
+    samples = np.random.default_rng(3).normal(50, 10, 2000)
+    
+    stats = summarize_trials(samples, 0.95)
+    
+    half_width = _t_critical(0.95, 1999) * stats["std"] / np.sqrt(2000)
+    assert stats["ci_high"] - stats["ci_low"] == pytest.approx(2 * half_width)
+    assert stats["ci_low"] < 50 < stats["ci_high"]
+    # The spread of single outcomes is far wider than the uncertainty of their mean
+    assert stats["spread_low"] == pytest.approx(50 - 1.96 * 10, abs=1.5)
+    assert stats["spread_high"] == pytest.approx(50 + 1.96 * 10, abs=1.5)
+
+def test_summarize_trials_interval_covers_the_true_mean():
+    rng = np.random.default_rng(11)
+    covered = sum(
+        stats["ci_low"] <= 5 <= stats["ci_high"]
+        for stats in (summarize_trials(rng.exponential(5, 200), 0.95) for _ in range(400))
+    )
+    
+    assert 0.92 <= covered / 400 <= 0.98
+
+def test_summarize_trials_constant_samples():
+    stats = summarize_trials(np.full(100, 3.0))
+    
+    assert stats["std"] == 0
+    assert stats["ci_low"] == stats["ci_high"] == stats["spread_low"] == stats["spread_high"] == 3.0
+    assert summarize_trials(np.array([7.0]))["ci_low"] == 7.0
+
+def _trials(**means):
+    return {
+        pattern: {"trials": 1000, "confidence": 0.95, "metrics": {"Latency": summarize_trials(np.asarray(samples))}}
+        for pattern, samples in means.items()
+    }
+
+def test_best_pattern_significance():
+    rng = np.random.default_rng(5)
+    separated = _trials(fast=rng.normal(100, 20, 1000), slow=rng.normal(110, 20, 1000))
+    tied = _trials(fast=rng.normal(100, 20, 1000), slow=rng.normal(100.1, 20, 1000))
+    
+    best = get_best_pattern_from_trials(separated, "Latency")
+    assert best["pattern"] == "fast"
+    assert best["runner_up"] == "slow"
+    assert best["significant"] is True
+    assert get_best_pattern_from_trials(tied, "Latency")["significant"] is False
+
+def test_constant_metrics_get_no_verdict(data_dir):
+    results = {
+        pattern: simulate_test_trials(pattern, trials=500, seed=1)
+        for pattern in ("Monolithic Architecture", "Microservices Architecture")
+    }
+    
+    assert results["Monolithic Architecture"]["metrics"]["Elasticity"]["std"] == 0
+    assert get_best_pattern_from_trials(results, "Elasticity")["significant"] is None
+    assert get_best_pattern_from_trials(results, "Latency")["significant"] is not None
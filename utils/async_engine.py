@@ -0,0 +1,635 @@
+import asyncio
+import socket
+import ssl
+import time
+from urllib.parse import urlsplit
+from utils.latency_histogram import LatencyHistogram, new_phase_histograms
+from utils.scenario import record_endpoint
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# Engines accepted by the test runner
+ENGINES = ("threads", "asyncio")
+
+USER_AGENT = "pattern-scale-loadgen"
+
+def parse_url(url):
+    """
+    Split a URL into the pieces needed to open a raw HTTP connection
+
+    Args:
+        url (str): URL to parse
+
+    Returns:
+        dict: Scheme, host, port, request target and Host header value
+    """
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower() or "http"
+    if scheme not in ("http", "https"):
+        raise ValueError(f"Unsupported URL scheme: {scheme}")
+
+    default_port = 443 if scheme == "https" else 80
+    port = parts.port or default_port
+    host = parts.hostname
+    if not host:
+        raise ValueError(f"URL has no host: {url}")
+
+    target = parts.path or "/"
+    if parts.query:
+        target += "?" + parts.query
+
+    host_header = host if port == default_port else f"{host}:{port}"
+
+    return {
+        "scheme": scheme,
+        "host": host,
+        "port": port,
+        "target": target,
+        "host_header": host_header
+    }
+
+def raise_fd_limit(required):
+    """
+    Raise the soft open-file limit so thousands of sockets can be held at once
+
+    Args:
+        required (int): Number of file descriptors the test needs
+
+    Returns:
+        int: The soft limit in effect after the call
+    """
+    if resource is None:
+        return required
+
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft >= required:
+        return soft
+
+    new_soft = required if hard == resource.RLIM_INFINITY else min(required, hard)
+    try:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (new_soft, hard))
+    except (ValueError, OSError):
+        return soft
+    return new_soft
+
+async def open_connection(url_parts, phases=None):
+    """
+    Open a TCP (and TLS for https) connection to the target host
+
+    Name resolution, the TCP handshake and the TLS handshake are done as
+    separate steps so each can be timed.
+
+    Args:
+        url_parts (dict): Output of parse_url
+        phases (dict, optional): Per-phase histograms; receives the "dns",
+            "connect" and "tls" durations in ms
+
+    Returns:
+        tuple: asyncio StreamReader and StreamWriter
+    """
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter_ns()
+    addresses = await loop.getaddrinfo(url_parts["host"], url_parts["port"], type=socket.SOCK_STREAM)
+    resolved = time.perf_counter_ns()
+
+    # Try each resolved address in turn, as a plain connect by host name would
+    last_error = None
+    for *_, address in addresses:
+        try:
+            reader, writer = await asyncio.open_connection(address[0], address[1], limit=2 ** 20)
+            break
+        except OSError as e:
+            last_error = e
+    else:
+        raise last_error or ConnectionError(f"Could not resolve {url_parts['host']}")
+    connected = time.perf_counter_ns()
+
+    if url_parts["scheme"] == "https":
+        try:
+            await writer.start_tls(ssl.create_default_context(), server_hostname=url_parts["host"])
+        except BaseException:
+            close_connection(writer)
+            raise
+    handshaken = time.perf_counter_ns()
+
+    if phases is not None:
+        phases["dns"].record((resolved - start) / 1e6)
+        phases["connect"].record((connected - resolved) / 1e6)
+        if url_parts["scheme"] == "https":
+            phases["tls"].record((handshaken - connected) / 1e6)
+
+    return reader, writer
+
+def close_connection(writer):
+    """
+    Close a connection without waiting for the peer
+
+    Args:
+        writer (asyncio.StreamWriter): Writer of the connection to close
+    """
+    if writer is None:
+        return
+    try:
+        writer.close()
+    except Exception:
+        pass
+
+async def send_request(reader, writer, url_parts, method="GET", target=None, headers=None, body=b"", keep_body=False):
+    """
+    Send one HTTP/1.1 request on an open connection and read the full response
+
+    Args:
+        reader (asyncio.StreamReader): Connection reader
+        writer (asyncio.StreamWriter): Connection writer
+        url_parts (dict): Output of parse_url
+        method (str): HTTP method. Defaults to "GET".
+        target (str, optional): Request target. Defaults to the URL's own.
+        headers (dict, optional): Extra headers, overriding the defaults
+        body (bytes): Request body. Defaults to none.
+        keep_body (bool): Return the response headers and body instead of
+            discarding them. Defaults to False.
+
+    Returns:
+        dict: Status code, body size and whether the connection can be reused
+    """
+    request_headers = {
+        "host": ("Host", url_parts["host_header"]),
+        "user-agent": ("User-Agent", USER_AGENT),
+        "accept": ("Accept", "*/*"),
+        "connection": ("Connection", "keep-alive")
+    }
+    for name, value in (headers or {}).items():
+        request_headers[name.lower()] = (name, value)
+    if body or method in ("POST", "PUT", "PATCH"):
+        request_headers["content-length"] = ("Content-Length", str(len(body)))
+
+    request_head = f"{method} {target or url_parts['target']} HTTP/1.1\r\n" + "".join(
+        f"{name}: {value}\r\n" for name, value in request_headers.values()
+    ) + "\r\n"
+    writer.write(request_head.encode("latin-1") + body)
+    await writer.drain()
+
+    return await read_response(reader, method, keep_body=keep_body)
+
+async def read_response(reader, method="GET", keep_body=False):
+    """
+    Read an HTTP/1.1 response (status line, headers and body) from a stream
+
+    Args:
+        reader (asyncio.StreamReader): Connection reader
+        method (str): Method of the request the response belongs to
+        keep_body (bool): Also return the lower-cased headers and the
+            (de-chunked) body, e.g. to relay the response. Defaults to False.
+
+    Returns:
+        dict: Status code, body size, whether the connection can be reused
+            and the perf_counter_ns timestamp of the first response byte,
+            plus "headers" and "body" when keep_body is set
+    """
+    status_line = await reader.readline()
+    first_byte_ns = time.perf_counter_ns()
+    if not status_line:
+        raise ConnectionError("Connection closed before a response was received")
+
+    parts = status_line.decode("latin-1").split(None, 2)
+    if len(parts) < 2 or not parts[0].startswith("HTTP/"):
+        raise ConnectionError(f"Malformed status line: {status_line!r}")
+    version = parts[0]
+    status_code = int(parts[1])
+
+    # Parse headers
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed while reading headers")
+        if line in (b"\r\n", b"\n"):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    connection_header = headers.get("connection", "").lower()
+    if version == "HTTP/1.0":
+        keep_alive = connection_header == "keep-alive"
+    else:
+        keep_alive = connection_header != "close"
+
+    # Read body
+    body_size = 0
+    chunks = []
+    if method == "HEAD" or 100 <= status_code < 200 or status_code in (204, 304):
+        pass
+    elif "chunked" in headers.get("transfer-encoding", "").lower():
+        while True:
+            size_line = await reader.readline()
+            if not size_line:
+                raise ConnectionError("Connection closed inside a chunked body")
+            chunk_size = int(size_line.split(b";", 1)[0].strip() or b"0", 16)
+            if chunk_size == 0:
+                # Skip trailers
+                while True:
+                    trailer = await reader.readline()
+                    if trailer in (b"\r\n", b"\n", b""):
+                        break
+                break
+            chunk = await reader.readexactly(chunk_size + 2)
+            if keep_body:
+                chunks.append(chunk[:-2])
+            body_size += chunk_size
+    elif "content-length" in headers:
+        content_length = int(headers["content-length"])
+        if content_length:
+            chunks.append(await reader.readexactly(content_length))
+        body_size = content_length
+    else:
+        # Body is delimited by the server closing the connection
+        body = await reader.read()
+        chunks.append(body)
+        body_size = len(body)
+        keep_alive = False
+
+    response = {
+        "status_code": status_code,
+        "body_size": body_size,
+        "keep_alive": keep_alive,
+        "first_byte_ns": first_byte_ns
+    }
+    if keep_body:
+        response["headers"] = headers
+        response["body"] = b"".join(chunks)
+    return response
+
+class AsyncConnectionPool:
+    """
+    Bounded pool of keep-alive connections to a single origin
+
+    At most maxsize connections exist at once; acquire() hands out an idle
+    connection when one is available (a pool hit) and only opens a new one
+    otherwise. Every connection set-up and request made through the pool is
+    timed phase by phase into phases; reset_counters() clears them along with
+    the hit counters once warm-up is done.
+    """
+
+    def __init__(self, url_parts, maxsize):
+        self.url_parts = url_parts
+        self.maxsize = maxsize
+        self._idle = []
+        self._slots = asyncio.Semaphore(maxsize)
+        self.pool_hits = 0
+        self.new_connections = 0
+        self.phases = new_phase_histograms()
+
+    async def acquire(self):
+        await self._slots.acquire()
+        try:
+            if self._idle:
+                self.pool_hits += 1
+                return self._idle.pop()
+            connection = await open_connection(self.url_parts, self.phases)
+            self.new_connections += 1
+            return connection
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, connection, reusable=True):
+        if reusable and not connection[1].is_closing():
+            self._idle.append(connection)
+        else:
+            close_connection(connection[1])
+        self._slots.release()
+
+    async def prewarm(self, count=None):
+        """
+        Open count connections (default: maxsize) and park them as idle
+
+        Returns:
+            int: Number of connections opened
+        """
+        count = self.maxsize if count is None else min(count, self.maxsize)
+        results = await asyncio.gather(
+            *(open_connection(self.url_parts, self.phases) for _ in range(count - len(self._idle))),
+            return_exceptions=True
+        )
+        opened = [connection for connection in results if not isinstance(connection, BaseException)]
+        self._idle.extend(opened)
+        return len(opened)
+
+    def reset_counters(self):
+        self.pool_hits = 0
+        self.new_connections = 0
+        # Warm-up handshakes are not part of the load being measured
+        self.phases = new_phase_histograms()
+
+    def stats(self, warmed_connections):
+        return {
+            "pool_size": self.maxsize,
+            "warmed_connections": warmed_connections,
+            "pool_hits": self.pool_hits,
+            "new_connections": self.new_connections
+        }
+
+    def close(self):
+        for _, writer in self._idle:
+            close_connection(writer)
+        self._idle = []
+
+async def _timed_request(pool, timeout, request=None):
+    """
+    Issue one request on a pooled connection
+
+    Args:
+        pool (AsyncConnectionPool): Pool for the target origin
+        timeout (float): Per-request timeout in seconds
+        request (dict, optional): Scenario request to send instead of a GET
+            of the pool's URL
+
+    Returns:
+        dict: Latency in ms and status code
+    """
+    start_time = time.perf_counter_ns()
+    connection = None
+    try:
+        async with asyncio.timeout(timeout):
+            connection = await pool.acquire()
+            sent_time = time.perf_counter_ns()
+            if request is None:
+                response = await send_request(connection[0], connection[1], pool.url_parts)
+            else:
+                response = await send_request(connection[0], connection[1], pool.url_parts, request["method"],
+                                              request["target"], request["headers"], request["body"])
+    except BaseException:
+        if connection is not None:
+            pool.release(connection, reusable=False)
+        raise
+    end_time = time.perf_counter_ns()
+
+    pool.release(connection, reusable=response["keep_alive"])
+
+    # Waiting for (or opening) a connection, then the server's turnaround, then the body
+    pool.phases["pool_wait"].record((sent_time - start_time) / 1e6)
+    pool.phases["ttfb"].record((response["first_byte_ns"] - sent_time) / 1e6)
+    pool.phases["transfer"].record((end_time - response["first_byte_ns"]) / 1e6)
+
+    return {
+        "latency": (end_time - start_time) / 1e6,  # Convert to ms
+        "status_code": response["status_code"]
+    }
+
+async def _warm_pool(url, concurrency):
+    pool = AsyncConnectionPool(parse_url(url), concurrency)
+    warmed_connections = await pool.prewarm()
+    pool.reset_counters()
+    return pool, warmed_connections
+
+async def _latency_responses(url, num_requests, concurrency, timeout):
+    pool, warmed_connections = await _warm_pool(url, min(concurrency, num_requests))
+    remaining = iter(range(num_requests))
+
+    async def worker():
+        responses = []
+        # Workers share one iterator, so each request index is issued once
+        for _ in remaining:
+            try:
+                responses.append(await _timed_request(pool, timeout))
+            except Exception as e:
+                responses.append({
+                    "latency": None,
+                    "status_code": 0,
+                    "error": str(e)
+                })
+        return responses
+
+    try:
+        worker_responses = await asyncio.gather(*(worker() for _ in range(pool.maxsize)))
+    finally:
+        pool.close()
+
+    responses = [response for responses in worker_responses for response in responses]
+    return responses, pool.stats(warmed_connections), pool.phases
+
+def _stopped(stop_event):
+    return stop_event is not None and stop_event.is_set()
+
+async def _throughput_worker_results(url, duration, concurrency, timeout, stop_event, recorder, scenario):
+    pool, warmed_connections = await _warm_pool(url, concurrency)
+    loop = asyncio.get_running_loop()
+    end_time = loop.time() + duration
+    if recorder is not None:
+        recorder.restart()
+
+    # Recording on one event loop is already serialized, so all workers share one result dict and histogram
+    results = {
+        "requests": 0,
+        "successful_requests": 0,
+        "failed_requests": 0,
+        "latencies": LatencyHistogram(),
+        "endpoints": {}
+    }
+
+    async def worker():
+        while loop.time() < end_time and not _stopped(stop_event):
+            request = next(scenario) if scenario is not None else None
+            try:
+                response = await _timed_request(pool, timeout, request)
+
+                results["requests"] += 1
+                success = 200 <= response["status_code"] < 300
+                if success:
+                    results["successful_requests"] += 1
+                else:
+                    results["failed_requests"] += 1
+
+                results["latencies"].record(response["latency"])
+                if recorder is not None:
+                    recorder.record(response["latency"], success)
+                if request is not None:
+                    record_endpoint(results["endpoints"], request["name"], response["latency"], success)
+            except Exception:
+                results["requests"] += 1
+                results["failed_requests"] += 1
+                if recorder is not None:
+                    recorder.record(None, False)
+                if request is not None:
+                    record_endpoint(results["endpoints"], request["name"], None, False)
+
+    try:
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    finally:
+        pool.close()
+
+    return [results], pool.stats(warmed_connections), pool.phases
+
+async def _open_loop_results(url, offsets, duration, concurrency, timeout, stop_event, recorder, scenario):
+    pool, warmed_connections = await _warm_pool(url, concurrency)
+    in_flight = asyncio.Semaphore(concurrency)
+    results = {
+        "requests": 0,
+        "successful_requests": 0,
+        "failed_requests": 0,
+        "unsent_requests": 0,
+        "latencies": LatencyHistogram(),
+        "service_latencies": LatencyHistogram(),
+        "send_lag": LatencyHistogram(),
+        "endpoints": {}
+    }
+
+    schedule_start = time.perf_counter() + 0.05
+    end_time = schedule_start + duration
+    if recorder is not None:
+        recorder.restart()
+
+    async def fire(intended_start, send_time):
+        try:
+            send_lag = (send_time - intended_start) * 1000
+            results["send_lag"].record(send_lag)
+            results["requests"] += 1
+            request = next(scenario) if scenario is not None else None
+            try:
+                response = await _timed_request(pool, timeout, request)
+            except Exception:
+                results["failed_requests"] += 1
+                if recorder is not None:
+                    recorder.record(None, False)
+                if request is not None:
+                    record_endpoint(results["endpoints"], request["name"], None, False)
+                return
+
+            success = 200 <= response["status_code"] < 300
+            if success:
+                results["successful_requests"] += 1
+            else:
+                results["failed_requests"] += 1
+
+            # Latency counts from the intended send time, not the actual one
+            results["latencies"].record(send_lag + response["latency"])
+            results["service_latencies"].record(response["latency"])
+            if recorder is not None:
+                recorder.record(send_lag + response["latency"], success)
+            if request is not None:
+                record_endpoint(results["endpoints"], request["name"], send_lag + response["latency"], success)
+        finally:
+            in_flight.release()
+
+    # Arrivals become tasks only once they are due and a slot is free, so at most concurrency tasks
+    # exist however long the schedule; an arrival the dispatcher reaches late keeps its intended start
+    tasks = set()
+    try:
+        for sent, offset in enumerate(offsets):
+            if _stopped(stop_event):
+                break
+            intended_start = schedule_start + offset
+            delay = intended_start - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await in_flight.acquire()
+            send_time = time.perf_counter()
+            if send_time >= end_time:
+                # The generator fell so far behind that the rest of the schedule missed the test window
+                in_flight.release()
+                results["unsent_requests"] += len(offsets) - sent
+                break
+            task = asyncio.create_task(fire(intended_start, send_time))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        await asyncio.gather(*tasks)
+    finally:
+        pool.close()
+
+    return [results], pool.stats(warmed_connections), pool.phases
+
+async def _watched(coroutine, monitor):
+    # Let a LoadGeneratorMonitor probe the lag of the loop the test runs on and count its thread's CPU
+    if monitor is None:
+        return await coroutine
+    monitor.add_thread()
+    monitor.watch_loop(asyncio.get_running_loop())
+    try:
+        return await coroutine
+    finally:
+        monitor.unwatch_loop()
+
+def run_latency_requests(url, num_requests, concurrency, timeout=10):
+    """
+    Issue num_requests GET requests from a single event loop
+
+    Each of the concurrency workers is a coroutine drawing keep-alive
+    connections from a pool that is sized to the concurrency and opened
+    before timing starts, so thousands of requests can be in flight from
+    one thread without handshakes landing in the measured latency.
+
+    Args:
+        url (str): URL to test
+        num_requests (int): Number of requests to make
+        concurrency (int): Number of concurrent in-flight requests
+        timeout (float): Per-request timeout in seconds. Defaults to 10.
+
+    Returns:
+        tuple: List of per-request dicts with "latency" (ms or None) and
+            "status_code", the pool statistics for the timed window, and the
+            per-phase timing histograms
+    """
+    raise_fd_limit(concurrency + 64)
+    return asyncio.run(_latency_responses(url, num_requests, concurrency, timeout))
+
+def run_throughput_workers(url, duration, concurrency, timeout=5, stop_event=None, recorder=None,
+                           scenario=None, monitor=None):
+    """
+    Run concurrency closed-loop workers on a single event loop for duration seconds
+
+    Args:
+        url (str): URL to test
+        duration (int): Duration of the test in seconds
+        concurrency (int): Number of concurrent workers
+        timeout (float): Per-request timeout in seconds. Defaults to 5.
+        stop_event (threading.Event, optional): Set to end the test early
+        recorder (IntervalRecorder, optional): Receives every finished request
+        scenario (ScenarioMix, optional): Requests to send instead of GETs of url
+        monitor (LoadGeneratorMonitor, optional): Measures the event loop's
+            lag and its thread's CPU use
+
+    Returns:
+        tuple: A one-element list with the result dict shared by all workers,
+            in the same shape as a thread engine worker's, the pool statistics
+            for the timed window, and the per-phase timing histograms
+    """
+    raise_fd_limit(concurrency + 64)
+    return asyncio.run(_watched(
+        _throughput_worker_results(url, duration, concurrency, timeout, stop_event, recorder, scenario),
+        monitor
+    ))
+
+def run_open_loop_workers(url, offsets, duration, concurrency, timeout=5, stop_event=None, recorder=None,
+                          scenario=None, monitor=None):
+    """
+    Send requests at scheduled offsets regardless of when responses come back
+
+    A dispatcher starts a task for each scheduled arrival once it is due and
+    one of the concurrency in-flight slots is free, so only in-flight
+    requests hold a task. Any wait for a free slot shows up as send lag and
+    is added to the reported latency.
+
+    Args:
+        url (str): URL to test
+        offsets (list): Intended send times in seconds from the start of the test
+        duration (int): Duration of the test in seconds
+        concurrency (int): Maximum number of in-flight requests
+        timeout (float): Per-request timeout in seconds. Defaults to 5.
+        stop_event (threading.Event, optional): Set to stop scheduling new sends
+        recorder (IntervalRecorder, optional): Receives every finished request
+        scenario (ScenarioMix, optional): Requests to send instead of GETs of url
+        monitor (LoadGeneratorMonitor, optional): Measures the event loop's
+            lag and its thread's CPU use
+
+    Returns:
+        tuple: A one-element list with the open-loop result dict, the pool
+            statistics for the timed window, and the per-phase timing histograms
+    """
+    raise_fd_limit(concurrency + 64)
+    return asyncio.run(_watched(
+        _open_loop_results(url, offsets, duration, concurrency, timeout, stop_event, recorder, scenario),
+        monitor
+    ))
@@ -0,0 +1,126 @@
+import math
+
+# Adaptive concurrency algorithms accepted by run_adaptive_concurrency_test
+CONTROLLERS = ("aimd", "gradient")
+
+class AIMDController:
+    """
+    Additive-increase / multiplicative-decrease concurrency limit
+
+    The limit grows by a fixed step after every window whose latency stays
+    within latency_tolerance times the lowest latency seen so far (the
+    no-load latency estimate) and whose error rate stays within bounds;
+    otherwise it is cut by the backoff factor.
+    """
+
+    def __init__(self, initial=4, min_limit=1, max_limit=1024, increase=4, backoff=0.75, latency_tolerance=1.3,
+                 max_error_rate=1.0):
+        self.limit = initial
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.max_error_rate = max_error_rate
+        self.min_latency = None
+
+    def update(self, latency, error_rate):
+        """
+        Adjust the limit after a measurement window
+
+        Args:
+            latency (float): Mean latency of the window in ms
+            error_rate (float): Error rate of the window in %
+
+        Returns:
+            tuple: New limit and the action taken ("increase", "decrease" or "hold")
+        """
+        if latency > 0:
+            self.min_latency = latency if self.min_latency is None else min(self.min_latency, latency)
+
+        # Until a window with a positive latency sets the baseline, only errors count as overload
+        latency_high = self.min_latency is not None and latency > self.latency_tolerance * self.min_latency
+        if error_rate > self.max_error_rate or latency_high:
+            new_limit = max(self.min_limit, int(self.limit * self.backoff))
+        else:
+            new_limit = min(self.max_limit, self.limit + self.increase)
+
+        action = "hold" if new_limit == self.limit else ("increase" if new_limit > self.limit else "decrease")
+        self.limit = new_limit
+        return new_limit, action
+
+class GradientController:
+    """
+    Gradient concurrency limit (in the style of Netflix's Gradient2)
+
+    The ratio of a slow-moving average latency to the latest window's
+    latency, clamped to [0.5, 1], scales the limit down as queueing builds
+    up; a headroom of sqrt(limit) keeps probing for more. The result is
+    smoothed so a single noisy window does not swing the limit.
+    """
+
+    def __init__(self, initial=4, min_limit=1, max_limit=1024, smoothing=0.5, long_window=8, tolerance=1.5,
+                 max_error_rate=1.0):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.smoothing = smoothing
+        self.long_window = long_window
+        self.tolerance = tolerance
+        self.max_error_rate = max_error_rate
+        self.long_latency = None
+
+    def update(self, latency, error_rate):
+        """
+        Adjust the limit after a measurement window
+
+        Args:
+            latency (float): Mean latency of the window in ms
+            error_rate (float): Error rate of the window in %
+
+        Returns:
+            tuple: New (whole) limit and the action taken
+        """
+        previous = int(round(self.limit))
+        if self.long_latency is None:
+            self.long_latency = latency
+        else:
+            # Exponential average over roughly long_window windows
+            self.long_latency += (latency - self.long_latency) / self.long_window
+
+        if error_rate > self.max_error_rate or latency <= 0:
+            gradient = 0.5
+        else:
+            gradient = max(0.5, min(1.0, self.tolerance * self.long_latency / latency))
+        target = self.limit * gradient + math.sqrt(self.limit)
+        self.limit = (1 - self.smoothing) * self.limit + self.smoothing * target
+        self.limit = min(max(self.limit, self.min_limit), self.max_limit)
+
+        if gradient < 1.0:
+            # Let the average follow a lower operating point instead of anchoring on old latencies
+            self.long_latency *= 0.9
+
+        new_limit = int(round(self.limit))
+        action = "hold" if new_limit == previous else ("increase" if new_limit > previous else "decrease")
+        return new_limit, action
+
+def create_controller(algorithm, initial=4, min_limit=1, max_limit=1024, max_error_rate=1.0):
+    """
+    Build an adaptive concurrency controller
+
+    Args:
+        algorithm (str): "aimd" or "gradient"
+        initial (int): Starting limit. Defaults to 4.
+        min_limit (int): Lowest limit. Defaults to 1.
+        max_limit (int): Highest limit. Defaults to 1024.
+        max_error_rate (float): Error rate in % that counts as overload.
+            Defaults to 1.0.
+
+    Returns:
+        AIMDController or GradientController: Controller with an update method
+    """
+    if algorithm == "aimd":
+        return AIMDController(initial, min_limit, max_limit, max_error_rate=max_error_rate)
+    if algorithm == "gradient":
+        return GradientController(initial, min_limit, max_limit, max_error_rate=max_error_rate)
+    raise ValueError(f"Unknown concurrency controller '{algorithm}', expected one of {', '.join(CONTROLLERS)}")
@@ -0,0 +1,112 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+
+def create_session_pool(concurrency):
+    """
+    Create a requests Session backed by a bounded keep-alive connection pool
+
+    The pool holds at most one connection per concurrent worker and blocks
+    instead of opening overflow connections, so every request in a test
+    reuses one of a fixed set of sockets.
+
+    Args:
+        concurrency (int): Number of concurrent workers sharing the session
+
+    Returns:
+        requests.Session: Session with the pooled adapter mounted for http and https
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=concurrency,
+        pool_block=True,
+        max_retries=0
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def _get_connection_pools(session, url):
+    # requests keys pools on TLS settings as well as the host, so collect every
+    # pool the adapter holds; a session serves exactly one test
+    pools = session.get_adapter(url).poolmanager.pools
+    return [pools[key] for key in pools.keys()]
+
+def get_pool_counters(session, url):
+    """
+    Read the urllib3 counters of the pool serving url
+
+    Args:
+        session (requests.Session): Session created by create_session_pool
+        url (str): URL under test
+
+    Returns:
+        dict: Number of requests sent and connections opened by the pool so far
+    """
+    pools = _get_connection_pools(session, url)
+    return {
+        "requests": sum(pool.num_requests for pool in pools),
+        "new_connections": sum(pool.num_connections for pool in pools)
+    }
+
+def prewarm_session_pool(session, url, concurrency, timeout=10):
+    """
+    Open the pool's connections before timing starts
+
+    Issues one request per pool slot in parallel and holds every response
+    open until all slots are checked out, so each request gets its own
+    connection and TCP and TLS setup happen here rather than inside the
+    measured latencies.
+
+    Args:
+        session (requests.Session): Session created by create_session_pool
+        url (str): URL under test
+        concurrency (int): Number of connections to open
+        timeout (float): Per-request timeout in seconds. Defaults to 10.
+
+    Returns:
+        int: Number of connections open after warm-up
+    """
+    all_checked_out = threading.Barrier(concurrency)
+
+    def warm(_):
+        response = None
+        try:
+            response = session.get(url, timeout=timeout, stream=True)
+        except Exception:
+            pass
+        try:
+            all_checked_out.wait(timeout)
+        except threading.BrokenBarrierError:
+            pass
+        if response is not None:
+            response.content  # Drain the body so the connection returns to the pool
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(warm, range(concurrency)))
+
+    return get_pool_counters(session, url)["new_connections"]
+
+def summarize_pool_usage(before, after, pool_size, warmed_connections):
+    """
+    Turn two counter snapshots into the pool statistics reported with results
+
+    Args:
+        before (dict): Counters taken when timing started
+        after (dict): Counters taken when timing stopped
+        pool_size (int): Maximum number of pooled connections
+        warmed_connections (int): Connections opened during warm-up
+
+    Returns:
+        dict: Pool hits, new connections and pool size for the timed window
+    """
+    timed_requests = after["requests"] - before["requests"]
+    new_connections = after["new_connections"] - before["new_connections"]
+    return {
+        "pool_size": pool_size,
+        "warmed_connections": warmed_connections,
+        "pool_hits": max(timed_requests - new_connections, 0),
+        "new_connections": new_connections
+    }
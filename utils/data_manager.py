@@ -1,32 +1,221 @@
+import copy
 import json
 import os
+import tempfile
+import threading
+from contextlib import contextmanager
+import numpy as np
 import pandas as pd
 import random
 
+try:
+    import fcntl
+except ImportError:
+    # No cross-process file locks on this platform; writers in one process still serialize
+    fcntl = None
+
 # Define base path for data files
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
 
-def load_architecture_data():
+# Parsed catalog files keyed by path, each stored with the version it was read at
+_catalog_cache = {}
+_cache_stats = {"hits": 0, "misses": 0}
+_cache_lock = threading.Lock()
+
+# Serializes catalog writers within this process; the lock file does the same across processes
+_write_lock = threading.Lock()
+
+# Times a read-modify-write is retried after another writer changed the catalog first
+MAX_UPDATE_ATTEMPTS = 5
+
+# Metrics where a lower value is better
+LOWER_IS_BETTER = ["Latency", "Resource Utilization"]
+
+# Last compiled metric matrix and the catalog snapshot it was built from
+_matrix_cache = (None, None)
+
+class VersionConflictError(Exception):
     """
-    Load architecture patterns data from JSON file
+    Raised when the catalog changed between reading it and writing it back
     """
+
+def _catalog_path():
+    return os.path.join(DATA_DIR, "architecture_patterns.json")
+
+def _file_version(stat):
+    # Every write renames a new file into place, so the inode changes even if mtime and size do not
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+def _current_version(path):
     try:
-        with open(os.path.join(DATA_DIR, "architecture_patterns.json"), "r") as f:
-            data = json.load(f)
-        return data
+        return _file_version(os.stat(path))
     except FileNotFoundError:
+        return None
+
+def _load_catalog():
+    # Shared snapshot of the catalog and the version it was read at (None for the built-in defaults)
+    path = _catalog_path()
+    version = _current_version(path)
+    if version is None:
         # If file doesn't exist yet, return default patterns with placeholder data
-        return get_default_patterns()
+        return get_default_patterns(), None
+    
+    with _cache_lock:
+        cached = _catalog_cache.get(path)
+        if cached is not None and cached[0] == version:
+            _cache_stats["hits"] += 1
+            return cached[1], version
+    
+    with open(path, "r") as f:
+        # The file may have been replaced since the stat above; tag the data with what was actually read
+        version = _file_version(os.fstat(f.fileno()))
+        data = json.load(f)
+    
+    with _cache_lock:
+        _cache_stats["misses"] += 1
+        _catalog_cache[path] = (version, data)
+    return data, version
 
-def save_architecture_data(data):
+def load_architecture_data():
     """
-    Save architecture patterns data to JSON file
+    Load architecture patterns data from JSON file
+    
+    The parsed file is cached for the whole process and re-read only when
+    it is replaced or its modification time or size changes, so repeated
+    calls during a page render cost one os.stat each. Every caller gets the
+    same shared snapshot: treat it as read-only and deep-copy it before
+    changing it. Reads never wait for writers.
     """
+    return _load_catalog()[0]
+
+def load_architecture_data_versioned():
+    """
+    Load the catalog together with its version, for a later optimistic save
+    
+    Returns:
+        tuple: Shared read-only snapshot (as load_architecture_data) and its
+            version token, to pass as save_architecture_data(expected_version=...)
+    """
+    return _load_catalog()
+
+def get_cache_stats():
+    """
+    Report how often load_architecture_data was served from the cache
+
+    Returns:
+        dict: hits, misses and the number of cached files
+    """
+    with _cache_lock:
+        return {**_cache_stats, "entries": len(_catalog_cache)}
+
+def clear_architecture_cache():
+    """
+    Drop the cached catalog so the next load re-reads the file
+    """
+    with _cache_lock:
+        _catalog_cache.clear()
+
+@contextmanager
+def _catalog_write_lock():
+    # Held only around the version check and the write; readers never take it
+    with _write_lock:
+        if fcntl is None:
+            yield
+            return
+        
+        if not os.path.exists(DATA_DIR):
+            os.makedirs(DATA_DIR)
+        with open(os.path.join(DATA_DIR, ".architecture_patterns.lock"), "a") as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+def _write_catalog(data):
+    # Write a sibling temp file and rename it over the catalog, so readers and
+    # crashes only ever see the old or the new file, never a partial one
     if not os.path.exists(DATA_DIR):
         os.makedirs(DATA_DIR)
     
-    with open(os.path.join(DATA_DIR, "architecture_patterns.json"), "w") as f:
-        json.dump(data, f, indent=4)
+    path = _catalog_path()
+    fd, temp_path = tempfile.mkstemp(dir=DATA_DIR, prefix=".architecture_patterns.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return path, os.stat(path)
+
+def save_architecture_data(data, expected_version=None):
+    """
+    Save architecture patterns data to JSON file
+    
+    The file is written compactly and atomically: a temp file in the same
+    directory is renamed over the catalog once it is complete. Writers in
+    this and other processes are serialized by a lock.
+    
+    Args:
+        data (dict): Complete catalog
+        expected_version (tuple, optional): Version returned by
+            load_architecture_data_versioned when data was read. If the
+            catalog has changed since, nothing is written.
+    
+    Raises:
+        VersionConflictError: If expected_version no longer matches the file
+    """
+    with _catalog_write_lock():
+        path = _catalog_path()
+        if expected_version is not None and _current_version(path) != expected_version:
+            raise VersionConflictError("The architecture catalog was changed by another writer")
+        _write_catalog(data)
+        with _cache_lock:
+            _catalog_cache.pop(path, None)
+
+def update_architecture_data(update):
+    """
+    Apply a change to the catalog with optimistic concurrency control
+    
+    update is called on a private copy of the current catalog without
+    holding any lock. The result is written only if no other writer saved
+    the catalog in the meantime; otherwise update is re-run on the newer
+    catalog, up to MAX_UPDATE_ATTEMPTS times.
+    
+    Args:
+        update (callable): Called as update(arch_data) to change arch_data
+            in place; returning False means nothing changed and skips the write
+    
+    Returns:
+        dict: The catalog as written (or as read, if nothing changed)
+    
+    Raises:
+        VersionConflictError: If every attempt lost the race to another writer
+    """
+    for _ in range(MAX_UPDATE_ATTEMPTS):
+        snapshot, version = _load_catalog()
+        # Writers get a private copy so the shared snapshot never changes under readers
+        arch_data = copy.deepcopy(snapshot)
+        if update(arch_data) is False:
+            return snapshot
+        
+        with _catalog_write_lock():
+            path = _catalog_path()
+            if _current_version(path) != version:
+                continue
+            path, stat = _write_catalog(arch_data)
+            # arch_data is not shared with anyone, so it becomes the new cached snapshot
+            with _cache_lock:
+                _catalog_cache[path] = (_file_version(stat), arch_data)
+        return arch_data
+    
+    raise VersionConflictError(
+        f"The architecture catalog kept changing; gave up after {MAX_UPDATE_ATTEMPTS} attempts"
+    )
 
 def get_default_patterns():
     """
@@ -101,6 +290,18 @@ def get_default_patterns():
                     "Error Rate": 5.0
                 }
             },
+            "queue_model": {
+                "servers": 120,
+                "service_time_ms": 120,
+                "service_cv": 1.0,
+                "arrival_cv": 1.0,
+                "offered_load": 750
+            },
+            "usl": {
+                "lambda": 750,
+                "sigma": 0.3,
+                "kappa": 0.01
+            },
             "sources": [
                 "Martin Fowler - 'Patterns of Enterprise Application Architecture'",
                 "IEEE Software Architecture Standards",
@@ -173,6 +374,18 @@ def get_default_patterns():
                     "Error Rate": 0.8
                 }
             },
+            "queue_model": {
+                "servers": 450,
+                "service_time_ms": 150,
+                "service_cv": 1.3,
+                "arrival_cv": 1.0,
+                "offered_load": 1800
+            },
+            "usl": {
+                "lambda": 1800,
+                "sigma": 0.05,
+                "kappa": 0.0005
+            },
             "sources": [
                 "Sam Newman - 'Building Microservices'",
                 "Netflix Technology Blog - Microservices Architecture",
@@ -245,6 +458,18 @@ def get_default_patterns():
                     "Error Rate": 0.6
                 }
             },
+            "queue_model": {
+                "servers": 3125,
+                "service_time_ms": 250,
+                "service_cv": 2.0,
+                "arrival_cv": 1.0,
+                "offered_load": 2500
+            },
+            "usl": {
+                "lambda": 2500,
+                "sigma": 0.02,
+                "kappa": 0.0001
+            },
             "sources": [
                 "AWS Lambda Documentation",
                 "Serverless Framework Best Practices",
@@ -318,6 +543,18 @@ def get_default_patterns():
                     "Error Rate": 0.9
                 }
             },
+            "queue_model": {
+                "servers": 1047,
+                "service_time_ms": 180,
+                "service_cv": 1.5,
+                "arrival_cv": 1.4,
+                "offered_load": 3200
+            },
+            "usl": {
+                "lambda": 3200,
+                "sigma": 0.03,
+                "kappa": 0.0003
+            },
             "sources": [
                 "Gregor Hohpe - 'Enterprise Integration Patterns'",
                 "Kafka Documentation - Event-Driven Design",
@@ -390,6 +627,18 @@ def get_default_patterns():
                     "Error Rate": 1.8
                 }
             },
+            "queue_model": {
+                "servers": 283,
+                "service_time_ms": 220,
+                "service_cv": 1.8,
+                "arrival_cv": 1.0,
+                "offered_load": 900
+            },
+            "usl": {
+                "lambda": 900,
+                "sigma": 0.08,
+                "kappa": 0.002
+            },
             "sources": [
                 "Ian Foster - 'Designing and Building Parallel Programs'",
                 "IPFS Documentation - Peer-to-Peer File System",
@@ -462,6 +711,18 @@ def get_default_patterns():
                     "Error Rate": 1.2
                 }
             },
+            "queue_model": {
+                "servers": 351,
+                "service_time_ms": 190,
+                "service_cv": 1.2,
+                "arrival_cv": 1.0,
+                "offered_load": 1200
+            },
+            "usl": {
+                "lambda": 1200,
+                "sigma": 0.12,
+                "kappa": 0.003
+            },
             "sources": [
                 "Thomas Erl - 'SOA Principles of Service Design'",
                 "Microsoft Documentation - Service-Oriented Architecture",
@@ -470,92 +731,222 @@ def get_default_patterns():
         }
     }
 
-def get_pattern_metrics_as_dataframe():
+class MetricMatrix:
     """
-    Convert architecture patterns data to a pandas DataFrame for easy comparison
+    Pattern metrics compiled into a dense patterns x metrics float matrix
+    
+    Rows follow the catalog's pattern order and columns the order metrics
+    are first seen in. A metric a pattern does not report is stored as 0,
+    the same default get_pattern_scores uses. The matrix is shared between
+    callers and is read-only.
     """
-    arch_data = load_architecture_data()
     
-    # Initialize lists to store data
-    patterns = []
-    metrics = []
-    values = []
-    units = []
+    def __init__(self, arch_data):
+        self.patterns = list(arch_data.keys())
+        self.metrics = []
+        self.units = {}
+        self.descriptions = {}
+        for pattern_data in arch_data.values():
+            for metric_name, metric_data in pattern_data.get("metrics", {}).items():
+                if metric_name not in self.units:
+                    self.metrics.append(metric_name)
+                    self.units[metric_name] = metric_data.get("unit", "")
+                    self.descriptions[metric_name] = metric_data.get("description", "")
+        
+        self.pattern_index = {pattern: i for i, pattern in enumerate(self.patterns)}
+        self.metric_index = {metric: j for j, metric in enumerate(self.metrics)}
+        self.lower_is_better = np.array([metric in LOWER_IS_BETTER for metric in self.metrics], dtype=bool)
+        
+        self.values = np.zeros((len(self.patterns), len(self.metrics)), dtype=float)
+        for i, pattern_data in enumerate(arch_data.values()):
+            for metric_name, metric_data in pattern_data.get("metrics", {}).items():
+                self.values[i, self.metric_index[metric_name]] = metric_data["value"]
+        self.values.flags.writeable = False
     
-    # Extract data from nested structure
-    for pattern_name, pattern_data in arch_data.items():
-        for metric_name, metric_data in pattern_data["metrics"].items():
-            patterns.append(pattern_name)
-            metrics.append(metric_name)
-            values.append(metric_data["value"])
-            units.append(metric_data["unit"])
+    def value(self, pattern_name, metric_name):
+        """
+        Look up one value, or 0 if the pattern or metric is unknown
+        """
+        i = self.pattern_index.get(pattern_name)
+        j = self.metric_index.get(metric_name)
+        if i is None or j is None:
+            return 0
+        return float(self.values[i, j])
     
-    # Create DataFrame
-    df = pd.DataFrame({
-        "Pattern": patterns,
-        "Metric": metrics,
-        "Value": values,
-        "Unit": units
-    })
+    def select(self, patterns=None, metrics=None):
+        """
+        Get the values of some patterns and metrics
+        
+        Args:
+            patterns (list, optional): Pattern names. Defaults to all.
+            metrics (list, optional): Metric names. Defaults to all. Unknown
+                metrics come back as a column of zeros.
+            
+        Returns:
+            numpy.ndarray: len(patterns) x len(metrics) values
+        """
+        rows = self.values if patterns is None else self.values[[self.pattern_index[p] for p in patterns]]
+        if metrics is None:
+            return rows
+        selected = np.zeros((rows.shape[0], len(metrics)), dtype=float)
+        for k, metric in enumerate(metrics):
+            j = self.metric_index.get(metric)
+            if j is not None:
+                selected[:, k] = rows[:, j]
+        return selected
     
-    return df
+    def normalized(self, patterns=None, metrics=None):
+        """
+        Min-max normalize each metric across the selected patterns
+        
+        Scores are 0-1 with 1 the best pattern, so lower-is-better metrics
+        are inverted. A metric on which every pattern is equal scores 1.
+        
+        Args:
+            patterns (list, optional): Pattern names. Defaults to all.
+            metrics (list, optional): Metric names. Defaults to all.
+            
+        Returns:
+            numpy.ndarray: len(patterns) x len(metrics) scores
+        """
+        values = self.select(patterns, metrics)
+        metrics = self.metrics if metrics is None else metrics
+        lower = np.array([metric in LOWER_IS_BETTER for metric in metrics], dtype=bool)
+        
+        low = values.min(axis=0) if len(values) else np.zeros(len(metrics))
+        span = (values.max(axis=0) if len(values) else np.zeros(len(metrics))) - low
+        safe_span = np.where(span == 0, 1.0, span)
+        scores = (values - low) / safe_span
+        scores = np.where(lower, 1 - scores, scores)
+        return np.where(span == 0, 1.0, scores)
 
-def get_comparison_data():
+def get_metric_matrix(arch_data=None):
     """
-    Prepare data for pattern comparison in a format suitable for visualization
+    Get the compiled metric matrix of a catalog
+    
+    The matrix is built once per catalog snapshot: as long as
+    load_architecture_data returns the same snapshot, every caller shares
+    the same MetricMatrix.
+    
+    Args:
+        arch_data (dict, optional): Architecture data. Defaults to the
+            current catalog.
+        
+    Returns:
+        MetricMatrix: Compiled matrix
     """
-    arch_data = load_architecture_data()
+    global _matrix_cache
+    if arch_data is None:
+        arch_data = load_architecture_data()
     
-    # Initialize data structure
-    comparison_data = {
-        "Pattern": [],
-        "Throughput": [],
-        "Latency": [],
-        "Availability": [],
-        "Resource_Utilization": [],
-        "Fault_Tolerance": [],
-        "Elasticity": [],
-        "Cost_Efficiency": [],
-        "Data_Consistency": []
-    }
+    with _cache_lock:
+        source, matrix = _matrix_cache
+        if source is arch_data:
+            return matrix
     
-    # Extract data from each pattern
-    for pattern_name, pattern_data in arch_data.items():
-        comparison_data["Pattern"].append(pattern_name)
-        comparison_data["Throughput"].append(pattern_data["metrics"]["Throughput"]["value"])
-        comparison_data["Latency"].append(pattern_data["metrics"]["Latency"]["value"])
-        comparison_data["Availability"].append(pattern_data["metrics"]["Availability"]["value"])
-        comparison_data["Resource_Utilization"].append(pattern_data["metrics"]["Resource Utilization"]["value"])
-        comparison_data["Fault_Tolerance"].append(pattern_data["metrics"]["Fault Tolerance"]["value"])
-        comparison_data["Elasticity"].append(pattern_data["metrics"]["Elasticity"]["value"])
-        comparison_data["Cost_Efficiency"].append(pattern_data["metrics"]["Cost Efficiency"]["value"])
-        comparison_data["Data_Consistency"].append(pattern_data["metrics"]["Data Consistency"]["value"])
+    matrix = MetricMatrix(arch_data)
+    with _cache_lock:
+        _matrix_cache = (arch_data, matrix)
+    return matrix
+
+def get_pattern_metrics_as_dataframe():
+    """
+    Convert architecture patterns data to a pandas DataFrame for easy comparison
+    """
+    matrix = get_metric_matrix()
     
-    # Convert to DataFrame
-    df = pd.DataFrame(comparison_data)
+    # One row per pattern and metric, patterns outermost
+    return pd.DataFrame({
+        "Pattern": np.repeat(matrix.patterns, len(matrix.metrics)),
+        "Metric": np.tile(matrix.metrics, len(matrix.patterns)),
+        "Value": matrix.values.ravel(),
+        "Unit": np.tile([matrix.units[metric] for metric in matrix.metrics], len(matrix.patterns))
+    })
+
+def get_comparison_data():
+    """
+    Prepare data for pattern comparison in a format suitable for visualization
+    
+    Returns:
+        pandas.DataFrame: A "Pattern" column plus one column per metric, with
+            spaces in metric names replaced by underscores
+    """
+    matrix = get_metric_matrix()
+    
+    df = pd.DataFrame(matrix.values, columns=[metric.replace(" ", "_") for metric in matrix.metrics])
+    df.insert(0, "Pattern", matrix.patterns)
     
     return df
 
+def _apply_test_results(arch_data, pattern_name, test_results):
+    # Update metrics with test results; report whether any value changed
+    changed = False
+    if pattern_name in arch_data:
+        for metric_name, value in test_results.items():
+            metric = arch_data[pattern_name]["metrics"].get(metric_name)
+            if metric is not None and metric["value"] != value:
+                metric["value"] = value
+                changed = True
+    return changed
+
 def save_test_results(pattern_name, test_results):
     """
     Save custom test results for a specific pattern
     """
-    arch_data = load_architecture_data()
+    return save_test_results_batch({pattern_name: test_results})
+
+def save_test_results_batch(results_by_pattern):
+    """
+    Save test results for several patterns with one read and one write
+
+    The catalog is only rewritten if a value actually changed.
+
+    Args:
+        results_by_pattern (dict): Pattern names mapped to test results
+            keyed by metric name, as taken by save_test_results
+    """
+    def apply(arch_data):
+        changed = False
+        for pattern_name, test_results in results_by_pattern.items():
+            changed = _apply_test_results(arch_data, pattern_name, test_results) or changed
+        return changed
     
-    # Update data with test results
-    if pattern_name in arch_data:
-        # Update metrics with test results
-        for metric_name, value in test_results.items():
-            if metric_name in arch_data[pattern_name]["metrics"]:
-                arch_data[pattern_name]["metrics"][metric_name]["value"] = value
+    update_architecture_data(apply)
+    
+    return True
+
+def save_scalability_fit(pattern_name, fit):
+    """
+    Store a USL fit of a concurrency sweep in a pattern's "usl_concurrency" record
+
+    The fit's lambda is req/sec per concurrent request, not per node, so it
+    is kept apart from the node-count model in "usl" that drives the scaling
+    curves. The goodness-of-fit statistics are kept under "fit" so later
+    predictions can reuse the parameters without re-running load.
+    """
+    def apply(arch_data):
+        if pattern_name not in arch_data:
+            return False
+        arch_data[pattern_name]["usl_concurrency"] = {
+            "lambda": fit["lambda"],
+            "sigma": fit["sigma"],
+            "kappa": fit["kappa"],
+            "fit": {
+                "r_squared": fit["r_squared"],
+                "rmse": fit["rmse"],
+                "points": fit["points"],
+                "peak_load": fit["peak_load"],
+                "peak_throughput": fit["peak_throughput"]
+            }
+        }
     
-    # Save updated data
-    save_architecture_data(arch_data)
+    update_architecture_data(apply)
     
     return True
 
 # Initialize data file if it doesn't exist
-if not os.path.exists(os.path.join(DATA_DIR, "architecture_patterns.json")):
-    if not os.path.exists(DATA_DIR):
-        os.makedirs(DATA_DIR)
-    save_architecture_data(get_default_patterns())
+if not os.path.exists(_catalog_path()):
+    with _catalog_write_lock():
+        # Another process may have created it while we waited for the lock
+        if not os.path.exists(_catalog_path()):
+            _write_catalog(get_default_patterns())
@@ -0,0 +1,203 @@
+import asyncio
+import time
+import numpy as np
+from utils.async_engine import parse_url, open_connection, close_connection, send_request
+from utils.target_server import BackgroundServer, read_request, wants_keep_alive, write_response
+
+# Faults the proxy can inject, and the extra settings each one takes
+FAULT_TYPES = {
+    "latency": {"delay_ms": 500.0},
+    "reset": {},
+    "error": {"status": 503},
+    "blackhole": {}
+}
+
+# Headers that describe the client connection rather than the request
+_HOP_BY_HOP_HEADERS = ("connection", "keep-alive", "host", "content-length", "transfer-encoding",
+                       "proxy-connection", "te", "upgrade")
+
+# One fault of each kind with a clean stretch before, between and after them
+DEFAULT_FAULT_SCHEDULE = [
+    {"type": "latency", "start": 3, "duration": 2, "delay_ms": 300},
+    {"type": "error", "start": 7, "duration": 2, "status": 503},
+    {"type": "reset", "start": 11, "duration": 2},
+    {"type": "blackhole", "start": 15, "duration": 2}
+]
+
+def parse_fault_schedule(schedule):
+    """
+    Validate a fault schedule and fill in the defaults
+
+    Each fault is a dict with a "type" (see FAULT_TYPES), a "start" and a
+    "duration" in seconds from the moment the proxy is armed, and
+    optionally a "probability" (default 1) of hitting each request in the
+    window. "latency" faults take a "delay_ms" and "error" faults a
+    "status" code.
+
+    Args:
+        schedule (list): Fault dicts
+
+    Returns:
+        list: Complete fault dicts sorted by start time
+    """
+    faults = []
+    for fault in schedule:
+        fault_type = fault.get("type")
+        if fault_type not in FAULT_TYPES:
+            raise ValueError(f"Unknown fault type '{fault_type}', expected one of {', '.join(FAULT_TYPES)}")
+        if float(fault.get("duration", 0)) <= 0 or float(fault.get("start", -1)) < 0:
+            raise ValueError(f"Fault {fault} needs a start >= 0 and a positive duration")
+        probability = float(fault.get("probability", 1.0))
+        if not 0 <= probability <= 1:
+            raise ValueError(f"Fault probability must be between 0 and 1, got {probability}")
+
+        complete = {
+            "type": fault_type,
+            "start": float(fault["start"]),
+            "duration": float(fault["duration"]),
+            "probability": probability
+        }
+        for key, default in FAULT_TYPES[fault_type].items():
+            complete[key] = type(default)(fault.get(key, default))
+        complete["end"] = complete["start"] + complete["duration"]
+        faults.append(complete)
+    return sorted(faults, key=lambda fault: fault["start"])
+
+class FaultProxy(BackgroundServer):
+    """
+    Local HTTP proxy that relays requests to an upstream and injects faults
+
+    Runs its own asyncio event loop in a background thread, like
+    TargetServer. While a scheduled fault is active, each request it hits
+    is delayed (latency), has its connection torn down (reset), is answered
+    with an error status without reaching the upstream (error), or is held
+    without a response until the fault ends and then dropped (blackhole).
+    """
+
+    thread_name = "fault-proxy"
+
+    def __init__(self, upstream_url, schedule=(), host="127.0.0.1", port=0, seed=None):
+        super().__init__(host, port)
+        self.upstream = parse_url(upstream_url)
+        self.schedule = parse_fault_schedule(schedule)
+        self.epoch = time.perf_counter()
+        self.stats = {
+            "requests": 0,
+            "forwarded": 0,
+            "upstream_errors": 0,
+            **{f"injected_{fault_type}": 0 for fault_type in FAULT_TYPES}
+        }
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}{self.upstream['target']}"
+
+    def arm(self):
+        """
+        Start the fault schedule's clock now
+
+        Returns:
+            float: The perf_counter() time the schedule is measured from
+        """
+        self.epoch = time.perf_counter()
+        return self.epoch
+
+    def _pick_fault(self):
+        elapsed = time.perf_counter() - self.epoch
+        for fault in self.schedule:
+            if fault["start"] <= elapsed < fault["end"] and self._rng.random() < fault["probability"]:
+                return fault, fault["end"] - elapsed
+        return None, 0.0
+
+    async def _forward(self, request, upstream):
+        headers = {
+            name: value for name, value in request["headers"].items()
+            if name not in _HOP_BY_HOP_HEADERS and not name.startswith("proxy-")
+        }
+        if upstream[0] is None:
+            upstream[:] = await open_connection(self.upstream)
+        try:
+            response = await send_request(upstream[0], upstream[1], self.upstream, method=request["method"],
+                                          target=request["target"], headers=headers, body=request["body"],
+                                          keep_body=True)
+        except BaseException:
+            close_connection(upstream[1])
+            upstream[:] = [None, None]
+            raise
+        if not response["keep_alive"]:
+            close_connection(upstream[1])
+            upstream[:] = [None, None]
+        return response
+
+    async def _handle_connection(self, reader, writer):
+        upstream = [None, None]
+        try:
+            while True:
+                request = await read_request(reader)
+                if request is None:
+                    break
+                self.stats["requests"] += 1
+                keep_alive = wants_keep_alive(request)
+
+                fault, remaining = self._pick_fault()
+                if fault is not None:
+                    self.stats[f"injected_{fault['type']}"] += 1
+                    if fault["type"] == "reset":
+                        writer.transport.abort()
+                        return
+                    if fault["type"] == "blackhole":
+                        await asyncio.sleep(remaining)
+                        writer.transport.abort()
+                        return
+                    if fault["type"] == "error":
+                        await write_response(writer, fault["status"], b'{"error": "injected fault"}',
+                                             keep_alive=keep_alive)
+                        if not keep_alive:
+                            break
+                        continue
+                    await asyncio.sleep(fault["delay_ms"] / 1000)
+
+                try:
+                    response = await self._forward(request, upstream)
+                except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError):
+                    self.stats["upstream_errors"] += 1
+                    await write_response(writer, 502, b'{"error": "upstream unavailable"}', keep_alive=keep_alive)
+                else:
+                    self.stats["forwarded"] += 1
+                    await write_response(
+                        writer,
+                        response["status_code"],
+                        response["body"],
+                        content_type=response["headers"].get("content-type", "application/octet-stream"),
+                        keep_alive=keep_alive
+                    )
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError, asyncio.CancelledError):
+            # Cancelled when the proxy stops with the connection still open
+            pass
+        finally:
+            close_connection(upstream[1])
+            writer.close()
+
+def start_fault_proxy(upstream_url, schedule=None, host="127.0.0.1", port=0, seed=None):
+    """
+    Start a fault-injecting proxy in front of a URL
+
+    Args:
+        upstream_url (str): URL to relay requests to
+        schedule (list, optional): Faults to inject (see parse_fault_schedule).
+            Defaults to DEFAULT_FAULT_SCHEDULE.
+        host (str): Interface to bind. Defaults to "127.0.0.1".
+        port (int): Port to bind, 0 for any free port. Defaults to 0.
+        seed (int, optional): Random seed for fault probabilities
+
+    Returns:
+        FaultProxy: Running proxy; its url points at the upstream URL's path.
+            Call arm() when the load starts and stop() (or use it as a
+            context manager) when done.
+    """
+    if schedule is None:
+        schedule = DEFAULT_FAULT_SCHEDULE
+    return FaultProxy(upstream_url, schedule, host=host, port=port, seed=seed).start()
@@ -0,0 +1,237 @@
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Job states; the last three are final
+JOB_STATES = ("pending", "running", "completed", "failed", "cancelled")
+FINISHED_STATES = ("completed", "failed", "cancelled")
+
+class JobCancelled(Exception):
+    """
+    Raised inside a job function to stop it once cancellation was requested
+    """
+
+class Job:
+    """
+    One background task and the state a page needs to follow it
+
+    The job function receives the Job as its first argument. It reports
+    progress with update() and should check cancelled (or pass cancel_event
+    on as a stop event) at convenient points. Raising JobCancelled, e.g.
+    from check_cancelled(), marks the job cancelled; a job that returns has
+    completed, even if cancellation was requested after its last check.
+    """
+
+    def __init__(self, job_id, name):
+        self.id = job_id
+        self.name = name
+        self.status = "pending"
+        self.progress = 0.0
+        self.message = ""
+        self.result = None
+        self.error = None
+        self.items = []
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.cancel_event = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def check_cancelled(self):
+        """
+        Raise JobCancelled if cancellation was requested
+        """
+        if self.cancel_event.is_set():
+            raise JobCancelled()
+
+    def update(self, progress=None, message=None, item=None):
+        """
+        Report progress from inside the job function
+
+        Args:
+            progress (float, optional): Fraction done, 0-1
+            message (str, optional): Short description of the current step
+            item (dict, optional): Partial result to append to items, e.g. one
+                live throughput interval
+        """
+        with self._lock:
+            if progress is not None:
+                self.progress = min(max(float(progress), 0.0), 1.0)
+            if message is not None:
+                self.message = message
+            if item is not None:
+                self.items.append(item)
+
+    def _finish(self, status, result=None, error=None):
+        with self._lock:
+            self.status = status
+            self.result = result
+            self.error = error
+            if status == "completed":
+                self.progress = 1.0
+            self.finished_at = time.time()
+
+    def snapshot(self):
+        """
+        Copy of the job state that is safe to read while the job runs
+
+        Returns:
+            dict: id, name, status, progress, message, result, error, items
+                and the submitted/started/finished timestamps
+        """
+        with self._lock:
+            return {
+                "id": self.id,
+                "name": self.name,
+                "status": self.status,
+                "progress": self.progress,
+                "message": self.message,
+                "result": self.result,
+                "error": self.error,
+                "items": list(self.items),
+                "submitted_at": self.submitted_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at
+            }
+
+class JobExecutor:
+    """
+    Runs jobs on a bounded thread pool and keeps their state for polling
+
+    Callers get a job id back from submit() and read the job's state with
+    status(); nothing blocks on the job itself. Finished jobs are kept until
+    forget() is called, up to max_finished of them.
+    """
+
+    def __init__(self, max_workers=4, max_finished=100):
+        self.max_finished = max_finished
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="test-job")
+        self._jobs = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, name=None, **kwargs):
+        """
+        Queue fn(job, *args, **kwargs) to run in the background
+
+        Args:
+            fn (callable): Job function; its return value becomes the result
+            name (str, optional): Label shown while the job runs. Defaults to
+                the function name.
+
+        Returns:
+            str: Job id
+        """
+        with self._lock:
+            job_id = f"job-{next(self._ids)}"
+            job = self._jobs[job_id] = Job(job_id, name or fn.__name__)
+            self._prune()
+        self._pool.submit(self._run, job, fn, args, kwargs)
+        return job_id
+
+    def _run(self, job, fn, args, kwargs):
+        if job.cancelled:
+            job._finish("cancelled")
+            return
+        with job._lock:
+            job.status = "running"
+            job.started_at = time.time()
+        try:
+            result = fn(job, *args, **kwargs)
+        except JobCancelled:
+            job._finish("cancelled")
+        except Exception as e:
+            job._finish("failed", error=f"{type(e).__name__}: {e}")
+        else:
+            job._finish("completed", result=result)
+
+    def _prune(self):
+        finished = [job for job in self._jobs.values() if job.status in FINISHED_STATES]
+        for job in sorted(finished, key=lambda job: job.finished_at)[:max(len(finished) - self.max_finished, 0)]:
+            del self._jobs[job.id]
+
+    def status(self, job_id):
+        """
+        Get a snapshot of a job's state
+
+        Returns:
+            dict: Job.snapshot(), or None for an unknown job id
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+        return job.snapshot() if job is not None else None
+
+    def cancel(self, job_id):
+        """
+        Ask a job to stop; a job that has not started yet never runs
+
+        Returns:
+            bool: True if the job was still pending or running
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None or job.status in FINISHED_STATES:
+            return False
+        job.cancel_event.set()
+        return True
+
+    def forget(self, job_id):
+        """
+        Drop a finished job's state
+
+        Returns:
+            dict: The job's final snapshot, or None if it is unknown or still running
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status not in FINISHED_STATES:
+                return None
+            del self._jobs[job_id]
+        return job.snapshot()
+
+    def list_jobs(self):
+        """
+        Snapshots of every known job, oldest first
+
+        Returns:
+            list: Job.snapshot() dicts
+        """
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [job.snapshot() for job in jobs]
+
+    def shutdown(self, cancel=True):
+        """
+        Stop accepting jobs and wait for the running ones
+
+        Args:
+            cancel (bool): Cancel pending and running jobs first. Defaults to True.
+        """
+        if cancel:
+            for job in list(self._jobs.values()):
+                job.cancel_event.set()
+        self._pool.shutdown(wait=True)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def get_job_executor():
+    """
+    Get the process-wide job executor shared by all sessions
+
+    Jobs outlive the Streamlit script run that submitted them, so the
+    executor lives at module level rather than in session state.
+
+    Returns:
+        JobExecutor: Shared executor
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = JobExecutor()
+        return _executor
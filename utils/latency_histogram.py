@@ -0,0 +1,285 @@
+import math
+import threading
+import time
+import numpy as np
+
+# Percentiles reported with every latency summary, keyed by result-field suffix
+REPORTED_PERCENTILES = {
+    "p50": 50,
+    "p90": 90,
+    "p95": 95,
+    "p99": 99,
+    "p999": 99.9
+}
+
+class LatencyHistogram:
+    """
+    Fixed-memory, log-bucketed latency histogram (HDR/DDSketch style)
+
+    Bucket boundaries grow geometrically by gamma = (1 + a) / (1 - a), so any
+    percentile read back from the histogram is within a relative error of a
+    (1% by default) of the true sample value. Memory is set by the tracked
+    range, not by the number of samples, and two histograms with the same
+    layout merge by adding their count arrays.
+    """
+
+    def __init__(self, relative_accuracy=0.01, min_value=0.001, max_value=3600000.0):
+        """
+        Args:
+            relative_accuracy (float): Maximum relative error of percentile estimates
+            min_value (float): Smallest distinguishable latency in ms. Defaults to 1 µs.
+            max_value (float): Largest tracked latency in ms. Defaults to 1 hour.
+        """
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self.max_value = max_value
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._inv_log_gamma = 1.0 / math.log(self._gamma)
+        num_buckets = int(math.ceil(math.log(max_value / min_value) * self._inv_log_gamma)) + 1
+        self.counts = np.zeros(num_buckets, dtype=np.int64)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def _bucket_index(self, value):
+        if value <= self.min_value:
+            return 0
+        index = int(math.ceil(math.log(value / self.min_value) * self._inv_log_gamma))
+        return min(index, len(self.counts) - 1)
+
+    def _bucket_value(self, index):
+        # Point inside the bucket whose relative distance to both edges is at most a
+        return self.min_value * 2 * self._gamma ** index / (self._gamma + 1)
+
+    def record(self, value):
+        """
+        Record one latency sample in ms
+        """
+        self.counts[self._bucket_index(value)] += 1
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def record_many(self, values):
+        """
+        Record an array of latency samples in ms in one vectorized step
+        """
+        values = np.asarray(values, dtype=float)
+        if values.size == 0:
+            return
+        clipped = np.maximum(values, self.min_value)
+        indices = np.ceil(np.log(clipped / self.min_value) * self._inv_log_gamma).astype(np.int64)
+        indices = np.clip(indices, 0, len(self.counts) - 1)
+        self.counts += np.bincount(indices, minlength=len(self.counts))
+        self.count += int(values.size)
+        self.total += float(values.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    def merge(self, other):
+        """
+        Add the samples of another histogram with the same layout into this one
+
+        Returns:
+            LatencyHistogram: self, to allow chaining
+        """
+        if len(other.counts) != len(self.counts) or other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge histograms with different bucket layouts")
+        self.counts += other.counts
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def percentile(self, percentile):
+        """
+        Estimate a percentile (0-100) of the recorded samples
+
+        Returns:
+            float: Latency in ms, or 0 if nothing was recorded
+        """
+        if self.count == 0:
+            return 0.0
+        rank = max(int(math.ceil(percentile / 100.0 * self.count)), 1)
+        index = int(np.searchsorted(np.cumsum(self.counts), rank))
+        # Exact extremes are tracked separately, so clamp the bucket estimate to them
+        return min(max(self._bucket_value(index), self.min), self.max)
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def summary(self):
+        """
+        Summarize the distribution
+
+        Returns:
+            dict: count, mean, min, max and the REPORTED_PERCENTILES in ms
+        """
+        summary = {
+            "count": self.count,
+            "mean": self.mean(),
+            "min": self.min if self.count else 0.0,
+            "max": self.max
+        }
+        for name, percentile in REPORTED_PERCENTILES.items():
+            summary[name] = self.percentile(percentile)
+        return summary
+
+def latency_result_fields(histogram):
+    """
+    Build the latency fields shared by the latency and throughput test results
+
+    Args:
+        histogram (LatencyHistogram): Histogram of successful request latencies
+
+    Returns:
+        dict: avg/min/max and percentile latencies in ms, e.g. "p99_latency"
+    """
+    summary = histogram.summary()
+    fields = {
+        "avg_latency": summary["mean"],
+        "min_latency": summary["min"],
+        "max_latency": summary["max"]
+    }
+    for name in REPORTED_PERCENTILES:
+        fields[f"{name}_latency"] = summary[name]
+    return fields
+
+# Request phases timed by the load engines, in the order they happen
+PHASES = ("dns", "connect", "tls", "pool_wait", "ttfb", "transfer")
+
+def new_phase_histograms():
+    """
+    Create one empty histogram per request phase
+
+    Returns:
+        dict: PHASES mapped to LatencyHistogram
+    """
+    return {phase: LatencyHistogram() for phase in PHASES}
+
+def merge_phase_histograms(target, source):
+    """
+    Add per-phase histograms from source into target
+
+    Returns:
+        dict: target
+    """
+    for phase, histogram in source.items():
+        target[phase].merge(histogram)
+    return target
+
+def summarize_phases(phases):
+    """
+    Summarize the per-phase timing distributions
+
+    Phases that were never observed (e.g. TLS for plain HTTP, or DNS when
+    every connection came from a warm pool) are left out.
+
+    Args:
+        phases (dict): PHASES mapped to LatencyHistogram
+
+    Returns:
+        dict: Phase names mapped to LatencyHistogram.summary() in ms
+    """
+    return {phase: phases[phase].summary() for phase in PHASES if phases[phase].count}
+
+class IntervalRecorder:
+    """
+    Per-interval (default per-second) request counts and latency histograms
+
+    Load workers record every completed request; a reader drains finished
+    intervals while the test is still running. Safe to record into from
+    many threads.
+    """
+
+    def __init__(self, interval=1.0):
+        self.interval = interval
+        self.start = time.perf_counter()
+        self.started = False
+        self._buckets = {}
+        self._next_index = 0
+        self._lock = threading.Lock()
+
+    def restart(self):
+        """
+        Start the clock when timing begins, dropping anything recorded during warm-up
+        """
+        with self._lock:
+            self.start = time.perf_counter()
+            self.started = True
+            self._buckets = {}
+            self._next_index = 0
+
+    def record(self, latency, success):
+        """
+        Record one finished request
+
+        Args:
+            latency (float): Latency in ms, or None if the request failed without a response
+            success (bool): Whether the request counts as successful
+        """
+        index = int((time.perf_counter() - self.start) / self.interval)
+        with self._lock:
+            bucket = self._buckets.get(index)
+            if bucket is None:
+                bucket = self._buckets[index] = {
+                    "requests": 0,
+                    "errors": 0,
+                    "latencies": LatencyHistogram()
+                }
+            bucket["requests"] += 1
+            if not success:
+                bucket["errors"] += 1
+            if latency is not None:
+                bucket["latencies"].record(latency)
+
+    def _summarize(self, index, bucket):
+        latencies = bucket["latencies"].summary()
+        return {
+            "second": (index + 1) * self.interval,
+            "requests": bucket["requests"],
+            "errors": bucket["errors"],
+            "throughput": bucket["requests"] / self.interval,
+            "error_rate": bucket["errors"] / bucket["requests"] * 100 if bucket["requests"] else 0,
+            "avg_latency": latencies["mean"],
+            "p50_latency": latencies["p50"],
+            "p90_latency": latencies["p90"],
+            "p99_latency": latencies["p99"],
+            "max_latency": latencies["max"]
+        }
+
+    def pop_completed(self, include_current=False):
+        """
+        Remove and summarize every interval that has finished
+
+        Args:
+            include_current (bool): Also flush the interval still in progress,
+                e.g. once the test has ended
+
+        Returns:
+            list: Interval summaries in time order; intervals without any
+                finished request are reported with zero requests
+        """
+        if not self.started:
+            return []
+        current = int((time.perf_counter() - self.start) / self.interval)
+        with self._lock:
+            last = max(self._buckets) if self._buckets else -1
+            end = max(current, last + 1) if include_current else current
+            ready = {}
+            for index in list(self._buckets):
+                if index < end:
+                    ready[index] = self._buckets.pop(index)
+            first = self._next_index
+            self._next_index = max(first, end)
+
+        summaries = []
+        for index in range(first, end):
+            bucket = ready.get(index, {"requests": 0, "errors": 0, "latencies": LatencyHistogram()})
+            summaries.append(self._summarize(index, bucket))
+        return summaries
@@ -1,6 +1,18 @@
 import pandas as pd
 import numpy as np
-from utils.data_manager import load_architecture_data
+from utils.data_manager import load_architecture_data, get_metric_matrix, LOWER_IS_BETTER
+
+# Metric weights of the overall score
+OVERALL_WEIGHTS = {
+    "Throughput": 0.15,
+    "Latency": 0.15,
+    "Availability": 0.15,
+    "Resource Utilization": 0.1,
+    "Fault Tolerance": 0.15,
+    "Elasticity": 0.1,
+    "Cost Efficiency": 0.1,
+    "Data Consistency": 0.1
+}
 
 def get_pattern_scores(pattern_name, metric_name, arch_data=None):
     """
@@ -14,42 +26,14 @@ def get_pattern_scores(pattern_name, metric_name, arch_data=None):
     Returns:
         float: The score value for the specified pattern and metric
     """
-    if arch_data is None:
-        arch_data = load_architecture_data()
-        
-    if pattern_name in arch_data and "metrics" in arch_data[pattern_name]:
-        if metric_name in arch_data[pattern_name]["metrics"]:
-            return arch_data[pattern_name]["metrics"][metric_name]["value"]
-    
-    return 0  # Default value if pattern or metric not found
+    # Defaults to 0 if the pattern or metric is not found
+    return get_metric_matrix(arch_data).value(pattern_name, metric_name)
 
-def normalize_metric(values, metric_name):
-    """
-    Normalize metric values to a 0-1 scale
-    
-    Args:
-        values (list): List of metric values
-        metric_name (str): Name of the metric
-        
-    Returns:
-        list: Normalized values
-    """
-    # For latency and resource utilization, lower is better
-    if metric_name in ["Latency", "Resource Utilization"]:
-        min_val = min(values)
-        max_val = max(values)
-        # Avoid division by zero
-        if max_val == min_val:
-            return [1.0] * len(values)
-        return [1 - ((val - min_val) / (max_val - min_val)) for val in values]
-    else:
-        # For all other metrics, higher is better
-        min_val = min(values)
-        max_val = max(values)
-        # Avoid division by zero
-        if max_val == min_val:
-            return [1.0] * len(values)
-        return [(val - min_val) / (max_val - min_val) for val in values]
+def _weighted_scores(matrix, weights):
+    # Normalize every metric across all patterns and sum the weighted columns per pattern
+    metrics = list(weights.keys())
+    scores = matrix.normalized(metrics=metrics) @ np.array([weights[metric] for metric in metrics], dtype=float)
+    return dict(zip(matrix.patterns, scores.tolist()))
 
 def calculate_overall_scores(arch_data=None):
     """
@@ -61,50 +45,7 @@ def calculate_overall_scores(arch_data=None):
     Returns:
         dict: Dictionary with pattern names as keys and overall scores as values
     """
-    if arch_data is None:
-        arch_data = load_architecture_data()
-    
-    # Define metric weights (custom weights based on importance)
-    weights = {
-        "Throughput": 0.15,
-        "Latency": 0.15,
-        "Availability": 0.15,
-        "Resource Utilization": 0.1,
-        "Fault Tolerance": 0.15,
-        "Elasticity": 0.1,
-        "Cost Efficiency": 0.1,
-        "Data Consistency": 0.1
-    }
-    
-    # Initialize data structures
-    pattern_metrics = {}
-    metric_values = {metric: [] for metric in weights.keys()}
-    
-    # Extract metric values for each pattern
-    for pattern_name, pattern_data in arch_data.items():
-        pattern_metrics[pattern_name] = {}
-        for metric_name in weights.keys():
-            value = get_pattern_scores(pattern_name, metric_name, arch_data)
-            pattern_metrics[pattern_name][metric_name] = value
-            metric_values[metric_name].append(value)
-    
-    # Normalize metrics
-    normalized_metrics = {}
-    for pattern_name in pattern_metrics.keys():
-        normalized_metrics[pattern_name] = {}
-    
-    for metric_name in weights.keys():
-        normalized = normalize_metric(metric_values[metric_name], metric_name)
-        for i, pattern_name in enumerate(pattern_metrics.keys()):
-            normalized_metrics[pattern_name][metric_name] = normalized[i]
-    
-    # Calculate weighted scores
-    scores = {}
-    for pattern_name in normalized_metrics.keys():
-        weighted_sum = sum(normalized_metrics[pattern_name][metric] * weights[metric] for metric in weights.keys())
-        scores[pattern_name] = weighted_sum
-    
-    return scores
+    return _weighted_scores(get_metric_matrix(arch_data), OVERALL_WEIGHTS)
 
 def get_best_pattern_for_metrics(metrics_priority, arch_data=None):
     """
@@ -117,46 +58,64 @@ def get_best_pattern_for_metrics(metrics_priority, arch_data=None):
     Returns:
         tuple: Best pattern name and its score
     """
-    if arch_data is None:
-        arch_data = load_architecture_data()
-    
     # Normalize priority weights
     total_weight = sum(metrics_priority.values())
     normalized_weights = {metric: weight/total_weight for metric, weight in metrics_priority.items()}
     
-    # Initialize data structures
-    pattern_metrics = {}
-    metric_values = {metric: [] for metric in metrics_priority.keys()}
-    
-    # Extract metric values for each pattern
-    for pattern_name, pattern_data in arch_data.items():
-        pattern_metrics[pattern_name] = {}
-        for metric_name in metrics_priority.keys():
-            value = get_pattern_scores(pattern_name, metric_name, arch_data)
-            pattern_metrics[pattern_name][metric_name] = value
-            metric_values[metric_name].append(value)
-    
-    # Normalize metrics
-    normalized_metrics = {}
-    for pattern_name in pattern_metrics.keys():
-        normalized_metrics[pattern_name] = {}
-    
-    for metric_name in metrics_priority.keys():
-        normalized = normalize_metric(metric_values[metric_name], metric_name)
-        for i, pattern_name in enumerate(pattern_metrics.keys()):
-            normalized_metrics[pattern_name][metric_name] = normalized[i]
-    
-    # Calculate weighted scores
-    scores = {}
-    for pattern_name in normalized_metrics.keys():
-        weighted_sum = sum(normalized_metrics[pattern_name][metric] * normalized_weights[metric] for metric in normalized_weights.keys())
-        scores[pattern_name] = weighted_sum
+    scores = _weighted_scores(get_metric_matrix(arch_data), normalized_weights)
     
     # Find the best pattern
     best_pattern = max(scores.items(), key=lambda x: x[1])
     
     return best_pattern
 
+def get_best_pattern_from_trials(trial_results, metric_name):
+    """
+    Pick the best pattern for a metric from Monte Carlo test results
+    
+    The pattern with the best mean wins. The win is only significant if the
+    confidence interval of its mean does not overlap the runner-up's;
+    otherwise the patterns are statistically tied at the trials' confidence
+    level. A metric that did not vary between trials (a qualitative rating,
+    or a single run) has no sampling error to test against, so it gets no
+    verdict.
+    
+    Args:
+        trial_results (dict): Pattern names mapped to simulate_test_trials results
+        metric_name (str): Name of the metric
+        
+    Returns:
+        dict: Best pattern, its mean and interval, the runner-up and whether
+            the difference is significant (None when the metric was constant)
+    """
+    stats = {
+        pattern: results["metrics"][metric_name]
+        for pattern, results in trial_results.items()
+        if metric_name in results["metrics"]
+    }
+    lower_is_better = metric_name in LOWER_IS_BETTER
+    ranked = sorted(stats, key=lambda pattern: stats[pattern]["mean"], reverse=not lower_is_better)
+    
+    best = ranked[0]
+    runner_up = ranked[1] if len(ranked) > 1 else None
+    significant = True
+    if runner_up is not None and (stats[best]["std"] == 0 or stats[runner_up]["std"] == 0):
+        significant = None
+    elif runner_up is not None:
+        if lower_is_better:
+            significant = stats[best]["ci_high"] < stats[runner_up]["ci_low"]
+        else:
+            significant = stats[best]["ci_low"] > stats[runner_up]["ci_high"]
+    
+    return {
+        "pattern": best,
+        "mean": stats[best]["mean"],
+        "ci_low": stats[best]["ci_low"],
+        "ci_high": stats[best]["ci_high"],
+        "runner_up": runner_up,
+        "significant": significant
+    }
+
 def compare_before_after_scaling(pattern_name, arch_data=None):
     """
     Compare before and after scaling metrics for a specific pattern
@@ -0,0 +1,221 @@
+import numpy as np
+from utils.data_manager import load_architecture_data
+
+# Standard normal quantiles used for log-normal service-time percentiles
+_Z_SCORES = {
+    95: 1.6448536269514722,
+    99: 2.3263478740408408
+}
+
+def get_queue_model(pattern_name, arch_data=None):
+    """
+    Get the multi-server queue parameters of a pattern
+
+    Uses the pattern's "queue_model" record when present. Otherwise the
+    parameters are derived from its metrics: the Throughput is the offered
+    load, the Latency the mean service time, and the server count is chosen
+    so that utilization equals Resource Utilization.
+
+    Args:
+        pattern_name (str): Name of the architecture pattern
+        arch_data (dict, optional): Architecture data. Defaults to None.
+
+    Returns:
+        dict: servers, service_time_ms, service_cv, arrival_cv and offered_load (req/sec)
+    """
+    if arch_data is None:
+        arch_data = load_architecture_data()
+
+    pattern_data = arch_data.get(pattern_name, {})
+    if "queue_model" in pattern_data:
+        return dict(pattern_data["queue_model"])
+
+    metrics = pattern_data.get("metrics", {})
+    offered_load = float(metrics.get("Throughput", {}).get("value", 1000))
+    service_time_ms = float(metrics.get("Latency", {}).get("value", 200))
+    utilization = min(max(float(metrics.get("Resource Utilization", {}).get("value", 60)), 1.0), 99.0) / 100
+    servers = max(1, int(round(offered_load * service_time_ms / 1000 / utilization)))
+
+    return {
+        "servers": servers,
+        "service_time_ms": service_time_ms,
+        "service_cv": 1.0,
+        "arrival_cv": 1.0,
+        "offered_load": offered_load
+    }
+
+def _log_factorials(n):
+    return np.concatenate([[0.0], np.cumsum(np.log(np.arange(1, n + 1)))])
+
+def erlang_c(servers, offered_traffic):
+    """
+    Probability that an arriving request has to wait in an M/M/c queue
+
+    Computed in log space (Erlang B via log-sum-exp, then converted to
+    Erlang C) so it stays stable for thousands of servers. All arguments
+    broadcast; the work is one vectorized pass per distinct server count.
+
+    Args:
+        servers (array-like): Number of servers c
+        offered_traffic (array-like): Offered traffic a = lambda / mu in Erlangs
+
+    Returns:
+        numpy.ndarray: Waiting probability, 1 where a >= c (unstable queue)
+    """
+    servers, offered_traffic = np.broadcast_arrays(
+        np.asarray(servers, dtype=np.int64),
+        np.asarray(offered_traffic, dtype=float)
+    )
+    result = np.ones(servers.shape, dtype=float)
+    log_factorials = _log_factorials(int(servers.max()) if servers.size else 0)
+
+    for c in np.unique(servers):
+        mask = (servers == c) & (offered_traffic < c) & (offered_traffic > 0)
+        if not mask.any():
+            continue
+        a = offered_traffic[mask]
+        k = np.arange(c + 1)[:, None]
+        log_terms = k * np.log(a)[None, :] - log_factorials[:c + 1, None]
+        peak = log_terms.max(axis=0)
+        log_sum = peak + np.log(np.exp(log_terms - peak).sum(axis=0))
+        erlang_b = np.exp(log_terms[-1] - log_sum)
+        rho = a / c
+        result[mask] = erlang_b / (1 - rho * (1 - erlang_b))
+
+    result[offered_traffic <= 0] = 0.0
+    return result
+
+def evaluate_queue(servers, service_time_ms, arrival_rate, service_cv=1.0, arrival_cv=1.0):
+    """
+    Evaluate a G/G/c queue at the given arrival rates
+
+    The M/M/c waiting time is scaled by (ca^2 + cs^2) / 2 (Allen-Cunneen).
+    Tail latencies add a log-normal service-time quantile to the
+    exponential-tail waiting-time quantile, which is a slight overestimate.
+    All arguments broadcast against each other.
+
+    Args:
+        servers (array-like): Number of servers
+        service_time_ms (array-like): Mean service time in ms
+        arrival_rate (array-like): Offered load in req/sec
+        service_cv (array-like): Coefficient of variation of service times.
+            Defaults to 1.0 (exponential).
+        arrival_cv (array-like): Coefficient of variation of inter-arrival
+            times. Defaults to 1.0 (Poisson).
+
+    Returns:
+        dict: Arrays of throughput (req/sec), utilization (0-1), wait
+            probability and mean, p95 and p99 latency in ms (inf when the
+            offered load exceeds capacity)
+    """
+    servers, service_time_ms, arrival_rate, service_cv, arrival_cv = np.broadcast_arrays(
+        np.asarray(servers, dtype=np.int64),
+        np.asarray(service_time_ms, dtype=float),
+        np.asarray(arrival_rate, dtype=float),
+        np.asarray(service_cv, dtype=float),
+        np.asarray(arrival_cv, dtype=float)
+    )
+
+    service_time = service_time_ms / 1000
+    capacity = servers / service_time
+    offered_traffic = arrival_rate * service_time
+    utilization = np.minimum(offered_traffic / servers, 1.0)
+    stable = offered_traffic < servers
+
+    wait_probability = erlang_c(servers, offered_traffic)
+    variability = (arrival_cv ** 2 + service_cv ** 2) / 2
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Waiting-time tail: P(W > t) ~= C * exp(-decay * t)
+        decay = np.where(stable, (capacity - arrival_rate) / variability, 0.0)
+        mean_wait = np.where(stable, wait_probability / decay, np.inf)
+
+        sigma = np.sqrt(np.log1p(service_cv ** 2))
+        mu = np.log(service_time) - sigma ** 2 / 2
+
+        tails = {}
+        for percentile, z in _Z_SCORES.items():
+            service_quantile = np.exp(mu + sigma * z)
+            wait_quantile = np.where(
+                stable,
+                np.maximum(np.log(wait_probability / (1 - percentile / 100)), 0.0) / decay,
+                np.inf
+            )
+            tails[percentile] = (service_quantile + wait_quantile) * 1000
+
+    return {
+        "throughput": np.minimum(arrival_rate, capacity),
+        "utilization": utilization,
+        "wait_probability": np.where(stable, wait_probability, 1.0),
+        "mean_latency": (service_time + mean_wait) * 1000,
+        "p95_latency": tails[95],
+        "p99_latency": tails[99]
+    }
+
+def simulate_pattern_load(pattern_name, arrival_rate=None, arch_data=None):
+    """
+    Evaluate a pattern's queue model at one or more offered loads
+
+    Args:
+        pattern_name (str): Name of the architecture pattern
+        arrival_rate (array-like, optional): Offered load in req/sec.
+            Defaults to the pattern's standard offered load.
+        arch_data (dict, optional): Architecture data. Defaults to None.
+
+    Returns:
+        dict: Output of evaluate_queue
+    """
+    model = get_queue_model(pattern_name, arch_data)
+    if arrival_rate is None:
+        arrival_rate = model["offered_load"]
+
+    return evaluate_queue(
+        model["servers"],
+        model["service_time_ms"],
+        arrival_rate,
+        model["service_cv"],
+        model["arrival_cv"]
+    )
+
+def simulate_load_sweep(pattern_names=None, load_fractions=None, arch_data=None):
+    """
+    Sweep every pattern from light load to saturation in one vectorized call
+
+    Args:
+        pattern_names (list, optional): Patterns to sweep. Defaults to all.
+        load_fractions (array-like, optional): Offered load as a fraction of
+            each pattern's capacity. Defaults to 50 points from 5% to 99%.
+        arch_data (dict, optional): Architecture data. Defaults to None.
+
+    Returns:
+        pandas.DataFrame: One row per pattern and load with the queue metrics
+    """
+    import pandas as pd
+
+    if arch_data is None:
+        arch_data = load_architecture_data()
+    if pattern_names is None:
+        pattern_names = list(arch_data.keys())
+    if load_fractions is None:
+        load_fractions = np.linspace(0.05, 0.99, 50)
+    load_fractions = np.asarray(load_fractions, dtype=float)
+
+    models = [get_queue_model(pattern, arch_data) for pattern in pattern_names]
+    servers = np.array([model["servers"] for model in models])[:, None]
+    service_time_ms = np.array([model["service_time_ms"] for model in models], dtype=float)[:, None]
+    service_cv = np.array([model["service_cv"] for model in models], dtype=float)[:, None]
+    arrival_cv = np.array([model["arrival_cv"] for model in models], dtype=float)[:, None]
+    arrival_rate = load_fractions[None, :] * servers / (service_time_ms / 1000)
+
+    results = evaluate_queue(servers, service_time_ms, arrival_rate, service_cv, arrival_cv)
+
+    return pd.DataFrame({
+        "Pattern": np.repeat(pattern_names, len(load_fractions)),
+        "Offered Load": arrival_rate.ravel(),
+        "Load Fraction": np.tile(load_fractions, len(pattern_names)),
+        "Throughput": results["throughput"].ravel(),
+        "Utilization": results["utilization"].ravel() * 100,
+        "Mean Latency": results["mean_latency"].ravel(),
+        "P95 Latency": results["p95_latency"].ravel(),
+        "P99 Latency": results["p99_latency"].ravel()
+    })
@@ -0,0 +1,532 @@
+import math
+import os
+import threading
+import time
+import numpy as np
+from utils.latency_histogram import LatencyHistogram
+
+# Whether per-process statistics can be read from /proc (Linux only)
+PROC_AVAILABLE = os.path.isdir("/proc/self/task")
+
+# Throughput per core (req/sec) that maps to Cost Efficiency 1 and 5; log-linear in between
+COST_EFFICIENCY_RANGE = (100.0, 10000.0)
+
+# Limits beyond which the load generator, not the target, is the bottleneck
+SATURATION_LIMITS = {
+    # Share of the available cores the load generator may keep busy
+    "cpu_fraction": 0.85,
+    # Python code in one process runs on about one core at a time (GIL)
+    "process_cores": 0.9,
+    # p99 delay before a callback posted to the event loop runs, ms
+    "loop_lag_ms": 20.0,
+    # p99 oversleep of a timer thread, ms
+    "timer_lag_ms": 20.0,
+    # Time runnable threads spent waiting for a CPU, per second of CPU they got
+    "run_queue_ratio": 0.5
+}
+
+# CPU (in cores) one load-generator process should use at most for clean measurements
+TARGET_CORES_PER_PROCESS = 0.6
+
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+def _read_cpu_ticks(stat_path):
+    # The command name may contain spaces, so split after its closing parenthesis
+    with open(stat_path, "r") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    # utime and stime are fields 14 and 15 of the full line
+    return int(fields[11]) + int(fields[12])
+
+def available_cores(pid):
+    """
+    Number of CPUs a process may run on
+
+    Returns:
+        int: Size of the CPU affinity set, or the CPU count where that is unknown
+    """
+    try:
+        return len(os.sched_getaffinity(pid))
+    except (AttributeError, OSError):
+        return os.cpu_count() or 1
+
+class ProcessSampler:
+    """
+    Samples a local process's CPU, memory, threads and open files from /proc
+
+    A background thread takes one sample per interval. CPU can be counted
+    for the whole process or only for some of its threads (e.g. the event
+    loop thread of an in-process TargetServer), since the load generator
+    may share the process. Memory, thread and file counts are always
+    process-wide. Use it as a context manager around the load.
+    """
+
+    def __init__(self, pid=None, thread_ids=None, interval=0.5):
+        """
+        Args:
+            pid (int, optional): Process to sample. Defaults to this process.
+            thread_ids (list, optional): Native ids of the threads whose CPU
+                time counts. Defaults to the whole process.
+            interval (float): Seconds between samples. Defaults to 0.5.
+        """
+        if not PROC_AVAILABLE:
+            raise RuntimeError("Process sampling needs a Linux /proc filesystem")
+        self.pid = pid or os.getpid()
+        self.thread_ids = list(thread_ids) if thread_ids else None
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = None
+        self._start = None
+        self._last = None
+
+        if not os.path.isdir(f"/proc/{self.pid}"):
+            raise ValueError(f"No process with id {self.pid}")
+
+    @property
+    def capacity(self):
+        """Cores the sampled CPU time can use at most: one per sampled thread, or the process's affinity set"""
+        if self.thread_ids:
+            return min(len(self.thread_ids), available_cores(self.pid))
+        return available_cores(self.pid)
+
+    def _cpu_ticks(self):
+        if self.thread_ids is None:
+            return _read_cpu_ticks(f"/proc/{self.pid}/stat")
+        total = 0
+        for thread_id in self.thread_ids:
+            try:
+                total += _read_cpu_ticks(f"/proc/{self.pid}/task/{thread_id}/stat")
+            except FileNotFoundError:
+                # The thread has exited; its time is no longer reported
+                pass
+        return total
+
+    def _read(self):
+        now = time.perf_counter()
+        ticks = self._cpu_ticks()
+
+        with open(f"/proc/{self.pid}/statm", "r") as f:
+            rss_pages = int(f.read().split()[1])
+        threads = len(os.listdir(f"/proc/{self.pid}/task"))
+        try:
+            fds = len(os.listdir(f"/proc/{self.pid}/fd"))
+        except PermissionError:
+            fds = None
+        return now, ticks, rss_pages * _PAGE_SIZE / 2 ** 20, threads, fds
+
+    def sample(self):
+        """
+        Take one sample now and append it to samples
+
+        Returns:
+            dict: time (s since start), cpu_cores (cores busy since the
+                previous sample), cpu_percent (of capacity), rss_mb,
+                threads and fds (None if not readable)
+        """
+        now, ticks, rss_mb, threads, fds = self._read()
+        if self._last is None:
+            self._start = now
+            cpu_cores = 0.0
+        else:
+            last_time, last_ticks = self._last
+            cpu_cores = (ticks - last_ticks) / _CLOCK_TICKS / (now - last_time) if now > last_time else 0.0
+        self._last = (now, ticks)
+
+        sample = {
+            "time": now - self._start,
+            "cpu_cores": cpu_cores,
+            "cpu_percent": cpu_cores / self.capacity * 100,
+            "rss_mb": rss_mb,
+            "threads": threads,
+            "fds": fds
+        }
+        self.samples.append(sample)
+        return sample
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample()
+            except (FileNotFoundError, ProcessLookupError):
+                # The process exited
+                break
+
+    def start(self):
+        """
+        Take a first sample and keep sampling in a background thread
+
+        Returns:
+            ProcessSampler: self
+        """
+        self.sample()
+        self._thread = threading.Thread(target=self._run, name="process-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stop sampling, taking a final sample so the whole run is covered
+        """
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            try:
+                self.sample()
+            except (FileNotFoundError, ProcessLookupError):
+                pass
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def summary(self, throughput=None):
+        """
+        Summarize the samples taken so far
+
+        Args:
+            throughput (float, optional): Throughput in req/sec achieved while
+                sampling, to compute the per-core efficiency
+
+        Returns:
+            dict: Mean and peak cpu_cores and cpu_percent, peak rss_mb,
+                max threads and fds, the core capacity, and with a
+                throughput, throughput_per_core (req/sec per busy core)
+        """
+        # The first sample has no CPU delta
+        busy = np.array([sample["cpu_cores"] for sample in self.samples[1:]], dtype=float)
+        elapsed = self.samples[-1]["time"] if self.samples else 0.0
+        cpu_seconds = float(np.sum(busy * np.diff([sample["time"] for sample in self.samples]))) if busy.size else 0.0
+        mean_cores = cpu_seconds / elapsed if elapsed > 0 else 0.0
+        fds = [sample["fds"] for sample in self.samples if sample["fds"] is not None]
+
+        summary = {
+            "samples": len(self.samples),
+            "duration": elapsed,
+            "capacity_cores": self.capacity,
+            "cpu_seconds": cpu_seconds,
+            "mean_cpu_cores": mean_cores,
+            "peak_cpu_cores": float(busy.max()) if busy.size else 0.0,
+            "mean_cpu_percent": mean_cores / self.capacity * 100,
+            "peak_cpu_percent": float(busy.max()) / self.capacity * 100 if busy.size else 0.0,
+            "peak_rss_mb": max((sample["rss_mb"] for sample in self.samples), default=0.0),
+            "max_threads": max((sample["threads"] for sample in self.samples), default=0),
+            "max_fds": max(fds) if fds else None
+        }
+        if throughput is not None:
+            summary["throughput_per_core"] = throughput / mean_cores if mean_cores > 0 else None
+        return summary
+
+def cost_efficiency_score(throughput_per_core):
+    """
+    Map throughput per busy core onto the 1-5 Cost Efficiency scale
+
+    Args:
+        throughput_per_core (float): req/sec per core, or None if unknown
+
+    Returns:
+        float: Score, log-linear between the ends of COST_EFFICIENCY_RANGE, or
+            None when throughput_per_core is None
+    """
+    if throughput_per_core is None:
+        return None
+    low, high = COST_EFFICIENCY_RANGE
+    position = math.log(max(throughput_per_core, low) / low) / math.log(high / low)
+    return round(1 + 4 * min(position, 1.0), 2)
+
+def _read_run_queue_ns(pid, thread_ids):
+    # Field 2 of schedstat is the time spent runnable but waiting for a CPU
+    total = 0
+    for thread_id in thread_ids:
+        try:
+            with open(f"/proc/{pid}/task/{thread_id}/schedstat", "r") as f:
+                total += int(f.read().split()[1])
+        except (FileNotFoundError, IndexError, ValueError):
+            pass
+    return total
+
+class LoadGeneratorMonitor:
+    """
+    Watches the load generator itself for signs that it is the bottleneck
+
+    While a test runs, a background thread tracks the CPU use of the threads
+    added with add_thread (the run's workers or event loop, not whatever else
+    this process is doing), how late its own timer wakes up (GIL and CPU
+    contention), how long those threads wait for a CPU, and, for the asyncio
+    engine, how late callbacks posted to the event loop run.
+    When any of them crosses SATURATION_LIMITS, latencies include the load
+    generator's own queueing and the run should not be trusted.
+    """
+
+    def __init__(self, interval=0.1):
+        self.interval = interval
+        self.loop_lag = LatencyHistogram()
+        self.timer_lag = LatencyHistogram()
+        self._pid = os.getpid()
+        self._loop = None
+        self._probe_pending = False
+        self._stop = threading.Event()
+        self._thread = None
+        self._started = None
+        self._elapsed = 0.0
+        self._cpu_seconds = 0.0
+        self._run_queue_seconds = 0.0
+        self._cpu_samples = []
+        # Native id of every thread of the run, mapped to its CPU and run-queue seconds at the last sample
+        self._threads = {}
+        self._threads_lock = threading.Lock()
+
+    def add_thread(self, thread_id=None):
+        """
+        Count a thread's CPU as load generation for this run
+
+        Only CPU the thread uses from now on is counted.
+
+        Args:
+            thread_id (int, optional): Native thread id. Defaults to the
+                calling thread.
+        """
+        thread_id = threading.get_native_id() if thread_id is None else thread_id
+        usage = self._thread_usage(thread_id) if PROC_AVAILABLE else None
+        with self._threads_lock:
+            self._threads.setdefault(thread_id, usage or (0.0, 0.0))
+
+    def _thread_usage(self, thread_id):
+        # CPU and run-queue seconds of one thread so far, or None once it has exited
+        try:
+            cpu = _read_cpu_ticks(f"/proc/{self._pid}/task/{thread_id}/stat") / _CLOCK_TICKS
+        except FileNotFoundError:
+            return None
+        return cpu, _read_run_queue_ns(self._pid, [thread_id]) / 1e9
+
+    def _usage_delta(self):
+        # CPU and run-queue seconds the run's threads used since the last call
+        cpu = wait = 0.0
+        with self._threads_lock:
+            threads = list(self._threads.items())
+        for thread_id, (last_cpu, last_wait) in threads:
+            usage = self._thread_usage(thread_id)
+            with self._threads_lock:
+                if usage is None:
+                    # Exited; its id may be reused by an unrelated thread
+                    self._threads.pop(thread_id, None)
+                    continue
+                self._threads[thread_id] = usage
+            cpu += max(usage[0] - last_cpu, 0.0)
+            wait += max(usage[1] - last_wait, 0.0)
+        return cpu, wait
+
+    def watch_loop(self, loop):
+        """
+        Also measure the lag of an event loop; call from inside the loop
+        """
+        self._loop = loop
+
+    def unwatch_loop(self):
+        self._loop = None
+
+    def _loop_probe(self, posted):
+        self.loop_lag.record((time.perf_counter() - posted) * 1000)
+        self._probe_pending = False
+
+    def _run(self):
+        last_time = time.perf_counter()
+        while not self._stop.is_set():
+            time.sleep(self.interval)
+            now = time.perf_counter()
+            self.timer_lag.record(max(now - last_time - self.interval, 0.0) * 1000)
+
+            loop = self._loop
+            if loop is not None and not self._probe_pending:
+                self._probe_pending = True
+                try:
+                    loop.call_soon_threadsafe(self._loop_probe, now)
+                except RuntimeError:
+                    # The loop closed between tests
+                    self._loop = None
+                    self._probe_pending = False
+
+            if PROC_AVAILABLE:
+                cpu, wait = self._usage_delta()
+                self._cpu_seconds += cpu
+                self._run_queue_seconds += wait
+                self._cpu_samples.append(cpu / (now - last_time))
+            last_time = now
+
+    def start(self):
+        """
+        Start monitoring in a background thread
+
+        Returns:
+            LoadGeneratorMonitor: self
+        """
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="loadgen-monitor", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stop monitoring and wait for the background thread to exit
+        """
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            self._elapsed = time.perf_counter() - self._started
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def report(self, concurrency, processes=1, engine="threads"):
+        """
+        Judge whether the load generator saturated during the monitored run
+
+        Args:
+            concurrency (int): Total concurrency of the run
+            processes (int): Load-generator processes used. Defaults to 1.
+            engine (str): Load engine used. Defaults to "threads".
+
+        Returns:
+            dict: Measured cpu_cores, cpu_percent (of the available cores),
+                run_queue_ratio, loop_lag_p99 and timer_lag_p99 in ms (None
+                when not measured), whether the run is saturated, the reasons,
+                and suggested_processes and suggested_concurrency_per_process
+        """
+        cores = available_cores(self._pid)
+        cpu_cores = self._cpu_seconds / self._elapsed if self._elapsed > 0 else 0.0
+        return build_saturation_report(
+            cpu_cores=cpu_cores,
+            peak_cpu_cores=max(self._cpu_samples, default=0.0),
+            available=cores,
+            run_queue_ratio=self._run_queue_seconds / self._cpu_seconds if self._cpu_seconds > 0 else 0.0,
+            loop_lag_p99=self.loop_lag.percentile(99) if self.loop_lag.count else None,
+            timer_lag_p99=self.timer_lag.percentile(99) if self.timer_lag.count else None,
+            concurrency=concurrency,
+            processes=processes,
+            engine=engine,
+            measured_cpu=PROC_AVAILABLE
+        )
+
+def build_saturation_report(cpu_cores, peak_cpu_cores, available, run_queue_ratio, loop_lag_p99, timer_lag_p99,
+                            concurrency, processes=1, engine="threads", measured_cpu=True):
+    """
+    Flag a saturated load generator and suggest how to spread the load
+
+    Args:
+        cpu_cores (float): Mean cores busy in each process
+        peak_cpu_cores (float): Busiest sampling interval of any process, in cores
+        available (int): Cores available to the load generator
+        run_queue_ratio (float): CPU wait per CPU second used
+        loop_lag_p99 (float): p99 event-loop lag in ms, or None
+        timer_lag_p99 (float): p99 timer oversleep in ms, or None
+        concurrency (int): Total concurrency of the run
+        processes (int): Load-generator processes used
+        engine (str): Load engine used
+        measured_cpu (bool): Whether CPU figures were measured
+
+    Returns:
+        dict: See LoadGeneratorMonitor.report
+    """
+    limits = SATURATION_LIMITS
+    total_cores = cpu_cores * processes
+    reasons = []
+    if measured_cpu:
+        if total_cores >= limits["cpu_fraction"] * available:
+            reasons.append(f"used {total_cores:.2f} of {available} available cores")
+        elif cpu_cores >= limits["process_cores"]:
+            reasons.append(f"each process kept {cpu_cores:.2f} cores busy, the limit for one Python process")
+        if run_queue_ratio >= limits["run_queue_ratio"]:
+            reasons.append(f"threads waited {run_queue_ratio:.2f}s for a CPU per CPU second")
+    if loop_lag_p99 is not None and loop_lag_p99 >= limits["loop_lag_ms"]:
+        reasons.append(f"event loop lag p99 was {loop_lag_p99:.1f} ms")
+    if timer_lag_p99 is not None and timer_lag_p99 >= limits["timer_lag_ms"]:
+        reasons.append(f"timer wake-ups were {timer_lag_p99:.1f} ms late (p99)")
+
+    return {
+        "reasons": reasons,
+        "cpu_cores": total_cores,
+        "peak_cpu_cores": peak_cpu_cores,
+        "cpu_percent": total_cores / available * 100 if available else 0.0,
+        "available_cores": available,
+        "run_queue_ratio": run_queue_ratio,
+        "loop_lag_p99": loop_lag_p99,
+        "timer_lag_p99": timer_lag_p99,
+        "engine": engine,
+        "processes": processes,
+        **_suggest_workers(reasons, total_cores, available, concurrency, processes)
+    }
+
+def _suggest_workers(reasons, total_cores, available, concurrency, processes):
+    saturated = bool(reasons)
+    suggested_processes = processes
+    if saturated:
+        # Spread the CPU that was needed so no process runs hot, within the cores there are
+        wanted = max(processes + 1, int(math.ceil(total_cores / TARGET_CORES_PER_PROCESS)))
+        suggested_processes = max(1, min(wanted, available))
+    return {
+        "saturated": saturated,
+        "suggested_processes": suggested_processes,
+        "suggested_concurrency_per_process": int(math.ceil(concurrency / suggested_processes)),
+        "needs_more_cores": saturated and suggested_processes <= processes
+    }
+
+def merge_saturation_reports(reports, concurrency, engine="threads"):
+    """
+    Combine the reports of the worker processes of a sharded run
+
+    Returns:
+        dict: One report for the whole run, saturated if any shard was
+    """
+    processes = len(reports)
+    available = reports[0]["available_cores"]
+    total_cores = sum(report["cpu_cores"] for report in reports)
+    loop_lags = [report["loop_lag_p99"] for report in reports if report["loop_lag_p99"] is not None]
+    timer_lags = [report["timer_lag_p99"] for report in reports if report["timer_lag_p99"] is not None]
+    
+    # A single hot shard is enough to distort the merged latencies
+    reasons = []
+    if PROC_AVAILABLE and total_cores >= SATURATION_LIMITS["cpu_fraction"] * available:
+        reasons.append(f"used {total_cores:.2f} of {available} available cores")
+    for i, report in enumerate(reports):
+        reasons.extend(f"process {i + 1}: {reason}" for reason in report["reasons"])
+    
+    return {
+        "reasons": reasons,
+        "cpu_cores": total_cores,
+        "peak_cpu_cores": max(report["peak_cpu_cores"] for report in reports),
+        "cpu_percent": total_cores / available * 100 if available else 0.0,
+        "available_cores": available,
+        "run_queue_ratio": max(report["run_queue_ratio"] for report in reports),
+        "loop_lag_p99": max(loop_lags) if loop_lags else None,
+        "timer_lag_p99": max(timer_lags) if timer_lags else None,
+        "engine": engine,
+        "processes": processes,
+        **_suggest_workers(reasons, total_cores, available, concurrency, processes)
+    }
+
+def describe_saturation(report):
+    """
+    One-paragraph warning for a saturated load generator
+
+    Returns:
+        str: Message naming the symptoms and the suggested setup, or None
+            when the load generator kept up
+    """
+    if not report or not report["saturated"]:
+        return None
+    message = "The load generator was a bottleneck, so latencies include its own queueing: " + "; ".join(
+        report["reasons"]) + "."
+    if report["needs_more_cores"]:
+        message += (f" It already uses the {report['available_cores']} available core(s); run the load from a "
+                    "bigger machine or lower the concurrency.")
+    else:
+        message += (f" Try {report['suggested_processes']} processes with "
+                    f"{report['suggested_concurrency_per_process']} concurrent requests each.")
+    return message
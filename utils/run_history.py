@@ -0,0 +1,254 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import numpy as np
+import pandas as pd
+from utils.data_manager import DATA_DIR
+
+# Run history database, kept next to the pattern catalog
+HISTORY_DB = os.path.join(DATA_DIR, "run_history.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    pattern TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    test_type TEXT,
+    parameters TEXT,
+    summary TEXT
+);
+CREATE TABLE IF NOT EXISTS run_metrics (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    pattern TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    metric TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (run_id, metric)
+);
+CREATE INDEX IF NOT EXISTS runs_pattern_time ON runs (pattern, timestamp);
+CREATE INDEX IF NOT EXISTS runs_time ON runs (timestamp);
+CREATE INDEX IF NOT EXISTS run_metrics_pattern_metric_time ON run_metrics (pattern, metric, timestamp);
+"""
+
+_initialized = set()
+_init_lock = threading.Lock()
+
+def _connect(db_path=None):
+    # One short-lived connection per call keeps the store safe to use from every Streamlit session thread
+    db_path = db_path or HISTORY_DB
+    connection = sqlite3.connect(db_path, timeout=10)
+    connection.execute("PRAGMA foreign_keys = ON")
+    with _init_lock:
+        if db_path not in _initialized:
+            # WAL lets the dashboard read while a test run is being recorded
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.executescript(_SCHEMA)
+            _initialized.add(db_path)
+    return connection
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return str(value)
+
+def scalar_summary(results):
+    """
+    Keep the scalar fields of a test result for storing as a run summary
+
+    Nested timelines, histograms and per-request lists are dropped so the
+    stored summary stays small.
+
+    Args:
+        results (dict): Test result, e.g. from run_throughput_test
+
+    Returns:
+        dict: Fields whose values are numbers, strings, booleans or None
+    """
+    if not results:
+        return None
+    return {
+        key: value.item() if isinstance(value, np.generic) else value
+        for key, value in results.items()
+        if value is None or isinstance(value, (int, float, str, bool, np.generic))
+    }
+
+def record_runs(runs, db_path=None):
+    """
+    Record several test runs in one transaction
+
+    Args:
+        runs (list): Dicts with a "pattern", a "metrics" dict of metric name
+            to value and optionally a "timestamp" (epoch seconds, defaults to
+            now), "test_type", "parameters" and "summary"
+        db_path (str, optional): Database file. Defaults to HISTORY_DB.
+
+    Returns:
+        list: Ids of the recorded runs
+    """
+    run_ids = []
+    connection = _connect(db_path)
+    try:
+        with connection:
+            for run in runs:
+                timestamp = run.get("timestamp", time.time())
+                cursor = connection.execute(
+                    "INSERT INTO runs (pattern, timestamp, test_type, parameters, summary) VALUES (?, ?, ?, ?, ?)",
+                    (
+                        run["pattern"],
+                        timestamp,
+                        run.get("test_type"),
+                        json.dumps(run.get("parameters") or {}, default=_json_default),
+                        json.dumps(run.get("summary"), default=_json_default)
+                    )
+                )
+                run_id = cursor.lastrowid
+                connection.executemany(
+                    "INSERT INTO run_metrics (run_id, pattern, timestamp, metric, value) VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (run_id, run["pattern"], timestamp, metric, float(value))
+                        for metric, value in run["metrics"].items()
+                        if value is not None
+                    ]
+                )
+                run_ids.append(run_id)
+    finally:
+        connection.close()
+    return run_ids
+
+def record_run(pattern, metrics, test_type=None, parameters=None, summary=None, timestamp=None, db_path=None):
+    """
+    Record one test run
+
+    Args:
+        pattern (str): Pattern the run measured
+        metrics (dict): Metric names mapped to the measured values
+        test_type (str, optional): Kind of test, e.g. "Local Target Test"
+        parameters (dict, optional): Settings the test ran with
+        summary (dict, optional): Raw result summary
+        timestamp (float, optional): Epoch seconds. Defaults to now.
+        db_path (str, optional): Database file. Defaults to HISTORY_DB.
+
+    Returns:
+        int: Id of the recorded run
+    """
+    run = {"pattern": pattern, "metrics": metrics, "test_type": test_type, "parameters": parameters,
+           "summary": summary}
+    if timestamp is not None:
+        run["timestamp"] = timestamp
+    return record_runs([run], db_path)[0]
+
+def get_latest_runs(pattern=None, limit=20, db_path=None):
+    """
+    Get the most recent runs, newest first
+
+    Args:
+        pattern (str, optional): Only runs of this pattern
+        limit (int): Maximum number of runs. Defaults to 20.
+        db_path (str, optional): Database file. Defaults to HISTORY_DB.
+
+    Returns:
+        list: Run dicts with id, pattern, timestamp, test_type, parameters,
+            summary and a metrics dict
+    """
+    connection = _connect(db_path)
+    try:
+        if pattern is None:
+            rows = connection.execute(
+                "SELECT id, pattern, timestamp, test_type, parameters, summary FROM runs "
+                "ORDER BY timestamp DESC, id DESC LIMIT ?", (limit,)
+            ).fetchall()
+        else:
+            rows = connection.execute(
+                "SELECT id, pattern, timestamp, test_type, parameters, summary FROM runs WHERE pattern = ? "
+                "ORDER BY timestamp DESC, id DESC LIMIT ?", (pattern, limit)
+            ).fetchall()
+
+        runs = {
+            row[0]: {
+                "id": row[0],
+                "pattern": row[1],
+                "timestamp": row[2],
+                "test_type": row[3],
+                "parameters": json.loads(row[4]) if row[4] else {},
+                "summary": json.loads(row[5]) if row[5] else None,
+                "metrics": {}
+            }
+            for row in rows
+        }
+        if runs:
+            placeholders = ", ".join("?" * len(runs))
+            for run_id, metric, value in connection.execute(
+                f"SELECT run_id, metric, value FROM run_metrics WHERE run_id IN ({placeholders})", list(runs)
+            ):
+                runs[run_id]["metrics"][metric] = value
+    finally:
+        connection.close()
+    return list(runs.values())
+
+def get_metric_history(pattern=None, metrics=None, start=None, end=None, db_path=None):
+    """
+    Get measured metric values over a time range, oldest first
+
+    Args:
+        pattern (str, optional): Only values of this pattern
+        metrics (list, optional): Only these metrics
+        start (float, optional): Earliest timestamp (epoch seconds), inclusive
+        end (float, optional): Latest timestamp (epoch seconds), inclusive
+        db_path (str, optional): Database file. Defaults to HISTORY_DB.
+
+    Returns:
+        pandas.DataFrame: One row per run and metric with run_id, pattern,
+            timestamp (datetime), metric and value columns
+    """
+    conditions = []
+    params = []
+    if pattern is not None:
+        conditions.append("pattern = ?")
+        params.append(pattern)
+    if metrics:
+        conditions.append(f"metric IN ({', '.join('?' * len(metrics))})")
+        params.extend(metrics)
+    if start is not None:
+        conditions.append("timestamp >= ?")
+        params.append(start)
+    if end is not None:
+        conditions.append("timestamp <= ?")
+        params.append(end)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    connection = _connect(db_path)
+    try:
+        rows = connection.execute(
+            f"SELECT run_id, pattern, timestamp, metric, value FROM run_metrics {where} ORDER BY timestamp, run_id",
+            params
+        ).fetchall()
+    finally:
+        connection.close()
+
+    history = pd.DataFrame(rows, columns=["run_id", "pattern", "timestamp", "metric", "value"])
+    history["timestamp"] = pd.to_datetime(history["timestamp"], unit="s")
+    return history
+
+def get_rolling_median(pattern, metric, window=5, start=None, end=None, db_path=None):
+    """
+    Get a metric's values for a pattern with their rolling median
+
+    Args:
+        pattern (str): Pattern name
+        metric (str): Metric name
+        window (int): Number of runs in the median. Defaults to 5.
+        start (float, optional): Earliest timestamp (epoch seconds)
+        end (float, optional): Latest timestamp (epoch seconds)
+        db_path (str, optional): Database file. Defaults to HISTORY_DB.
+
+    Returns:
+        pandas.DataFrame: timestamp, value and rolling_median columns, oldest first
+    """
+    history = get_metric_history(pattern, [metric], start=start, end=end, db_path=db_path)
+    history = history[["timestamp", "value"]].reset_index(drop=True)
+    history["rolling_median"] = history["value"].rolling(window, min_periods=1).median()
+    return history
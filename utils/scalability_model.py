@@ -0,0 +1,255 @@
+import numpy as np
+import pandas as pd
+from utils.data_manager import load_architecture_data
+
+def get_usl_parameters(pattern_name, arch_data=None):
+    """
+    Get the Universal Scalability Law parameters of a pattern
+
+    Uses the pattern's "usl" record when present; otherwise the single-node
+    throughput is the pattern's Throughput metric with moderate contention
+    and coherency costs.
+
+    Args:
+        pattern_name (str): Name of the architecture pattern
+        arch_data (dict, optional): Architecture data. Defaults to None.
+
+    Returns:
+        dict: lambda (single-node req/sec), sigma (contention), kappa (coherency),
+            latency_ms (single-node latency) and utilization (single-node
+            resource utilization in %)
+    """
+    if arch_data is None:
+        arch_data = load_architecture_data()
+
+    pattern_data = arch_data.get(pattern_name, {})
+    metrics = pattern_data.get("metrics", {})
+    parameters = {
+        "lambda": float(metrics.get("Throughput", {}).get("value", 1000)),
+        "sigma": 0.1,
+        "kappa": 0.001,
+        "latency_ms": float(metrics.get("Latency", {}).get("value", 200)),
+        "utilization": float(metrics.get("Resource Utilization", {}).get("value", 60))
+    }
+    parameters.update(pattern_data.get("usl", {}))
+    return parameters
+
+def usl_throughput(nodes, lam, sigma, kappa):
+    """
+    Throughput of N nodes under the Universal Scalability Law
+
+    X(N) = lambda * N / (1 + sigma * (N - 1) + kappa * N * (N - 1))
+
+    All arguments broadcast against each other.
+    """
+    nodes = np.asarray(nodes, dtype=float)
+    return lam * nodes / (1 + sigma * (nodes - 1) + kappa * nodes * (nodes - 1))
+
+def usl_peak_nodes(sigma, kappa):
+    """
+    Node count at which USL throughput peaks, sqrt((1 - sigma) / kappa)
+
+    Returns:
+        numpy.ndarray: Peak node count, inf when there is no coherency cost
+    """
+    sigma = np.asarray(sigma, dtype=float)
+    kappa = np.asarray(kappa, dtype=float)
+    with np.errstate(divide="ignore"):
+        return np.where(kappa > 0, np.sqrt(np.maximum(1 - sigma, 0.0) / kappa), np.inf)
+
+def compute_scaling_curves(pattern_names=None, max_nodes=64, arch_data=None):
+    """
+    Compute throughput, latency, efficiency and per-node resource curves for 1..max_nodes nodes
+
+    Every pattern and node count is evaluated in one broadcast step. Load is
+    assumed to grow with the node count, so by Little's law latency grows by
+    the same factor that per-node throughput falls:
+    R(N) = R(1) * (1 + sigma * (N - 1) + kappa * N * (N - 1)).
+    Each node stays as busy as a single node (the pattern's Resource
+    Utilization); the share of that busy time turning into throughput falls
+    with efficiency and the rest goes to contention and coherency.
+
+    Args:
+        pattern_names (list, optional): Patterns to model. Defaults to all.
+        max_nodes (int): Largest node count. Defaults to 64.
+        arch_data (dict, optional): Architecture data. Defaults to None.
+
+    Returns:
+        pandas.DataFrame: One row per pattern and node count with Throughput
+            (req/sec), Latency (ms), Efficiency (% of linear scaling), and the
+            Utilization (useful work) and Overhead of each node (% of the node)
+    """
+    if arch_data is None:
+        arch_data = load_architecture_data()
+    if pattern_names is None:
+        pattern_names = list(arch_data.keys())
+
+    parameters = [get_usl_parameters(pattern, arch_data) for pattern in pattern_names]
+    lam = np.array([p["lambda"] for p in parameters], dtype=float)[:, None]
+    sigma = np.array([p["sigma"] for p in parameters], dtype=float)[:, None]
+    kappa = np.array([p["kappa"] for p in parameters], dtype=float)[:, None]
+    latency = np.array([p["latency_ms"] for p in parameters], dtype=float)[:, None]
+    utilization = np.array([p["utilization"] for p in parameters], dtype=float)[:, None]
+    nodes = np.arange(1, max_nodes + 1, dtype=float)[None, :]
+
+    throughput = usl_throughput(nodes, lam, sigma, kappa)
+    efficiency = throughput / (lam * nodes)
+
+    return pd.DataFrame({
+        "Pattern": np.repeat(pattern_names, max_nodes),
+        "Nodes": np.tile(nodes.ravel().astype(int), len(pattern_names)),
+        "Throughput": throughput.ravel(),
+        "Latency": (latency / efficiency).ravel(),
+        "Efficiency": efficiency.ravel() * 100,
+        "Utilization": (utilization * efficiency).ravel(),
+        "Overhead": (utilization * (1 - efficiency)).ravel()
+    })
+
+def get_scaling_limits(pattern_names=None, arch_data=None):
+    """
+    Where each pattern stops scaling
+
+    Args:
+        pattern_names (list, optional): Patterns to report. Defaults to all.
+        arch_data (dict, optional): Architecture data. Defaults to None.
+
+    Returns:
+        dict: Pattern names mapped to peak_nodes (whole nodes) and
+            peak_throughput (req/sec), or None for both when throughput never
+            stops growing
+    """
+    if arch_data is None:
+        arch_data = load_architecture_data()
+    if pattern_names is None:
+        pattern_names = list(arch_data.keys())
+
+    limits = {}
+    for pattern in pattern_names:
+        p = get_usl_parameters(pattern, arch_data)
+        peak_nodes, peak_throughput = _whole_peak(p["lambda"], p["sigma"], p["kappa"])
+        limits[pattern] = {"peak_nodes": peak_nodes, "peak_throughput": peak_throughput}
+    return limits
+
+def _whole_peak(lam, sigma, kappa):
+    # The optimum is continuous; report the better of its neighbouring whole loads
+    peak = float(usl_peak_nodes(sigma, kappa))
+    if not np.isfinite(peak):
+        return None, None
+    candidates = np.array([max(np.floor(peak), 1), max(np.ceil(peak), 1)])
+    throughput = usl_throughput(candidates, lam, sigma, kappa)
+    best = int(np.argmax(throughput))
+    return int(candidates[best]), float(throughput[best])
+
+def get_concurrency_model(pattern_name, arch_data=None):
+    """
+    Get the USL fit of a pattern's measured concurrency sweep
+
+    Args:
+        pattern_name (str): Name of the architecture pattern
+        arch_data (dict, optional): Architecture data. Defaults to None.
+
+    Returns:
+        dict: The "usl_concurrency" record stored by save_scalability_fit
+            (lambda in req/sec per concurrent request, sigma, kappa and the
+            goodness of fit under "fit"), or None if none was fitted
+    """
+    if arch_data is None:
+        arch_data = load_architecture_data()
+    return arch_data.get(pattern_name, {}).get("usl_concurrency")
+
+def predict_concurrency_throughput(pattern_name, concurrency, arch_data=None):
+    """
+    Predict a pattern's throughput at concurrency levels from its stored fit, without running load
+
+    Args:
+        pattern_name (str): Name of the architecture pattern
+        concurrency (array-like): Concurrent requests in flight
+        arch_data (dict, optional): Architecture data. Defaults to None.
+
+    Returns:
+        dict: throughput (numpy.ndarray, req/sec at each level), and
+            peak_concurrency (whole requests) and peak_throughput (req/sec),
+            both None when throughput never peaks
+
+    Raises:
+        KeyError: If no concurrency fit is stored for the pattern
+    """
+    model = get_concurrency_model(pattern_name, arch_data)
+    if model is None:
+        raise KeyError(f"No concurrency fit stored for {pattern_name}")
+    peak_concurrency, peak_throughput = _whole_peak(model["lambda"], model["sigma"], model["kappa"])
+    return {
+        "throughput": usl_throughput(concurrency, model["lambda"], model["sigma"], model["kappa"]),
+        "peak_concurrency": peak_concurrency,
+        "peak_throughput": peak_throughput
+    }
+
+def _solve_usl(loads, throughput, terms):
+    # N / X(N) = 1/lambda + (sigma/lambda) * (N - 1) + (kappa/lambda) * N * (N - 1) is linear
+    # in the coefficients; weighting rows by X^2 / N makes the residuals approximate
+    # throughput errors rather than errors in N / X
+    columns = [np.ones_like(loads), loads - 1, loads * (loads - 1)]
+    design = np.column_stack([columns[i] for i in terms])
+    weights = throughput ** 2 / loads
+    coefficients = np.linalg.lstsq(design * weights[:, None], loads / throughput * weights, rcond=None)[0]
+    full = np.zeros(3)
+    full[list(terms)] = coefficients
+    return full
+
+def fit_usl(sweep, load_key="concurrency", throughput_key="successful_throughput"):
+    """
+    Fit Universal Scalability Law parameters to measured throughput by least squares
+
+    Contention and coherency are constrained to be non-negative: a negative
+    estimate drops that term and the remaining ones are refitted.
+
+    Args:
+        sweep (list): Measurements, e.g. from run_scalability_sweep or the
+            curve of a concurrency capacity search
+        load_key (str): Key holding the load (concurrency or node count).
+            Defaults to "concurrency".
+        throughput_key (str): Key holding the measured throughput. Defaults
+            to "successful_throughput".
+
+    Returns:
+        dict: lambda, sigma and kappa, goodness of fit (r_squared, rmse in
+            req/sec, points) and the extrapolated capacity (peak_load and
+            peak_throughput, None when throughput never peaks)
+    """
+    points = [(float(point[load_key]), float(point[throughput_key])) for point in sweep
+              if point[load_key] > 0 and point[throughput_key] > 0]
+    if len(points) < 3:
+        raise ValueError("Fitting the USL needs at least 3 measurements with non-zero throughput")
+
+    loads = np.array([load for load, _ in points])
+    throughput = np.array([value for _, value in points])
+
+    terms = [0, 1, 2]
+    coefficients = _solve_usl(loads, throughput, terms)
+    while any(coefficients[i] < 0 for i in terms[1:]):
+        terms.remove(min(terms[1:], key=lambda i: coefficients[i]))
+        coefficients = _solve_usl(loads, throughput, terms)
+    if coefficients[0] <= 0:
+        raise ValueError("Measurements do not fit the USL: throughput does not grow with load")
+
+    lam = 1 / coefficients[0]
+    sigma = coefficients[1] * lam
+    kappa = coefficients[2] * lam
+
+    predicted = usl_throughput(loads, lam, sigma, kappa)
+    residual = throughput - predicted
+    total = np.sum((throughput - throughput.mean()) ** 2)
+
+    peak_load = float(usl_peak_nodes(sigma, kappa))
+    peak_throughput = float(usl_throughput(peak_load, lam, sigma, kappa)) if np.isfinite(peak_load) else None
+
+    return {
+        "lambda": float(lam),
+        "sigma": float(sigma),
+        "kappa": float(kappa),
+        "r_squared": float(1 - np.sum(residual ** 2) / total) if total > 0 else 1.0,
+        "rmse": float(np.sqrt(np.mean(residual ** 2))),
+        "points": len(points),
+        "peak_load": peak_load if np.isfinite(peak_load) else None,
+        "peak_throughput": peak_throughput
+    }
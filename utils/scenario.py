@@ -0,0 +1,223 @@
+import json
+import os
+import threading
+import numpy as np
+from urllib.parse import urljoin, urlsplit
+from utils.data_manager import DATA_DIR
+from utils.latency_histogram import LatencyHistogram, latency_result_fields
+
+# Scenario files shipped with the app
+SCENARIO_DIR = os.path.join(DATA_DIR, "scenarios")
+
+def list_scenarios():
+    """
+    List the JSONL scenario files in SCENARIO_DIR
+
+    Returns:
+        list: Absolute paths, sorted by file name
+    """
+    if not os.path.isdir(SCENARIO_DIR):
+        return []
+    return sorted(
+        os.path.join(SCENARIO_DIR, name) for name in os.listdir(SCENARIO_DIR) if name.endswith(".jsonl")
+    )
+
+def _origin(url):
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    return scheme, (parts.hostname or "").lower(), parts.port or (443 if scheme == "https" else 80)
+
+def read_scenario(path, base_url=None, same_origin=False):
+    """
+    Stream the requests of a JSONL scenario file one line at a time
+
+    Each non-blank line is a JSON object with a "path" and optionally
+    "method" (default GET), "headers", "body", "weight" (default 1) and
+    "name" (default "METHOD path"). Lines starting with # are comments.
+    A dict or list body is sent as JSON.
+
+    Args:
+        path (str): Path of the JSONL file
+        base_url (str, optional): URL the request paths are resolved against
+        same_origin (bool): Reject paths that resolve to another scheme, host
+            or port than base_url, for engines whose connections all go to
+            base_url. Defaults to False.
+
+    Yields:
+        dict: name, method, path, headers, body (bytes), weight, and when
+            base_url is given the resolved url and request target
+    """
+    with open(path, "r") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                spec = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line_number}: invalid JSON: {e}") from None
+            if not isinstance(spec, dict) or "path" not in spec:
+                raise ValueError(f"{path}:{line_number}: each request needs a \"path\"")
+
+            method = str(spec.get("method", "GET")).upper()
+            headers = {str(name): str(value) for name, value in (spec.get("headers") or {}).items()}
+            body = spec.get("body")
+            if body is None:
+                body = b""
+            elif isinstance(body, (dict, list)):
+                body = json.dumps(body).encode()
+                if not any(name.lower() == "content-type" for name in headers):
+                    headers["Content-Type"] = "application/json"
+            else:
+                body = str(body).encode()
+
+            weight = float(spec.get("weight", 1))
+            if weight < 0:
+                raise ValueError(f"{path}:{line_number}: weight must not be negative")
+
+            request = {
+                "name": spec.get("name") or f"{method} {spec['path']}",
+                "method": method,
+                "path": spec["path"],
+                "headers": headers,
+                "body": body,
+                "weight": weight
+            }
+            if base_url is not None:
+                request["url"] = urljoin(base_url, spec["path"])
+                if same_origin and _origin(request["url"]) != _origin(base_url):
+                    raise ValueError(f"{path}:{line_number}: {request['url']} is not on the same host as {base_url}; "
+                                     "the asyncio engine only sends requests to the tested URL's host")
+                parts = urlsplit(request["url"])
+                request["target"] = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+            yield request
+
+class ScenarioMix:
+    """
+    Endless weighted mix of the requests in a scenario file
+
+    The file is re-read from disk on every pass instead of being held in
+    memory. Each request is repeated in proportion to its weight (fractional
+    weights are rounded at random, so the ratios hold on average) and drawn
+    through a bounded shuffle buffer, so heavy entries are interleaved with
+    the rest instead of sent back to back. Safe to draw from many threads.
+    Pass same_origin to reject requests to other hosts (see read_scenario).
+    """
+
+    def __init__(self, path, base_url=None, buffer_size=1024, seed=None, same_origin=False):
+        self.path = path
+        self.base_url = base_url
+        self.same_origin = same_origin
+        self.buffer_size = buffer_size
+        self._rng = np.random.default_rng(seed)
+        self._buffer = []
+        self._expanded = self._expand()
+        self._lock = threading.Lock()
+
+    def _expand(self):
+        while True:
+            has_weight = False
+            for request in read_scenario(self.path, self.base_url, self.same_origin):
+                has_weight = has_weight or request["weight"] > 0
+                copies = int(request["weight"])
+                if self._rng.random() < request["weight"] - copies:
+                    copies += 1
+                for _ in range(copies):
+                    yield request
+            if not has_weight:
+                raise ValueError(f"Scenario {self.path} has no requests with a positive weight")
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        with self._lock:
+            while len(self._buffer) < self.buffer_size:
+                self._buffer.append(next(self._expanded))
+            index = int(self._rng.integers(len(self._buffer)))
+            self._buffer[index], self._buffer[-1] = self._buffer[-1], self._buffer[index]
+            return self._buffer.pop()
+
+def validate_scenario(path, base_url=None, same_origin=False):
+    """
+    Read a scenario file once to report a bad line before any load is sent
+
+    Args:
+        path (str): Path of the JSONL file
+        base_url (str, optional): URL the request paths are resolved against
+        same_origin (bool): Reject requests to other hosts (see read_scenario)
+
+    Returns:
+        int: Number of requests in the file
+    """
+    return sum(1 for _ in read_scenario(path, base_url, same_origin))
+
+def _new_endpoint():
+    return {
+        "requests": 0,
+        "successful_requests": 0,
+        "failed_requests": 0,
+        "latencies": LatencyHistogram()
+    }
+
+def record_endpoint(endpoints, name, latency, success):
+    """
+    Count one finished request against its endpoint
+
+    Args:
+        endpoints (dict): Per-endpoint results, updated in place
+        name (str): Endpoint name from the scenario
+        latency (float): Latency in ms, or None if there was no response
+        success (bool): Whether the request counts as successful
+    """
+    endpoint = endpoints.get(name)
+    if endpoint is None:
+        endpoint = endpoints[name] = _new_endpoint()
+    endpoint["requests"] += 1
+    if success:
+        endpoint["successful_requests"] += 1
+    else:
+        endpoint["failed_requests"] += 1
+    if latency is not None:
+        endpoint["latencies"].record(latency)
+
+def merge_endpoints(target, source):
+    """
+    Add the per-endpoint results of source into target
+
+    Returns:
+        dict: target
+    """
+    for name, endpoint in source.items():
+        if name not in target:
+            target[name] = _new_endpoint()
+        for key in ("requests", "successful_requests", "failed_requests"):
+            target[name][key] += endpoint[key]
+        target[name]["latencies"].merge(endpoint["latencies"])
+    return target
+
+def summarize_endpoints(endpoints, elapsed):
+    """
+    Build the per-endpoint section of a throughput test result
+
+    Args:
+        endpoints (dict): Per-endpoint results
+        elapsed (float): Length of the timed window in seconds
+
+    Returns:
+        dict: Endpoint names mapped to request counts, share of traffic (%),
+            throughput, error rate and latency fields
+    """
+    total_requests = sum(endpoint["requests"] for endpoint in endpoints.values())
+    summaries = {}
+    for name, endpoint in sorted(endpoints.items()):
+        summaries[name] = {
+            "requests": endpoint["requests"],
+            "successful_requests": endpoint["successful_requests"],
+            "failed_requests": endpoint["failed_requests"],
+            "share": endpoint["requests"] / total_requests * 100 if total_requests else 0,
+            "throughput": endpoint["requests"] / elapsed if elapsed > 0 else 0,
+            "error_rate": endpoint["failed_requests"] / endpoint["requests"] * 100 if endpoint["requests"] else 0,
+            **latency_result_fields(endpoint["latencies"])
+        }
+    return summaries
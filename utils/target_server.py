@@ -0,0 +1,314 @@
+import asyncio
+import json
+import math
+import threading
+import numpy as np
+from utils.data_manager import load_architecture_data
+
+# Reason phrases for the status codes the local servers send
+STATUS_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    500: "Internal Server Error",
+    502: "Bad Gateway",
+    503: "Service Unavailable",
+    504: "Gateway Timeout"
+}
+
+async def read_request(reader):
+    """
+    Read one HTTP/1.1 request from a server-side stream
+
+    Args:
+        reader (asyncio.StreamReader): Connection reader
+
+    Returns:
+        dict: Method, target, version, lower-cased headers and body, or None
+            if the client closed the connection
+    """
+    request_line = await reader.readline()
+    if not request_line or request_line in (b"\r\n", b"\n"):
+        return None
+
+    parts = request_line.decode("latin-1").split()
+    if len(parts) != 3:
+        raise ValueError(f"Malformed request line: {request_line!r}")
+    method, target, version = parts
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if not line:
+            return None
+        if line in (b"\r\n", b"\n"):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    body = b""
+    content_length = int(headers.get("content-length", 0) or 0)
+    if content_length:
+        body = await reader.readexactly(content_length)
+
+    return {
+        "method": method,
+        "target": target,
+        "version": version,
+        "headers": headers,
+        "body": body
+    }
+
+def wants_keep_alive(request):
+    """
+    Whether the client asked to keep the connection open after this request
+    """
+    connection_header = request["headers"].get("connection", "").lower()
+    if request["version"] == "HTTP/1.0":
+        return connection_header == "keep-alive"
+    return connection_header != "close"
+
+async def write_response(writer, status_code, body=b"", content_type="application/json", keep_alive=True):
+    """
+    Write one HTTP/1.1 response with a Content-Length body
+
+    Args:
+        writer (asyncio.StreamWriter): Connection writer
+        status_code (int): HTTP status code
+        body (bytes): Response body
+        content_type (str): Content-Type header value
+        keep_alive (bool): Whether the connection stays open afterwards
+    """
+    head = (
+        f"HTTP/1.1 {status_code} {STATUS_REASONS.get(status_code, 'Unknown')}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        "\r\n"
+    )
+    writer.write(head.encode("latin-1") + body)
+    await writer.drain()
+
+def get_server_profile(pattern_name, arch_data=None, time_scale=1.0, latency_sigma=0.5):
+    """
+    Derive the behaviour of the stand-in server from a pattern's metrics
+
+    Service times are log-normal with the pattern's mean Latency, the error
+    rate is 100 - Availability, and the number of requests served at once
+    follows from Little's law so that the pattern's Throughput is its
+    capacity. Requests beyond capacity queue (up to one extra capacity's
+    worth) and are then rejected with 503.
+
+    Args:
+        pattern_name (str): Name of the architecture pattern
+        arch_data (dict, optional): Architecture data. Defaults to None.
+        time_scale (float): Multiplier on every service time. Values below 1
+            compress time for fast offline runs, which raises capacity by the
+            same factor. Defaults to 1.0.
+        latency_sigma (float): Shape of the log-normal service time. Defaults to 0.5.
+
+    Returns:
+        dict: Service time, error rate, concurrency and queue limits, and the
+            time_scale they were derived with
+    """
+    if arch_data is None:
+        arch_data = load_architecture_data()
+    if pattern_name not in arch_data:
+        raise KeyError(f"Unknown architecture pattern: {pattern_name}")
+
+    metrics = arch_data[pattern_name]["metrics"]
+    mean_latency = max(float(metrics["Latency"]["value"]), 0.1)
+    availability = min(max(float(metrics["Availability"]["value"]), 0.0), 100.0)
+    capacity = max(float(metrics["Throughput"]["value"]), 1.0)
+
+    max_concurrency = max(1, int(math.ceil(capacity * mean_latency / 1000)))
+
+    return {
+        "pattern": pattern_name,
+        "mean_latency_ms": mean_latency * time_scale,
+        "latency_sigma": latency_sigma,
+        "error_rate": (100.0 - availability) / 100.0,
+        "capacity": capacity / time_scale,
+        "max_concurrency": max_concurrency,
+        "max_queue": max_concurrency,
+        "time_scale": time_scale
+    }
+
+class BackgroundServer:
+    """
+    Base for local HTTP servers that run their own asyncio event loop in a background thread
+
+    Subclasses implement _handle_connection(reader, writer) and may override
+    _setup() to create loop-bound state before the server starts listening.
+    """
+
+    # Name of the serving thread
+    thread_name = "background-server"
+
+    def __init__(self, host="127.0.0.1", port=0):
+        self.host = host
+        self.port = port
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._startup_error = None
+
+    @property
+    def thread_id(self):
+        """Native id of the thread serving requests, for sampling its CPU time"""
+        return self._thread.native_id if self._thread is not None else None
+
+    def _setup(self):
+        pass
+
+    async def _handle_connection(self, reader, writer):
+        raise NotImplementedError
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._setup()
+            self._server = self._loop.run_until_complete(
+                asyncio.start_server(self._handle_connection, self.host, self.port, backlog=4096)
+            )
+            self.port = self._server.sockets[0].getsockname()[1]
+        except Exception as e:
+            self._startup_error = e
+            self._loop.close()
+            self._ready.set()
+            return
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._server.close()
+            # Let open connection handlers close their sockets before the loop goes away
+            tasks = asyncio.all_tasks(self._loop)
+            for task in tasks:
+                task.cancel()
+            self._loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            self._loop.run_until_complete(self._server.wait_closed())
+            self._loop.close()
+
+    def start(self):
+        """
+        Start serving in a background thread
+
+        Returns:
+            BackgroundServer: self, with the bound port filled in
+        """
+        self._thread = threading.Thread(target=self._run, name=self.thread_name, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._startup_error is not None:
+            raise self._startup_error
+        return self
+
+    def stop(self):
+        """
+        Stop serving and wait for the background thread to exit
+        """
+        if self._loop is not None and self._thread is not None and self._thread.is_alive():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+
+    def __enter__(self):
+        # The start_* helpers hand out servers that are already running
+        if self._thread is None:
+            self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+class TargetServer(BackgroundServer):
+    """
+    Local HTTP server that responds like an architecture pattern under load
+
+    Every request to any path is answered after a sampled service time,
+    subject to the profile's error rate and capacity limits.
+    """
+
+    thread_name = "target-server"
+
+    def __init__(self, profile, host="127.0.0.1", port=0, seed=None):
+        super().__init__(host, port)
+        self.profile = profile
+        self.stats = {
+            "requests": 0,
+            "errors": 0,
+            "rejected": 0
+        }
+        self._rng = np.random.default_rng(seed)
+        self._in_system = 0
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}/"
+
+    def _setup(self):
+        self._slots = asyncio.Semaphore(self.profile["max_concurrency"])
+
+    def _service_time(self):
+        # Log-normal with the profile's mean: mu = ln(mean) - sigma^2 / 2
+        sigma = self.profile["latency_sigma"]
+        mu = math.log(self.profile["mean_latency_ms"]) - sigma ** 2 / 2
+        return self._rng.lognormal(mu, sigma) / 1000
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request = await read_request(reader)
+                if request is None:
+                    break
+                keep_alive = wants_keep_alive(request)
+                status_code, body = await self._serve()
+                await write_response(writer, status_code, body, keep_alive=keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError, asyncio.CancelledError):
+            # Cancelled when the server stops with the connection still open
+            pass
+        finally:
+            writer.close()
+
+    async def _serve(self):
+        self.stats["requests"] += 1
+
+        # Shed load once both the servers and the queue are full
+        if self._in_system >= self.profile["max_concurrency"] + self.profile["max_queue"]:
+            self.stats["rejected"] += 1
+            return 503, b'{"error": "over capacity"}'
+
+        self._in_system += 1
+        try:
+            async with self._slots:
+                await asyncio.sleep(self._service_time())
+        finally:
+            self._in_system -= 1
+
+        if self._rng.random() < self.profile["error_rate"]:
+            self.stats["errors"] += 1
+            return 500, b'{"error": "injected failure"}'
+
+        return 200, json.dumps({"pattern": self.profile["pattern"], "status": "ok"}).encode()
+
+def start_target_server(pattern_name, arch_data=None, host="127.0.0.1", port=0, time_scale=1.0, seed=None):
+    """
+    Start a local stand-in server that emulates an architecture pattern
+
+    Args:
+        pattern_name (str): Name of the architecture pattern to emulate
+        arch_data (dict, optional): Architecture data. Defaults to None.
+        host (str): Interface to bind. Defaults to "127.0.0.1".
+        port (int): Port to bind, 0 for any free port. Defaults to 0.
+        time_scale (float): Multiplier on service times. Defaults to 1.0.
+        seed (int, optional): Random seed for service times and errors
+
+    Returns:
+        TargetServer: Running server; call stop() (or use it as a context
+            manager) when done
+    """
+    profile = get_server_profile(pattern_name, arch_data, time_scale=time_scale)
+    return TargetServer(profile, host=host, port=port, seed=seed).start()
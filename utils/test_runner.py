@@ -1,12 +1,78 @@
 import time
-import random
+import math
 import pandas as pd
 import requests
-from concurrent.futures import ThreadPoolExecutor
+import multiprocessing
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
 import numpy as np
 import os
+from contextlib import nullcontext
+from statistics import NormalDist
+from utils.async_engine import ENGINES, run_latency_requests, run_throughput_workers, run_open_loop_workers
+from utils.connection_pool import create_session_pool, prewarm_session_pool, get_pool_counters, summarize_pool_usage
+from utils.latency_histogram import (
+    LatencyHistogram,
+    IntervalRecorder,
+    latency_result_fields,
+    new_phase_histograms,
+    merge_phase_histograms,
+    summarize_phases
+)
+from utils.scenario import ScenarioMix, validate_scenario, record_endpoint, merge_endpoints, summarize_endpoints
+from utils.queueing_model import get_queue_model, evaluate_queue, simulate_pattern_load
+from utils.target_server import start_target_server
+from utils.concurrency_control import create_controller
+from utils.fault_proxy import start_fault_proxy, parse_fault_schedule, DEFAULT_FAULT_SCHEDULE
+from utils.resource_monitor import (
+    ProcessSampler,
+    LoadGeneratorMonitor,
+    cost_efficiency_score,
+    merge_saturation_reports
+)
 
-def run_latency_test(url, num_requests=100, concurrency=10):
+# Arrival processes accepted by open-loop throughput tests
+ARRIVAL_PROCESSES = ("fixed", "poisson")
+
+# Recovery time (s) that scores 3 of 5; instant recovery scores 5
+RECOVERY_MIDPOINT_SECONDS = 5.0
+
+def _check_engine(engine):
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown load engine '{engine}', expected one of {', '.join(ENGINES)}")
+
+def arrival_offsets(rate, duration, arrivals="fixed", seed=None):
+    """
+    Build the send schedule for an open-loop test
+    
+    Args:
+        rate (float): Target arrival rate in requests per second
+        duration (float): Length of the schedule in seconds
+        arrivals (str): "fixed" for evenly spaced sends or "poisson" for
+            exponentially distributed gaps. Defaults to "fixed".
+        seed (int, optional): Random seed for Poisson arrivals
+        
+    Returns:
+        numpy.ndarray: Intended send times in seconds from the start of the test
+    """
+    if arrivals not in ARRIVAL_PROCESSES:
+        raise ValueError(f"Unknown arrival process '{arrivals}', expected one of {', '.join(ARRIVAL_PROCESSES)}")
+    if rate <= 0:
+        raise ValueError("Arrival rate must be positive")
+    
+    if arrivals == "fixed":
+        return np.arange(int(math.ceil(rate * duration))) / rate
+    
+    # Draw enough gaps to cover the window with overwhelming probability, then trim
+    rng = np.random.default_rng(seed)
+    expected = rate * duration
+    offsets = np.cumsum(rng.exponential(1.0 / rate, int(expected + 6 * math.sqrt(expected) + 16)))
+    while offsets[-1] < duration:
+        more = offsets[-1] + np.cumsum(rng.exponential(1.0 / rate, int(math.sqrt(expected) + 16)))
+        offsets = np.concatenate([offsets, more])
+    return offsets[offsets < duration]
+
+def run_latency_test(url, num_requests=100, concurrency=10, engine="threads"):
     """
     Run a latency test against a URL
     
@@ -14,26 +80,34 @@ def run_latency_test(url, num_requests=100, concurrency=10):
         url (str): URL to test
         num_requests (int): Number of requests to make
         concurrency (int): Number of concurrent requests
+        engine (str): Load engine, "threads" or "asyncio". Defaults to "threads".
         
     Returns:
         dict: Dictionary with test results
     """
+    _check_engine(engine)
+    
     # Initialize results
     results = {
-        "latency": [],
+        "latency": LatencyHistogram(),
         "status_codes": [],
         "errors": 0
     }
     
     def make_request(i):
         try:
-            start_time = time.time()
-            response = requests.get(url, timeout=10)
-            end_time = time.time()
+            start_time = time.perf_counter_ns()
+            response = session.get(url, timeout=10, stream=True)
+            # requests returns once the response headers are in; the body is read separately
+            first_byte_time = time.perf_counter_ns()
+            response.content
+            end_time = time.perf_counter_ns()
             
             return {
-                "latency": (end_time - start_time) * 1000,  # Convert to ms
-                "status_code": response.status_code
+                "latency": (end_time - start_time) / 1e6,  # Convert to ms
+                "status_code": response.status_code,
+                "ttfb": (first_byte_time - start_time) / 1e6,
+                "transfer": (end_time - first_byte_time) / 1e6
             }
         except Exception as e:
             return {
@@ -42,139 +116,900 @@ def run_latency_test(url, num_requests=100, concurrency=10):
                 "error": str(e)
             }
     
-    # Use ThreadPoolExecutor to make concurrent requests
-    with ThreadPoolExecutor(max_workers=concurrency) as executor:
-        responses = list(executor.map(make_request, range(num_requests)))
+    if engine == "asyncio":
+        # Many in-flight requests on one event loop
+        responses, pool_stats, phases = run_latency_requests(url, num_requests, concurrency, timeout=10)
+    else:
+        # One keep-alive pool per test, opened before timing starts
+        with create_session_pool(concurrency) as session:
+            warmed_connections = prewarm_session_pool(session, url, concurrency)
+            counters_before = get_pool_counters(session, url)
+            
+            # Use ThreadPoolExecutor to make concurrent requests
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                responses = list(executor.map(make_request, range(num_requests)))
+            
+            pool_stats = summarize_pool_usage(counters_before, get_pool_counters(session, url), concurrency, warmed_connections)
+        
+        # Connection set-up happens inside requests, so only the response phases are visible
+        phases = new_phase_histograms()
+        for response in responses:
+            if response.get("latency") is not None:
+                phases["ttfb"].record(response["ttfb"])
+                phases["transfer"].record(response["transfer"])
     
     # Process responses
     for response in responses:
         if response.get("latency") is not None:
-            results["latency"].append(response["latency"])
+            results["latency"].record(response["latency"])
             results["status_codes"].append(response["status_code"])
         else:
             results["errors"] += 1
     
     # Calculate results
-    if results["latency"]:
-        avg_latency = sum(results["latency"]) / len(results["latency"])
-        min_latency = min(results["latency"])
-        max_latency = max(results["latency"])
-        p95_latency = np.percentile(results["latency"], 95)
+    if results["latency"].count:
         successful_requests = len([code for code in results["status_codes"] if 200 <= code < 300])
         error_rate = (results["errors"] + len(results["status_codes"]) - successful_requests) / num_requests * 100
     else:
-        avg_latency = 0
-        min_latency = 0
-        max_latency = 0
-        p95_latency = 0
         successful_requests = 0
         error_rate = 100
     
     return {
-        "avg_latency": avg_latency,
-        "min_latency": min_latency,
-        "max_latency": max_latency,
-        "p95_latency": p95_latency,
+        **latency_result_fields(results["latency"]),
         "successful_requests": successful_requests,
         "error_rate": error_rate,
         "total_requests": num_requests,
-        "errors": results["errors"]
+        "errors": results["errors"],
+        **pool_stats,
+        "phases": summarize_phases(phases)
     }
 
-def run_throughput_test(url, duration=10, concurrency=50):
+def _collect_throughput(url, duration, concurrency, engine, offsets, stop_event=None, recorder=None, scenario=None,
+                        monitor=None):
     """
-    Run a throughput test against a URL
+    Drive load for one throughput test (or one shard of it)
     
-    Args:
-        url (str): URL to test
-        duration (int): Duration of the test in seconds
-        concurrency (int): Number of concurrent requests
-        
     Returns:
-        dict: Dictionary with test results
+        tuple: Aggregated counts and latency histograms, and pool statistics
     """
     # Initialize results
     results = {
         "requests": 0,
         "successful_requests": 0,
         "failed_requests": 0,
-        "latencies": []
+        "unsent_requests": 0,
+        "latencies": LatencyHistogram(),
+        "service_latencies": LatencyHistogram(),
+        "send_lag": LatencyHistogram(),
+        "endpoints": {},
+        "phases": new_phase_histograms()
     }
     
+    # Weighted request mix, streamed from the scenario file as it is drawn
+    mix = ScenarioMix(scenario, base_url=url, same_origin=engine == "asyncio") if scenario else None
+    
+    def send(request, phases):
+        # requests returns once the response headers are in; the body is read separately
+        start = time.perf_counter_ns()
+        if request is None:
+            response = session.get(url, timeout=5, stream=True)
+        else:
+            response = session.request(request["method"], request["url"], headers=request["headers"],
+                                       data=request["body"] or None, timeout=5, stream=True)
+        first_byte = time.perf_counter_ns()
+        response.content
+        end = time.perf_counter_ns()
+        phases["ttfb"].record((first_byte - start) / 1e6)
+        phases["transfer"].record((end - first_byte) / 1e6)
+        return response
+    
     def worker():
+        if monitor:
+            monitor.add_thread()
         start_time = time.time()
         end_time = start_time + duration
         local_results = {
             "requests": 0,
             "successful_requests": 0,
             "failed_requests": 0,
-            "latencies": []
+            "latencies": LatencyHistogram(),
+            "endpoints": {},
+            "phases": new_phase_histograms()
         }
         
-        while time.time() < end_time:
+        while time.time() < end_time and not (stop_event and stop_event.is_set()):
+            request = next(mix) if mix else None
             try:
-                req_start = time.time()
-                response = requests.get(url, timeout=5)
-                req_end = time.time()
+                req_start = time.perf_counter_ns()
+                response = send(request, local_results["phases"])
+                latency = (time.perf_counter_ns() - req_start) / 1e6  # Convert to ms
                 
                 local_results["requests"] += 1
-                if 200 <= response.status_code < 300:
+                success = 200 <= response.status_code < 300
+                if success:
                     local_results["successful_requests"] += 1
                 else:
                     local_results["failed_requests"] += 1
                 
-                local_results["latencies"].append((req_end - req_start) * 1000)  # Convert to ms
+                local_results["latencies"].record(latency)
+                if recorder:
+                    recorder.record(latency, success)
+                if request:
+                    record_endpoint(local_results["endpoints"], request["name"], latency, success)
             except Exception:
                 local_results["requests"] += 1
                 local_results["failed_requests"] += 1
+                if recorder:
+                    recorder.record(None, False)
+                if request:
+                    record_endpoint(local_results["endpoints"], request["name"], None, False)
         
         return local_results
     
-    # Use ThreadPoolExecutor to run workers
-    with ThreadPoolExecutor(max_workers=concurrency) as executor:
-        worker_results = list(executor.map(lambda _: worker(), range(concurrency)))
+    def open_loop_worker():
+        if monitor:
+            monitor.add_thread()
+        local_results = {
+            "requests": 0,
+            "successful_requests": 0,
+            "failed_requests": 0,
+            "unsent_requests": 0,
+            "latencies": LatencyHistogram(),
+            "service_latencies": LatencyHistogram(),
+            "send_lag": LatencyHistogram(),
+            "endpoints": {},
+            "phases": new_phase_histograms()
+        }
+        
+        # Workers share one iterator, so each scheduled send is taken once and in order
+        for i in remaining_sends:
+            if stop_event and stop_event.is_set():
+                break
+            intended_start = schedule_start + offsets[i]
+            delay = intended_start - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            
+            send_time = time.perf_counter()
+            if send_time >= schedule_end:
+                # Every worker was busy until after the test window closed
+                local_results["unsent_requests"] += 1
+                continue
+            
+            send_lag = (send_time - intended_start) * 1000
+            local_results["send_lag"].record(send_lag)
+            local_results["requests"] += 1
+            request = next(mix) if mix else None
+            try:
+                response = send(request, local_results["phases"])
+                service_latency = (time.perf_counter() - send_time) * 1000
+                
+                success = 200 <= response.status_code < 300
+                if success:
+                    local_results["successful_requests"] += 1
+                else:
+                    local_results["failed_requests"] += 1
+                
+                # Latency counts from the intended send time, not the actual one
+                local_results["latencies"].record(send_lag + service_latency)
+                local_results["service_latencies"].record(service_latency)
+                if recorder:
+                    recorder.record(send_lag + service_latency, success)
+                if request:
+                    record_endpoint(local_results["endpoints"], request["name"], send_lag + service_latency, success)
+            except Exception:
+                local_results["failed_requests"] += 1
+                if recorder:
+                    recorder.record(None, False)
+                if request:
+                    record_endpoint(local_results["endpoints"], request["name"], None, False)
+        
+        return local_results
+    
+    if engine == "asyncio" and offsets is not None:
+        # Dispatcher fires scheduled sends on a single event loop
+        worker_results, pool_stats, phases = run_open_loop_workers(url, offsets, duration, concurrency, timeout=5,
+                                                                   stop_event=stop_event, recorder=recorder,
+                                                                   scenario=mix, monitor=monitor)
+        merge_phase_histograms(results["phases"], phases)
+    elif engine == "asyncio":
+        # Closed-loop workers as coroutines on a single event loop
+        worker_results, pool_stats, phases = run_throughput_workers(url, duration, concurrency, timeout=5,
+                                                                    stop_event=stop_event, recorder=recorder,
+                                                                    scenario=mix, monitor=monitor)
+        merge_phase_histograms(results["phases"], phases)
+    else:
+        # One keep-alive pool per test, opened before timing starts
+        with create_session_pool(concurrency) as session:
+            warmed_connections = prewarm_session_pool(session, url, concurrency)
+            counters_before = get_pool_counters(session, url)
+            if recorder:
+                recorder.restart()
+            
+            # Use ThreadPoolExecutor to run workers
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                if offsets is not None:
+                    remaining_sends = iter(range(len(offsets)))
+                    schedule_start = time.perf_counter() + 0.05
+                    schedule_end = schedule_start + duration
+                    worker_results = list(executor.map(lambda _: open_loop_worker(), range(concurrency)))
+                else:
+                    worker_results = list(executor.map(lambda _: worker(), range(concurrency)))
+            
+            pool_stats = summarize_pool_usage(counters_before, get_pool_counters(session, url), concurrency, warmed_connections)
     
     # Aggregate results
     for result in worker_results:
         results["requests"] += result["requests"]
         results["successful_requests"] += result["successful_requests"]
         results["failed_requests"] += result["failed_requests"]
-        results["latencies"].extend(result["latencies"])
+        results["latencies"].merge(result["latencies"])
+        merge_endpoints(results["endpoints"], result["endpoints"])
+        if "phases" in result:
+            merge_phase_histograms(results["phases"], result["phases"])
+        if offsets is not None:
+            results["unsent_requests"] += result["unsent_requests"]
+            results["service_latencies"].merge(result["service_latencies"])
+            results["send_lag"].merge(result["send_lag"])
     
-    # Calculate throughput and other metrics
-    throughput = results["requests"] / duration
-    successful_throughput = results["successful_requests"] / duration
-    error_rate = results["failed_requests"] / results["requests"] * 100 if results["requests"] > 0 else 0
+    return results, pool_stats
+
+def _run_throughput_shard(url, duration, concurrency, engine, offsets, scenario):
+    # Entry point of a worker process; histograms pickle back to the parent
+    with LoadGeneratorMonitor() as monitor:
+        results, pool_stats = _collect_throughput(url, duration, concurrency, engine, offsets, scenario=scenario,
+                                                  monitor=monitor)
+    return results, pool_stats, monitor.report(concurrency, engine=engine)
+
+def _run_sharded_throughput(url, duration, concurrency, engine, offsets, processes, scenario=None):
+    """
+    Run a throughput test across several worker processes and merge the shards
+    
+    Each process gets an even share of the concurrency and every processes-th
+    scheduled send, so the combined schedule is the requested one.
+    
+    Returns:
+        tuple: Merged counts and latency histograms, summed pool statistics,
+            and the merged load-generator saturation report
+    """
+    shard_concurrency = [concurrency // processes + (1 if i < concurrency % processes else 0) for i in range(processes)]
+    
+    # Spawned (not forked) children, since the parent may be a threaded Streamlit server
+    with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn")) as executor:
+        futures = [
+            executor.submit(
+                _run_throughput_shard,
+                url,
+                duration,
+                shard_concurrency[i],
+                engine,
+                offsets[i::processes] if offsets is not None else None,
+                scenario
+            )
+            for i in range(processes)
+        ]
+        shards = [future.result() for future in futures]
+    
+    results, pool_stats, _ = shards[0]
+    for shard_results, shard_pool_stats, _ in shards[1:]:
+        for key in ("requests", "successful_requests", "failed_requests", "unsent_requests"):
+            results[key] += shard_results[key]
+        for key in ("latencies", "service_latencies", "send_lag"):
+            results[key].merge(shard_results[key])
+        merge_endpoints(results["endpoints"], shard_results["endpoints"])
+        merge_phase_histograms(results["phases"], shard_results["phases"])
+        for key in pool_stats:
+            pool_stats[key] += shard_pool_stats[key]
+    
+    load_generator = merge_saturation_reports([shard[2] for shard in shards], concurrency, engine)
+    return results, pool_stats, load_generator
+
+def run_throughput_test(url, duration=10, concurrency=50, engine="threads", rate=None, arrivals="fixed", processes=1,
+                        stop_event=None, recorder=None, scenario=None):
+    """
+    Run a throughput test against a URL
+    
+    By default the test is closed-loop: each worker sends its next request as
+    soon as the previous one returns. Passing a rate switches to open-loop
+    mode, where requests are sent on a fixed or Poisson schedule regardless
+    of response times. Open-loop latencies are measured from the intended
+    send time, so server stalls are not hidden by the load backing off
+    (coordinated omission), and the send lag is reported alongside.
+    
+    With processes > 1 the concurrency (and schedule) is split across that
+    many worker processes and their counts and latency histograms are merged.
     
-    if results["latencies"]:
-        avg_latency = sum(results["latencies"]) / len(results["latencies"])
-        p95_latency = np.percentile(results["latencies"], 95)
+    Passing a scenario replays a weighted mix of the requests in a JSONL
+    file (see utils.scenario) instead of GETs of url; request paths are
+    resolved against url, and per-endpoint summaries are added to the results.
+    The asyncio engine keeps its connections to url's host, so it rejects
+    scenarios with absolute URLs to other hosts.
+    
+    Args:
+        url (str): URL to test
+        duration (int): Duration of the test in seconds
+        concurrency (int): Number of concurrent requests (maximum in flight
+            in open-loop mode)
+        engine (str): Load engine, "threads" or "asyncio". Defaults to "threads".
+        rate (float, optional): Target arrival rate in req/sec for open-loop
+            mode. Defaults to None (closed-loop).
+        arrivals (str): Arrival process for open-loop mode, "fixed" or
+            "poisson". Defaults to "fixed".
+        processes (int): Number of worker processes to shard the load across,
+            e.g. os.cpu_count(). Defaults to 1 (run in this process).
+        stop_event (threading.Event, optional): Set from another thread to end
+            the test early; rates are then computed over the time actually run.
+        recorder (IntervalRecorder, optional): Receives every finished request
+            for live per-second reporting (see stream_throughput_test).
+        scenario (str, optional): Path of a JSONL scenario file to replay
+        
+    Returns:
+        dict: Dictionary with test results
+    """
+    _check_engine(engine)
+    if scenario:
+        validate_scenario(scenario, url, same_origin=engine == "asyncio")
+    
+    offsets = arrival_offsets(rate, duration, arrivals).tolist() if rate else None
+    processes = max(1, min(processes, concurrency))
+    
+    if processes > 1 and (stop_event is not None or recorder is not None):
+        raise ValueError("Live recording and early stop are only supported with processes=1")
+    
+    test_start = time.perf_counter()
+    if processes > 1:
+        results, pool_stats, load_generator = _run_sharded_throughput(url, duration, concurrency, engine, offsets,
+                                                                      processes, scenario)
     else:
-        avg_latency = 0
-        p95_latency = 0
+        with LoadGeneratorMonitor() as monitor:
+            results, pool_stats = _collect_throughput(url, duration, concurrency, engine, offsets, stop_event,
+                                                      recorder, scenario, monitor)
+        load_generator = monitor.report(concurrency, engine=engine)
     
-    return {
+    aborted = stop_event is not None and stop_event.is_set()
+    elapsed = min(duration, time.perf_counter() - test_start) if aborted else duration
+    
+    # Calculate throughput and other metrics
+    throughput = results["requests"] / elapsed if elapsed > 0 else 0
+    successful_throughput = results["successful_requests"] / elapsed if elapsed > 0 else 0
+    error_rate = results["failed_requests"] / results["requests"] * 100 if results["requests"] > 0 else 0
+    
+    test_results = {
         "throughput": throughput,
         "successful_throughput": successful_throughput,
         "error_rate": error_rate,
         "total_requests": results["requests"],
         "successful_requests": results["successful_requests"],
         "failed_requests": results["failed_requests"],
-        "avg_latency": avg_latency,
-        "p95_latency": p95_latency,
-        "duration": duration
+        **latency_result_fields(results["latencies"]),
+        "duration": elapsed,
+        "aborted": aborted,
+        "processes": processes,
+        **pool_stats,
+        "phases": summarize_phases(results["phases"]),
+        "load_generator": load_generator
+    }
+    
+    if offsets is not None:
+        # Report how far actual sends lagged behind the schedule
+        send_lag = results["send_lag"].summary()
+        service = results["service_latencies"].summary()
+        test_results.update({
+            "mode": "open",
+            "arrivals": arrivals,
+            "target_rate": rate,
+            "scheduled_requests": len(offsets),
+            "unsent_requests": results["unsent_requests"],
+            "avg_send_lag": send_lag["mean"],
+            "p99_send_lag": send_lag["p99"],
+            "max_send_lag": send_lag["max"],
+            "uncorrected_avg_latency": service["mean"],
+            "uncorrected_p99_latency": service["p99"]
+        })
+    else:
+        test_results["mode"] = "closed"
+    
+    if scenario:
+        test_results["scenario"] = scenario
+        test_results["endpoints"] = summarize_endpoints(results["endpoints"], elapsed)
+    
+    return test_results
+
+def stream_throughput_test(url, duration=10, concurrency=50, engine="threads", rate=None, arrivals="fixed",
+                           interval=1.0, scenario=None):
+    """
+    Run a throughput test in the background and yield results as they arrive
+    
+    Yields one summary per finished interval (requests, errors, throughput and
+    latency quantiles) while the test runs, then a final item with the full
+    run_throughput_test result. Closing the generator early (e.g. breaking
+    out of the loop) stops the test.
+    
+    Args:
+        url (str): URL to test
+        duration (int): Duration of the test in seconds
+        concurrency (int): Number of concurrent requests
+        engine (str): Load engine, "threads" or "asyncio". Defaults to "threads".
+        rate (float, optional): Target arrival rate for open-loop mode
+        arrivals (str): Arrival process for open-loop mode. Defaults to "fixed".
+        interval (float): Bucket width in seconds. Defaults to 1.0.
+        scenario (str, optional): Path of a JSONL scenario file to replay
+        
+    Yields:
+        dict: {"type": "interval", ...bucket fields} items, then one
+            {"type": "summary", "results": dict}
+    """
+    stop_event = threading.Event()
+    recorder = IntervalRecorder(interval)
+    outcome = {}
+    
+    def run():
+        try:
+            outcome["results"] = run_throughput_test(url, duration, concurrency, engine, rate, arrivals,
+                                                     stop_event=stop_event, recorder=recorder, scenario=scenario)
+        except Exception as e:
+            outcome["error"] = e
+    
+    runner = threading.Thread(target=run, name="throughput-stream", daemon=True)
+    runner.start()
+    try:
+        while runner.is_alive():
+            runner.join(min(interval / 4, 0.25))
+            for bucket in recorder.pop_completed():
+                yield {"type": "interval", **bucket}
+        
+        for bucket in recorder.pop_completed(include_current=True):
+            yield {"type": "interval", **bucket}
+        
+        if "error" in outcome:
+            raise outcome["error"]
+        yield {"type": "summary", "results": outcome["results"]}
+    finally:
+        # Runs on normal completion and when the consumer abandons the stream
+        stop_event.set()
+        runner.join()
+
+def run_capacity_search(url, slo_p99_ms=500, max_error_rate=1.0, search="concurrency", start_load=None,
+                        max_load=None, growth=2.0, refine_steps=4, step_duration=5, engine="threads",
+                        processes=1, arrivals="fixed", scenario=None, stop_event=None, progress=None):
+    """
+    Find the maximum sustainable throughput of a URL under a latency SLO
+    
+    Offered load is multiplied by growth on each step until the p99 latency
+    SLO or the error-rate limit is broken (or max_load is reached), then the
+    gap between the last passing and first failing load is binary-searched.
+    Every probe is a full run_throughput_test, so the probes together form a
+    latency-vs-load curve.
+    
+    Args:
+        url (str): URL to test
+        slo_p99_ms (float): p99 latency limit in ms. Defaults to 500.
+        max_error_rate (float): Error rate limit in %. Defaults to 1.0.
+        search (str): "concurrency" to step closed-loop workers or "rate" to
+            step the open-loop arrival rate. Defaults to "concurrency".
+        start_load (float, optional): First load to probe. Defaults to 1
+            worker or 10 req/sec.
+        max_load (float, optional): Upper bound on the load. Defaults to 4096
+            workers or 100000 req/sec.
+        growth (float): Load multiplier between steps. Defaults to 2.0.
+        refine_steps (int): Number of binary-search probes. Defaults to 4.
+        step_duration (int): Duration of each probe in seconds. Defaults to 5.
+        engine (str): Load engine, "threads" or "asyncio". Defaults to "threads".
+        processes (int): Worker processes per probe. Defaults to 1.
+        arrivals (str): Arrival process for rate search. Defaults to "fixed".
+        scenario (str, optional): Path of a JSONL scenario file to replay at
+            every probe. Defaults to None.
+        stop_event (threading.Event, optional): Set from another thread to end
+            the search early; the probe in progress is dropped
+        progress (callable, optional): Called as progress(point) with each
+            probe's curve point
+        
+    Returns:
+        dict: Max sustainable throughput, knee load, and the latency-vs-load curve
+    """
+    if search not in ("concurrency", "rate"):
+        raise ValueError(f"Unknown capacity search '{search}', expected 'concurrency' or 'rate'")
+    
+    if search == "concurrency":
+        start_load = start_load or 1
+        max_load = max_load or 4096
+    else:
+        start_load = start_load or 10
+        max_load = max_load or 100000
+    
+    curve = []
+    probe_stop_event = stop_event if processes == 1 else None
+    
+    def stopped():
+        return stop_event is not None and stop_event.is_set()
+    
+    def probe(load):
+        # Returns whether the load meets the SLO, or None if the search was stopped
+        if stopped():
+            return None
+        if search == "concurrency":
+            load = int(round(load))
+            result = run_throughput_test(url, duration=step_duration, concurrency=load, engine=engine,
+                                         processes=processes, stop_event=probe_stop_event, scenario=scenario)
+        else:
+            # Enough in-flight slots for the SLO latency at this rate (Little's law)
+            concurrency = max(1, int(math.ceil(load * slo_p99_ms / 1000 * 2)))
+            result = run_throughput_test(url, duration=step_duration, concurrency=concurrency, engine=engine,
+                                         rate=load, arrivals=arrivals, processes=processes,
+                                         stop_event=probe_stop_event, scenario=scenario)
+        if stopped():
+            # A probe cut short would misstate the load it sustained
+            return None
+        
+        meets_slo = result["p99_latency"] <= slo_p99_ms and result["error_rate"] <= max_error_rate
+        if search == "rate" and result["throughput"] < 0.95 * load:
+            # The target could not absorb the offered rate
+            meets_slo = False
+        
+        curve.append({
+            "load": load,
+            "throughput": result["throughput"],
+            "successful_throughput": result["successful_throughput"],
+            "avg_latency": result["avg_latency"],
+            "p50_latency": result["p50_latency"],
+            "p99_latency": result["p99_latency"],
+            "error_rate": result["error_rate"],
+            "meets_slo": meets_slo
+        })
+        if progress is not None:
+            progress(curve[-1])
+        return meets_slo
+    
+    # Step the load up until the SLO breaks
+    passing_load = None
+    failing_load = None
+    load = start_load
+    while True:
+        meets_slo = probe(load)
+        if meets_slo is None:
+            break
+        if meets_slo:
+            passing_load = load
+            if load >= max_load:
+                break
+            load = min(load * growth, max_load)
+        else:
+            failing_load = load
+            break
+    
+    # Binary-search the gap between the last passing and first failing load
+    if passing_load is not None and failing_load is not None:
+        low, high = passing_load, failing_load
+        for _ in range(refine_steps):
+            middle = (low + high) / 2
+            if search == "concurrency":
+                middle = int(middle)
+                if middle <= low:
+                    break
+            meets_slo = probe(middle)
+            if meets_slo is None:
+                break
+            if meets_slo:
+                low = middle
+            else:
+                high = middle
+    
+    curve.sort(key=lambda point: point["load"])
+    passing_points = [point for point in curve if point["meets_slo"]]
+    knee = max(passing_points, key=lambda point: point["successful_throughput"]) if passing_points else None
+    
+    return {
+        "max_sustainable_throughput": knee["successful_throughput"] if knee else 0,
+        "knee_load": knee["load"] if knee else None,
+        "knee_p99_latency": knee["p99_latency"] if knee else None,
+        "search": search,
+        "slo_p99_ms": slo_p99_ms,
+        "max_error_rate": max_error_rate,
+        "slo_broken": failing_load is not None,
+        "probes": len(curve),
+        "curve": curve
+    }
+
+def run_adaptive_concurrency_test(url=None, duration=30, window=2, controller="aimd", start_concurrency=4,
+                                  min_concurrency=1, max_concurrency=1024, max_error_rate=1.0, engine="threads",
+                                  processes=1, pattern=None, local_target=False, time_scale=0.1, stop_event=None,
+                                  progress=None):
+    """
+    Let a concurrency controller find the best operating point of a URL
+    
+    The test runs as a series of short closed-loop windows. After each one
+    the controller (see utils.concurrency_control) sets the next window's
+    concurrency: AIMD adds a fixed step while latency stays flat and cuts
+    the limit multiplicatively when latency or errors rise; the gradient
+    controller scales the limit by the ratio of long-term to current latency.
+    Every window is scored by its power, successful throughput divided by
+    mean latency, and the best one is reported.
+    
+    Args:
+        url (str, optional): URL to test
+        duration (int): Total test duration in seconds. Defaults to 30.
+        window (float): Duration of each control window in seconds. Defaults to 2.
+        controller (str): "aimd" or "gradient". Defaults to "aimd".
+        start_concurrency (int): Concurrency of the first window. Defaults to 4.
+        min_concurrency (int): Lowest concurrency. Defaults to 1.
+        max_concurrency (int): Highest concurrency. Defaults to 1024.
+        max_error_rate (float): Error rate in % treated as overload. Defaults to 1.0.
+        engine (str): Load engine, "threads" or "asyncio". Defaults to "threads".
+        processes (int): Worker processes per window. Defaults to 1.
+        pattern (str, optional): Pattern to emulate when local_target is set
+        local_target (bool): Test a local stand-in server for the pattern
+            instead of a URL. Defaults to False.
+        time_scale (float): Service-time multiplier of the local target.
+            Defaults to 0.1.
+        stop_event (threading.Event, optional): Set from another thread to end
+            the test early; the window in progress is dropped
+        progress (callable, optional): Called as progress(done, total, window)
+            after each window
+        
+    Returns:
+        dict: Best concurrency, its throughput, latency and power, and the
+            per-window history
+    """
+    _check_engine(engine)
+    
+    if local_target and pattern and not url:
+        with start_target_server(pattern, time_scale=time_scale) as server:
+            return run_adaptive_concurrency_test(
+                server.url, duration=duration, window=window, controller=controller,
+                start_concurrency=start_concurrency, min_concurrency=min_concurrency,
+                max_concurrency=max_concurrency, max_error_rate=max_error_rate, engine=engine,
+                processes=processes, stop_event=stop_event, progress=progress
+            )
+    
+    limiter = create_controller(controller, initial=start_concurrency, min_limit=min_concurrency,
+                                max_limit=max_concurrency, max_error_rate=max_error_rate)
+    windows = max(1, int(math.ceil(duration / window)))
+    concurrency = start_concurrency
+    history = []
+    
+    for index in range(windows):
+        if stop_event is not None and stop_event.is_set():
+            break
+        result = run_throughput_test(url, duration=window, concurrency=concurrency, engine=engine,
+                                     processes=processes, stop_event=stop_event if processes == 1 else None)
+        if stop_event is not None and stop_event.is_set():
+            # A window cut short would understate its throughput
+            break
+        
+        latency = result["avg_latency"]
+        next_concurrency, action = limiter.update(latency, result["error_rate"])
+        history.append({
+            "window": index + 1,
+            "concurrency": concurrency,
+            "throughput": result["throughput"],
+            "successful_throughput": result["successful_throughput"],
+            "avg_latency": latency,
+            "p50_latency": result["p50_latency"],
+            "p99_latency": result["p99_latency"],
+            "error_rate": result["error_rate"],
+            "power": result["successful_throughput"] / latency if latency > 0 else 0.0,
+            "action": action,
+            "load_generator_saturated": result["load_generator"]["saturated"]
+        })
+        concurrency = next_concurrency
+        if progress is not None:
+            progress(len(history), windows, history[-1])
+    
+    best = max(history, key=lambda point: point["power"]) if history else None
+    return {
+        "controller": controller,
+        "best_concurrency": best["concurrency"] if best else None,
+        "best_throughput": best["successful_throughput"] if best else 0,
+        "best_avg_latency": best["avg_latency"] if best else None,
+        "best_p99_latency": best["p99_latency"] if best else None,
+        "best_power": best["power"] if best else 0,
+        "final_concurrency": concurrency,
+        "windows": len(history),
+        "history": history
     }
 
-def simulate_test_results(pattern_name):
+def run_scalability_sweep(url=None, concurrency_levels=(1, 2, 4, 8, 16, 32, 64), duration=5, engine="threads",
+                          processes=1, pattern=None, local_target=False, time_scale=0.1, stop_event=None,
+                          progress=None):
+    """
+    Measure throughput at several concurrency levels for fitting a scalability model
+    
+    Args:
+        url (str, optional): URL to test
+        concurrency_levels (tuple): Closed-loop worker counts to probe.
+            Defaults to powers of two up to 64.
+        duration (int): Duration of each probe in seconds. Defaults to 5.
+        engine (str): Load engine, "threads" or "asyncio". Defaults to "threads".
+        processes (int): Worker processes per probe. Defaults to 1.
+        pattern (str, optional): Pattern to emulate when local_target is set
+        local_target (bool): Probe a local stand-in server for the pattern
+            instead of a URL. Defaults to False.
+        time_scale (float): Service-time multiplier of the local target.
+            Defaults to 0.1.
+        stop_event (threading.Event, optional): Set from another thread to end
+            the sweep early; the level in progress is dropped
+        progress (callable, optional): Called as progress(done, total) after
+            each level
+        
+    Returns:
+        list: run_throughput_test results with the probed "concurrency" added
+    """
+    _check_engine(engine)
+    
+    if local_target and pattern and not url:
+        with start_target_server(pattern, time_scale=time_scale) as server:
+            return run_scalability_sweep(server.url, concurrency_levels=concurrency_levels, duration=duration,
+                                         engine=engine, processes=processes, stop_event=stop_event,
+                                         progress=progress)
+    
+    sweep = []
+    for concurrency in concurrency_levels:
+        if stop_event is not None and stop_event.is_set():
+            break
+        result = run_throughput_test(url, duration=duration, concurrency=concurrency, engine=engine,
+                                     processes=processes, stop_event=stop_event if processes == 1 else None)
+        if stop_event is not None and stop_event.is_set():
+            # A level cut short would understate its throughput
+            break
+        sweep.append({"concurrency": concurrency, **result})
+        if progress is not None:
+            progress(len(sweep), len(concurrency_levels))
+    return sweep
+
+def score_fault_tolerance(intervals, schedule, offset=0.0, interval=1.0):
+    """
+    Score how well a target kept serving through injected faults
+    
+    The healthy baseline is every interval that ends before the first fault.
+    During each fault, tolerance is the goodput (successful req/sec) kept
+    relative to the baseline. Recovery time is how long after the fault
+    ends it takes for an interval to be healthy again: goodput at 90% of
+    the baseline, error rate within 1 point of it and p99 latency at most
+    twice the baseline p99. A target that has not recovered by the next
+    fault (or the end of the run) is charged the whole gap.
+    
+    Args:
+        intervals (list): IntervalRecorder summaries of the whole run
+        schedule (list): Faults as returned by parse_fault_schedule
+        offset (float): Schedule time, in seconds, at which the first
+            interval started. Defaults to 0.
+        interval (float): Interval width in seconds. Defaults to 1.0.
+        
+    Returns:
+        dict: Baseline goodput, availability (% of requests served outside
+            the fault windows, so slow recovery counts against it), per-fault
+            results, fault_tolerance_score and recovery_score (1-5), and mean
+            recovery_time in seconds
+    """
+    if not schedule:
+        raise ValueError("Scoring fault tolerance needs at least one scheduled fault")
+    
+    windows = []
+    for item in intervals:
+        end = offset + item["second"]
+        windows.append({
+            "start": end - interval,
+            "end": end,
+            "goodput": (item["requests"] - item["errors"]) / interval,
+            "error_rate": item["error_rate"],
+            "p99_latency": item["p99_latency"],
+            "requests": item["requests"]
+        })
+    
+    first_fault = schedule[0]["start"]
+    baseline = [window for window in windows if window["end"] <= first_fault and window["requests"]]
+    if not baseline:
+        raise ValueError("No healthy traffic was measured before the first fault; start the first fault later")
+    baseline_goodput = float(np.mean([window["goodput"] for window in baseline]))
+    baseline_error_rate = float(np.mean([window["error_rate"] for window in baseline]))
+    baseline_p99 = float(np.median([window["p99_latency"] for window in baseline]))
+    
+    def healthy(window):
+        return (window["goodput"] >= 0.9 * baseline_goodput
+                and window["error_rate"] <= baseline_error_rate + 1
+                and (baseline_p99 <= 0 or window["p99_latency"] <= 2 * baseline_p99))
+    
+    run_end = windows[-1]["end"] if windows else 0.0
+    faults = []
+    for i, fault in enumerate(schedule):
+        during = [window for window in windows if window["start"] < fault["end"] and window["end"] > fault["start"]]
+        goodput = float(np.mean([window["goodput"] for window in during])) if during else 0.0
+        tolerance = min(goodput / baseline_goodput, 1.0) if baseline_goodput > 0 else 0.0
+        
+        # Look for recovery until the next fault begins
+        horizon = schedule[i + 1]["start"] if i + 1 < len(schedule) else run_end
+        recovered_at = next(
+            (window["start"] for window in windows
+             if window["start"] >= fault["end"] and window["end"] <= horizon and healthy(window)),
+            None
+        )
+        faults.append({
+            "type": fault["type"],
+            "start": fault["start"],
+            "duration": fault["duration"],
+            "goodput": goodput,
+            "tolerance": tolerance,
+            "recovered": recovered_at is not None,
+            "recovery_time": max(recovered_at - fault["end"], 0.0) if recovered_at is not None
+                             else max(horizon - fault["end"], 0.0)
+        })
+    
+    # Requests the proxy failed on purpose say nothing about the target itself
+    outside = [window for window in windows
+               if not any(window["start"] < fault["end"] and window["end"] > fault["start"] for fault in schedule)]
+    requests = sum(window["requests"] for window in outside)
+    successes = sum(window["goodput"] * interval for window in outside)
+    
+    tolerance = float(np.mean([fault["tolerance"] for fault in faults]))
+    recovery_time = float(np.mean([fault["recovery_time"] for fault in faults]))
+    return {
+        "baseline_goodput": baseline_goodput,
+        "availability": successes / requests * 100 if requests else 0.0,
+        "faults": faults,
+        "fault_tolerance_score": 1 + 4 * tolerance,
+        "recovery_time": recovery_time,
+        "recovery_score": 1 + 4 / (1 + recovery_time / RECOVERY_MIDPOINT_SECONDS)
+    }
+
+def run_fault_tolerance_test(url, schedule=None, duration=None, concurrency=20, engine="asyncio", interval=0.5,
+                             stop_event=None):
+    """
+    Run load through a fault-injecting proxy and measure the target's resilience
+    
+    Args:
+        url (str): URL to test
+        schedule (list, optional): Faults to inject, timed from the start of
+            the load (see utils.fault_proxy). Defaults to DEFAULT_FAULT_SCHEDULE.
+        duration (float, optional): Length of the run in seconds. Defaults to
+            the end of the last fault plus 6 seconds to observe recovery.
+        concurrency (int): Closed-loop workers. Defaults to 20.
+        engine (str): Load engine, "threads" or "asyncio". Defaults to "asyncio".
+        interval (float): Scoring resolution in seconds. Defaults to 0.5.
+        stop_event (threading.Event, optional): Set from another thread to end
+            the test early
+        
+    Returns:
+        dict: score_fault_tolerance fields plus the availability over the
+            whole run including the faults (%), the per-interval timeline and
+            the proxy's injection counts
+    """
+    _check_engine(engine)
+    schedule = parse_fault_schedule(DEFAULT_FAULT_SCHEDULE if schedule is None else schedule)
+    if duration is None:
+        duration = max(fault["end"] for fault in schedule) + 6 if schedule else 10
+    
+    recorder = IntervalRecorder(interval)
+    with start_fault_proxy(url, schedule) as proxy:
+        proxy.arm()
+        # Timing starts after the connection pool is warmed; shift the schedule to match
+        results = run_throughput_test(proxy.url, duration=duration, concurrency=concurrency, engine=engine,
+                                      stop_event=stop_event, recorder=recorder)
+        offset = recorder.start - proxy.epoch
+        injected = {key: value for key, value in proxy.stats.items() if key.startswith("injected_")}
+    
+    intervals = recorder.pop_completed(include_current=True)
+    scores = score_fault_tolerance(intervals, schedule, offset=offset, interval=interval)
+    return {
+        **scores,
+        "availability_under_faults": 100 - results["error_rate"],
+        "intervals": intervals,
+        "schedule_offset": offset,
+        "injected": injected
+    }
+
+def simulate_test_results(pattern_name, offered_load=None):
     """
     Simulate test results for a pattern
     
     This function is used when a real test can't be run against a URL.
-    It generates realistic but simulated results based on the characteristics
-    of different architecture patterns.
+    Throughput, Latency and Resource Utilization come from the pattern's
+    G/G/c queue model (see utils.queueing_model); the qualitative metrics
+    use the pattern's base values.
     
     Args:
         pattern_name (str): Name of the architecture pattern
+        offered_load (float, optional): Arrival rate in req/sec. Defaults to
+            the pattern's standard offered load.
         
     Returns:
         dict: Dictionary with simulated test results
@@ -182,60 +1017,42 @@ def simulate_test_results(pattern_name):
     # Base values for different metrics
     base_metrics = {
         "Monolithic Architecture": {
-            "Throughput": 750,
-            "Latency": 120,
             "Availability": 99.5,
-            "Resource Utilization": 75,
             "Fault Tolerance": 3,
             "Elasticity": 2,
             "Cost Efficiency": 4,
             "Data Consistency": 5
         },
         "Microservices Architecture": {
-            "Throughput": 1800,
-            "Latency": 150,
             "Availability": 99.95,
-            "Resource Utilization": 60,
             "Fault Tolerance": 4.5,
             "Elasticity": 4.8,
             "Cost Efficiency": 3.5,
             "Data Consistency": 3.2
         },
         "Serverless Architecture": {
-            "Throughput": 2500,
-            "Latency": 250,
             "Availability": 99.99,
-            "Resource Utilization": 20,
             "Fault Tolerance": 4.7,
             "Elasticity": 5,
             "Cost Efficiency": 4.5,
             "Data Consistency": 3
         },
         "Event-Driven Architecture": {
-            "Throughput": 3200,
-            "Latency": 180,
             "Availability": 99.9,
-            "Resource Utilization": 55,
             "Fault Tolerance": 4.5,
             "Elasticity": 4.3,
             "Cost Efficiency": 3.8,
             "Data Consistency": 3.5
         },
         "Peer-to-Peer Architecture": {
-            "Throughput": 900,
-            "Latency": 220,
             "Availability": 99.8,
-            "Resource Utilization": 70,
             "Fault Tolerance": 4.8,
             "Elasticity": 3.5,
             "Cost Efficiency": 4.2,
             "Data Consistency": 2.8
         },
         "Service-Oriented Architecture (SOA)": {
-            "Throughput": 1200,
-            "Latency": 190,
             "Availability": 99.7,
-            "Resource Utilization": 65,
             "Fault Tolerance": 4.0,
             "Elasticity": 3.5,
             "Cost Efficiency": 3.5,
@@ -243,23 +1060,15 @@ def simulate_test_results(pattern_name):
         }
     }
     
-    # Add some randomness to the simulated results (±10%)
     if pattern_name in base_metrics:
-        variation = 0.1  # 10% variation
+        queue = simulate_pattern_load(pattern_name, offered_load)
         
-        results = {}
-        for metric, value in base_metrics[pattern_name].items():
-            # Add random variation
-            random_factor = 1 + (random.random() * 2 - 1) * variation
-            results[metric] = value * random_factor
-            
-            # Round to appropriate precision
-            if metric in ["Fault Tolerance", "Elasticity", "Cost Efficiency", "Data Consistency"]:
-                results[metric] = round(results[metric], 1)
-            elif metric == "Availability":
-                results[metric] = round(results[metric], 2)
-            else:
-                results[metric] = round(results[metric])
+        results = {
+            "Throughput": round(float(queue["throughput"])),
+            "Latency": round(float(queue["mean_latency"])),
+            "Resource Utilization": round(float(queue["utilization"]) * 100)
+        }
+        results.update(base_metrics[pattern_name])
         
         return results
     else:
@@ -275,6 +1084,101 @@ def simulate_test_results(pattern_name):
             "Data Consistency": 3.0
         }
 
+def _t_critical(confidence, df):
+    # Two-sided Student t critical value from the normal one (Cornish-Fisher expansion),
+    # within 0.1% of the exact value for df >= 5
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    return (z
+            + (z ** 3 + z) / (4 * df)
+            + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * df ** 2)
+            + (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384 * df ** 3))
+
+def summarize_trials(samples, confidence=0.95):
+    """
+    Summarize Monte Carlo samples of one metric
+    
+    The confidence interval is that of the mean, mean +- t * std / sqrt(n),
+    and narrows as trials are added. The range a single test's outcome falls
+    in is reported separately as the spread.
+    
+    Args:
+        samples (numpy.ndarray): One value per trial
+        confidence (float): Coverage of the interval. Defaults to 0.95.
+        
+    Returns:
+        dict: mean, std, the confidence interval of the mean (ci_low,
+            ci_high) and the central spread of the trial outcomes
+            (spread_low, spread_high)
+    """
+    mean = float(np.mean(samples))
+    std = float(np.std(samples, ddof=1)) if samples.size > 1 else 0.0
+    half_width = _t_critical(confidence, samples.size - 1) * std / math.sqrt(samples.size) if std > 0 else 0.0
+    tail = (1 - confidence) / 2 * 100
+    spread_low, spread_high = np.percentile(samples, [tail, 100 - tail])
+    return {
+        "mean": mean,
+        "std": std,
+        "ci_low": mean - half_width,
+        "ci_high": mean + half_width,
+        "spread_low": float(spread_low),
+        "spread_high": float(spread_high)
+    }
+
+def simulate_test_trials(pattern_name, trials=2000, duration=10, confidence=0.95, offered_load=None, seed=None):
+    """
+    Run many simulated tests of a pattern as one batch of array operations
+    
+    Each trial models a test of the given duration: the number of arrivals
+    is Poisson, the measured mean service time varies with the number of
+    requests served (central limit theorem), and failed requests are
+    binomial in the pattern's availability. The queue model is evaluated for
+    all trials at once, so thousands of trials take milliseconds.
+    Qualitative metrics are not measured by a test and have zero spread.
+    
+    Args:
+        pattern_name (str): Name of the architecture pattern
+        trials (int): Number of simulated tests. Defaults to 2000.
+        duration (float): Simulated test length in seconds. Defaults to 10.
+        confidence (float): Coverage of the reported intervals. Defaults to 0.95.
+        offered_load (float, optional): Arrival rate in req/sec. Defaults to
+            the pattern's standard offered load.
+        seed (int, optional): Random seed
+        
+    Returns:
+        dict: Number of trials, confidence level and per-metric
+            summarize_trials fields under "metrics"
+    """
+    rng = np.random.default_rng(seed)
+    model = get_queue_model(pattern_name)
+    base = simulate_test_results(pattern_name, offered_load)
+    if offered_load is None:
+        offered_load = model["offered_load"]
+    
+    arrivals = np.maximum(rng.poisson(offered_load * duration, trials), 1)
+    service_time_ms = model["service_time_ms"] * np.maximum(
+        1 + model["service_cv"] / np.sqrt(arrivals) * rng.standard_normal(trials), 0.01
+    )
+    queue = evaluate_queue(model["servers"], service_time_ms, arrivals / duration,
+                           model["service_cv"], model["arrival_cv"])
+    failures = rng.binomial(arrivals, min(max(1 - base["Availability"] / 100, 0.0), 1.0))
+    
+    samples = {
+        "Throughput": queue["throughput"],
+        "Latency": queue["mean_latency"],
+        "Availability": 100 * (1 - failures / arrivals),
+        "Resource Utilization": queue["utilization"] * 100
+    }
+    
+    metrics = {}
+    for metric, value in base.items():
+        metrics[metric] = summarize_trials(samples.get(metric, np.full(trials, float(value))), confidence)
+    
+    return {
+        "trials": trials,
+        "confidence": confidence,
+        "metrics": metrics
+    }
+
 def simulate_scaling_comparison(pattern_name):
     """
     Simulate before and after scaling comparison for a pattern
@@ -360,33 +1264,156 @@ def simulate_scaling_comparison(pattern_name):
         "after": after_metrics
     }
 
-def run_custom_test_plan(url=None, pattern=None):
+def real_tests_enabled():
+    """
+    Whether URL tests should send real traffic (ENABLE_REAL_TESTS=true)
+    
+    Returns:
+        bool: True if real URL tests are enabled
+    """
+    return os.environ.get("ENABLE_REAL_TESTS", "false").lower() == "true"
+
+def url_results_to_metrics(latency_results, throughput, fault_results=None, resource_results=None):
+    """
+    Map URL test results onto the pattern metrics saved by save_test_results
+    
+    Args:
+        latency_results (dict): Result of run_latency_test
+        throughput (float): Measured throughput in req/sec
+        fault_results (dict, optional): Result of run_fault_tolerance_test.
+            When given, Availability is measured outside the fault windows
+            and Fault Tolerance is the mean of the tolerance and recovery scores.
+        resource_results (dict, optional): ProcessSampler.summary() of the
+            target over the throughput test. When given, Resource Utilization
+            is its mean CPU utilization and Cost Efficiency follows from the
+            throughput per core.
+        
+    Returns:
+        dict: Dictionary with test results keyed by metric name
+    """
+    availability = (1 - (latency_results["error_rate"] / 100)) * 100
+    fault_tolerance = 3.0  # Placeholder without fault injection
+    if fault_results is not None:
+        availability = fault_results["availability"]
+        fault_tolerance = round((fault_results["fault_tolerance_score"] + fault_results["recovery_score"]) / 2, 2)
+    
+    resource_utilization = 60  # Placeholder unless the target process is sampled
+    cost_efficiency = 3.0  # Placeholder unless the target process is sampled
+    if resource_results is not None:
+        resource_utilization = round(resource_results["mean_cpu_percent"], 1)
+        cost_efficiency = cost_efficiency_score(resource_results.get("throughput_per_core")) or cost_efficiency
+    
+    return {
+        "Throughput": throughput,
+        "Latency": latency_results["avg_latency"],
+        "Availability": availability,
+        "Resource Utilization": resource_utilization,
+        "Fault Tolerance": fault_tolerance,
+        "Elasticity": 3.0,  # Placeholder, can't measure directly
+        "Cost Efficiency": cost_efficiency,
+        "Data Consistency": 3.0  # Placeholder, can't measure directly
+    }
+
+def rescale_local_target_metrics(test_results, time_scale):
+    """
+    Convert metrics measured against a time-scaled local target to the pattern's own time base
+    
+    A local target built with time_scale s serves every request in s times
+    the pattern's service time, so its measured latency is s times and its
+    throughput 1/s times what the pattern would show. The target's profile is
+    derived from the catalog, so saving unconverted results would compound
+    the scale on every run.
+    
+    Args:
+        test_results (dict): url_results_to_metrics output from a local target run
+        time_scale (float): time_scale the local target was started with
+        
+    Returns:
+        dict: Copy of test_results with Latency and Throughput converted
+    """
+    return {
+        **test_results,
+        "Latency": test_results["Latency"] / time_scale,
+        "Throughput": test_results["Throughput"] * time_scale
+    }
+
+def run_custom_test_plan(url=None, pattern=None, engine="threads", capacity_search=False, slo_p99_ms=500,
+                         max_error_rate=1.0, local_target=False, time_scale=1.0, force_real_tests=False,
+                         fault_injection=False, fault_schedule=None, target_pid=None, target_thread_ids=None):
     """
     Run a custom test plan against a URL or simulate results for a pattern
     
     Args:
         url (str, optional): URL to test. Defaults to None.
         pattern (str, optional): Pattern to simulate. Defaults to None.
+        engine (str, optional): Load engine for URL tests, "threads" or "asyncio".
+            Defaults to "threads".
+        capacity_search (bool, optional): For URL tests, report the maximum
+            throughput that meets the SLO instead of the throughput at a fixed
+            concurrency. Defaults to False.
+        slo_p99_ms (float, optional): p99 latency SLO in ms for the capacity
+            search. Defaults to 500.
+        max_error_rate (float, optional): Error rate limit in % for the
+            capacity search. Defaults to 1.0.
+        local_target (bool, optional): Instead of simulating, start a local
+            server that emulates the pattern and run the real URL tests
+            against it (works offline). Defaults to False.
+        time_scale (float, optional): Service-time multiplier for the local
+            target server. Latency and Throughput are converted back to the
+            pattern's time base. Defaults to 1.0.
+        force_real_tests (bool, optional): Run URL tests even when
+            ENABLE_REAL_TESTS is not set. Defaults to False.
+        fault_injection (bool, optional): For URL tests, also run load
+            through a fault-injecting proxy to measure Availability and
+            Fault Tolerance. Defaults to False.
+        fault_schedule (list, optional): Faults to inject. Defaults to
+            DEFAULT_FAULT_SCHEDULE.
+        target_pid (int, optional): Process id of a target running on this
+            machine; its CPU, memory, threads and files are sampled from /proc
+            during the fixed-concurrency throughput test (not a capacity
+            search) to measure Resource Utilization and Cost Efficiency
+        target_thread_ids (list, optional): Native ids of the target's
+            threads when it shares target_pid with the runner (the local
+            target server)
         
     Returns:
         dict: Dictionary with test results
     """
-    if url and os.environ.get("ENABLE_REAL_TESTS", "false").lower() == "true":
+    _check_engine(engine)
+    
+    if local_target and pattern and not url:
+        # Real load against an in-process stand-in for the pattern
+        with start_target_server(pattern, time_scale=time_scale) as server:
+            results = run_custom_test_plan(url=server.url, engine=engine, capacity_search=capacity_search,
+                                           slo_p99_ms=slo_p99_ms, max_error_rate=max_error_rate,
+                                           force_real_tests=True, fault_injection=fault_injection,
+                                           fault_schedule=fault_schedule, target_pid=os.getpid(),
+                                           target_thread_ids=[server.thread_id])
+        return rescale_local_target_metrics(results, time_scale)
+    
+    if url and (force_real_tests or real_tests_enabled()):
         # Run real tests against URL
-        latency_results = run_latency_test(url)
-        throughput_results = run_throughput_test(url)
+        latency_results = run_latency_test(url, engine=engine)
+        if capacity_search:
+            capacity_results = run_capacity_search(url, slo_p99_ms=slo_p99_ms, max_error_rate=max_error_rate,
+                                                   engine=engine)
+            throughput = capacity_results["max_sustainable_throughput"]
+        else:
+            # Sample the target's resources while it is under load
+            sampler = ProcessSampler(target_pid, target_thread_ids) if target_pid is not None else nullcontext()
+            with sampler:
+                throughput = run_throughput_test(url, engine=engine)["throughput"]
+        
+        resource_results = None
+        if target_pid is not None and not capacity_search:
+            resource_results = sampler.summary(throughput)
+        
+        fault_results = None
+        if fault_injection:
+            fault_results = run_fault_tolerance_test(url, schedule=fault_schedule, engine=engine)
         
         # Map results to pattern metrics
-        return {
-            "Throughput": throughput_results["throughput"],
-            "Latency": latency_results["avg_latency"],
-            "Availability": (1 - (latency_results["error_rate"] / 100)) * 100,
-            "Resource Utilization": 60,  # Placeholder, can't measure directly
-            "Fault Tolerance": 3.0,  # Placeholder, can't measure directly
-            "Elasticity": 3.0,  # Placeholder, can't measure directly
-            "Cost Efficiency": 3.0,  # Placeholder, can't measure directly
-            "Data Consistency": 3.0  # Placeholder, can't measure directly
-        }
+        return url_results_to_metrics(latency_results, throughput, fault_results, resource_results)
     elif pattern:
         # Simulate test results for pattern
         return simulate_test_results(pattern)
@@ -402,3 +1429,95 @@ def run_custom_test_plan(url=None, pattern=None):
             "Cost Efficiency": 3.0,
             "Data Consistency": 3.0
         }
+
+# How each pattern is tested by run_pattern_comparison
+COMPARISON_MODES = ("simulated", "local_target")
+
+def _run_local_target_trial(pattern_name, engine, time_scale, confidence):
+    # Entry point of a comparison worker process: one measured run against a stand-in server,
+    # already converted back from time_scale by run_custom_test_plan
+    results = run_custom_test_plan(pattern=pattern_name, engine=engine, local_target=True, time_scale=time_scale)
+    return {
+        "trials": 1,
+        "confidence": confidence,
+        "metrics": {
+            metric: summarize_trials(np.array([float(value)]), confidence)
+            for metric, value in results.items()
+        }
+    }
+
+def run_pattern_comparison(pattern_names, mode="simulated", trials=2000, confidence=0.95, parallelism=None,
+                           engine="asyncio", time_scale=0.1, stop_event=None, progress=None):
+    """
+    Test several patterns at the same time on a worker pool
+    
+    Simulated trials run on threads. Local target runs start one stand-in
+    server per pattern and each go to their own spawned worker process, so
+    patterns tested side by side do not compete for the GIL and skew each
+    other's measurements. Local target Latency and Throughput are converted
+    back from time_scale, so every mode reports values in the patterns' own
+    time base. Nothing is saved; pass the means to save_test_results_batch
+    to persist the whole comparison in one write.
+    
+    Args:
+        pattern_names (list): Patterns to test
+        mode (str): "simulated" for Monte Carlo trials or "local_target" for
+            a real load test against each pattern's stand-in server.
+            Defaults to "simulated".
+        trials (int): Simulated trials per pattern. Defaults to 2000.
+        confidence (float): Coverage of the reported intervals. Defaults to 0.95.
+        parallelism (int, optional): Patterns tested at once. Defaults to one
+            worker per pattern, capped at the CPU count for local target runs.
+        engine (str): Load engine for local target runs. Defaults to "asyncio".
+        time_scale (float): Service-time multiplier of the local targets.
+            Results are converted back to unscaled values. Defaults to 0.1.
+        stop_event (threading.Event, optional): Set from another thread to
+            stop; patterns not yet started are skipped
+        progress (callable, optional): Called as progress(done, total, pattern)
+            as each pattern finishes
+        
+    Returns:
+        dict: Pattern names mapped to simulate_test_trials-style results
+            (a local target run is reported as a single trial), in the order
+            of pattern_names; patterns skipped by stop_event are left out
+    """
+    if mode not in COMPARISON_MODES:
+        raise ValueError(f"Unknown comparison mode '{mode}', expected one of {', '.join(COMPARISON_MODES)}")
+    _check_engine(engine)
+    if not pattern_names:
+        return {}
+    
+    if mode == "local_target":
+        workers = parallelism or min(len(pattern_names), os.cpu_count() or 1)
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    else:
+        workers = parallelism or len(pattern_names)
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="comparison")
+    
+    results = {}
+    stopped = False
+    try:
+        if mode == "local_target":
+            futures = {
+                executor.submit(_run_local_target_trial, pattern, engine, time_scale, confidence): pattern
+                for pattern in pattern_names
+            }
+        else:
+            futures = {
+                executor.submit(simulate_test_trials, pattern, trials=trials, confidence=confidence): pattern
+                for pattern in pattern_names
+            }
+        
+        pending = set(futures)
+        while pending and not stopped:
+            done, pending = wait(pending, timeout=0.25, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[futures[future]] = future.result()
+                if progress is not None:
+                    progress(len(results), len(pattern_names), futures[future])
+            stopped = stop_event is not None and stop_event.is_set()
+    finally:
+        # On stop, drop the patterns not yet started instead of waiting for them
+        executor.shutdown(wait=not stopped, cancel_futures=True)
+    
+    return {pattern: results[pattern] for pattern in pattern_names if pattern in results}
@@ -3,8 +3,7 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-from utils.data_manager import load_architecture_data, get_comparison_data
-from utils.metrics_analyzer import normalize_metric, get_pattern_scores
+from utils.data_manager import get_comparison_data, get_metric_matrix
 
 def create_radar_chart(pattern_name, arch_data=None):
     """
@@ -17,43 +16,32 @@ def create_radar_chart(pattern_name, arch_data=None):
     Returns:
         plotly.graph_objects.Figure: Radar chart figure
     """
-    if arch_data is None:
-        arch_data = load_architecture_data()
-        
+    matrix = get_metric_matrix(arch_data)
+    
     # Extract metrics for the pattern
-    metrics = list(arch_data[pattern_name]["metrics"].keys())
-    values = [arch_data[pattern_name]["metrics"][metric]["value"] for metric in metrics]
+    metrics = matrix.metrics
+    values = matrix.values[matrix.pattern_index[pattern_name]]
     
     # Normalize values to 0-5 scale for radar chart
     # For latency and resource utilization, lower is better, so invert the scale
-    normalized_values = []
-    for i, metric in enumerate(metrics):
-        if metric in ["Latency", "Resource Utilization"]:
-            # Invert scale: higher is worse, so normalize and then invert
-            if metric == "Latency":
-                # Normalize Latency to 0-5 scale (lower is better)
-                normalized_value = 5 - (values[i] / 100)  # Assuming latency is in ms
-                normalized_value = max(0, min(5, normalized_value))  # Clamp to 0-5
-            else:
-                # Normalize Resource Utilization (lower is better)
-                normalized_value = 5 - (values[i] / 100 * 5)  # Assuming percentage
-                normalized_value = max(0, min(5, normalized_value))  # Clamp to 0-5
-            normalized_values.append(normalized_value)
+    normalized_values = values.copy()
+    for j, metric in enumerate(metrics):
+        if metric == "Latency":
+            # Normalize Latency to 0-5 scale (lower is better), assuming latency is in ms
+            normalized_values[j] = 5 - values[j] / 100
+        elif metric == "Resource Utilization":
+            # Normalize Resource Utilization (lower is better), assuming percentage
+            normalized_values[j] = 5 - values[j] / 100 * 5
         elif metric == "Availability":
-            # Normalize Availability (higher is better)
-            # Map 99-100% to 0-5 scale
-            normalized_value = (values[i] - 99) * 5
-            normalized_value = max(0, min(5, normalized_value))  # Clamp to 0-5
-            normalized_values.append(normalized_value)
+            # Normalize Availability (higher is better), mapping 99-100% to 0-5
+            normalized_values[j] = (values[j] - 99) * 5
         elif metric == "Throughput":
-            # Normalize Throughput (higher is better)
-            # Assuming throughput ranges from 0-5000 req/sec, map to 0-5 scale
-            normalized_value = values[i] / 1000
-            normalized_value = max(0, min(5, normalized_value))  # Clamp to 0-5
-            normalized_values.append(normalized_value)
+            # Normalize Throughput (higher is better), assuming 0-5000 req/sec
+            normalized_values[j] = values[j] / 1000
         else:
             # These metrics are already on a 1-5 scale
-            normalized_values.append(values[i])
+            continue
+        normalized_values[j] = max(0, min(5, normalized_values[j]))  # Clamp to 0-5
     
     # Create radar chart
     fig = go.Figure()
@@ -90,35 +78,13 @@ def create_comparison_radar_chart(patterns, metrics, arch_data=None):
     Returns:
         plotly.graph_objects.Figure: Radar chart figure
     """
-    if arch_data is None:
-        arch_data = load_architecture_data()
+    # Scores on a 0-5 scale relative to the compared patterns, best is 5
+    scores = get_metric_matrix(arch_data).normalized(patterns, metrics) * 5
     
     fig = go.Figure()
     
-    # Get values for all patterns and metrics for normalization
-    all_values = {}
-    for metric in metrics:
-        all_values[metric] = []
-        for pattern in patterns:
-            value = get_pattern_scores(pattern, metric, arch_data)
-            all_values[metric].append(value)
-    
     # Create a trace for each pattern
-    for pattern in patterns:
-        # Extract metrics for the pattern
-        values = []
-        for metric in metrics:
-            value = get_pattern_scores(pattern, metric, arch_data)
-            # Normalized value based on all patterns
-            if metric in ["Latency", "Resource Utilization"]:
-                # Lower is better for these metrics, so invert the normalization
-                norm_value = normalize_metric(all_values[metric], metric)[all_values[metric].index(value)] * 5
-            else:
-                # Higher is better for these metrics
-                norm_value = normalize_metric(all_values[metric], "")[all_values[metric].index(value)] * 5
-            values.append(norm_value)
-        
-        # Add trace to the figure
+    for pattern, values in zip(patterns, scores):
         fig.add_trace(go.Scatterpolar(
             r=values,
             theta=metrics,
@@ -205,6 +171,364 @@ def create_before_after_chart(before_data, after_data, pattern_name):
     
     return fig
 
+def create_scaling_curve_chart(curves, pattern_name, limits=None, metric="Throughput"):
+    """
+    Create a line chart of a scaling curve for every pattern across node counts
+    
+    Args:
+        curves (pandas.DataFrame): Output of compute_scaling_curves
+        pattern_name (str): Pattern to highlight
+        limits (dict, optional): Output of get_scaling_limits, used to mark
+            where the highlighted pattern stops scaling
+        metric (str): Curve to plot: "Throughput", "Latency", "Efficiency",
+            "Utilization" or "Overhead"
+        
+    Returns:
+        plotly.graph_objects.Figure: Line chart figure
+    """
+    units = {"Throughput": "req/sec", "Latency": "ms", "Efficiency": "% of linear", "Utilization": "% per node",
+             "Overhead": "% per node"}
+    
+    fig = go.Figure()
+    for pattern, pattern_curve in curves.groupby("Pattern", sort=False):
+        highlighted = pattern == pattern_name
+        fig.add_trace(go.Scatter(
+            x=pattern_curve["Nodes"],
+            y=pattern_curve[metric],
+            name=pattern,
+            mode="lines",
+            line=dict(width=4 if highlighted else 1.5),
+            opacity=1.0 if highlighted else 0.4
+        ))
+    
+    limit = (limits or {}).get(pattern_name, {})
+    if limit.get("peak_nodes") is not None and limit["peak_nodes"] <= curves["Nodes"].max():
+        fig.add_vline(
+            x=limit["peak_nodes"],
+            line_dash="dash",
+            annotation_text=f"{pattern_name} peaks at {limit['peak_nodes']} nodes"
+        )
+    
+    fig.update_layout(
+        title=f"{metric} vs Node Count (Universal Scalability Law)",
+        xaxis=dict(title="Nodes"),
+        yaxis=dict(title=f"{metric} ({units.get(metric, '')})"),
+        legend=dict(orientation="h")
+    )
+    
+    return fig
+
+def create_usl_fit_chart(sweep, fit, load_key="concurrency", throughput_key="successful_throughput"):
+    """
+    Create a chart of measured throughput against the fitted USL curve
+    
+    Args:
+        sweep (list): Measurements the model was fitted to
+        fit (dict): Output of fit_usl
+        load_key (str): Key holding the load. Defaults to "concurrency".
+        throughput_key (str): Key holding the throughput. Defaults to "successful_throughput".
+        
+    Returns:
+        plotly.graph_objects.Figure: Scatter (measured) and line (fitted) chart
+    """
+    from utils.scalability_model import usl_throughput
+    
+    measured_loads = [point[load_key] for point in sweep]
+    max_load = max(measured_loads)
+    if fit["peak_load"] is not None:
+        max_load = max(max_load, fit["peak_load"] * 1.5)
+    loads = np.linspace(1, max_load, 200)
+    
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=measured_loads,
+        y=[point[throughput_key] for point in sweep],
+        name="Measured",
+        mode="markers",
+        marker=dict(size=10, color="#EF553B")
+    ))
+    fig.add_trace(go.Scatter(
+        x=loads,
+        y=usl_throughput(loads, fit["lambda"], fit["sigma"], fit["kappa"]),
+        name=f"USL fit (R² = {fit['r_squared']:.3f})",
+        mode="lines",
+        line=dict(color="#636EFA")
+    ))
+    if fit["peak_load"] is not None:
+        fig.add_vline(x=fit["peak_load"], line_dash="dash", annotation_text="Extrapolated peak")
+    
+    fig.update_layout(
+        title="Measured Throughput vs Fitted Scalability Model",
+        xaxis=dict(title="Concurrency"),
+        yaxis=dict(title="Throughput (req/sec)")
+    )
+    
+    return fig
+
+def create_capacity_curve_chart(capacity_results):
+    """
+    Create a chart of throughput and p99 latency against offered load from a capacity search
+    
+    Args:
+        capacity_results (dict): Output of run_capacity_search
+        
+    Returns:
+        plotly.graph_objects.Figure: Throughput and p99 latency lines with the
+            SLO and the knee of the curve marked
+    """
+    curve = capacity_results["curve"]
+    loads = [point["load"] for point in curve]
+    load_title = "Concurrency" if capacity_results["search"] == "concurrency" else "Offered rate (req/sec)"
+    
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=loads,
+        y=[point["successful_throughput"] for point in curve],
+        name="Throughput (req/sec)",
+        mode="lines+markers",
+        line=dict(color="#00CC96"),
+        marker=dict(size=9, color=["#00CC96" if point["meets_slo"] else "#EF553B" for point in curve])
+    ))
+    fig.add_trace(go.Scatter(
+        x=loads,
+        y=[point["p99_latency"] for point in curve],
+        name="p99 latency (ms)",
+        mode="lines+markers",
+        line=dict(color="#636EFA", dash="dot"),
+        yaxis="y2"
+    ))
+    fig.add_hline(y=capacity_results["slo_p99_ms"], line_dash="dash", line_color="#636EFA", yref="y2",
+                  annotation_text="p99 SLO")
+    if capacity_results["knee_load"] is not None:
+        fig.add_vline(x=capacity_results["knee_load"], line_dash="dash", annotation_text="Max sustainable")
+    
+    fig.update_layout(
+        title="Capacity: Throughput and p99 Latency vs Load",
+        xaxis=dict(title=load_title),
+        yaxis=dict(title="Throughput (req/sec)", rangemode="tozero"),
+        yaxis2=dict(title="p99 latency (ms)", overlaying="y", side="right", rangemode="tozero"),
+        legend=dict(orientation="h")
+    )
+    
+    return fig
+
+def create_phase_breakdown_chart(phases, pattern_name):
+    """
+    Create a bar chart of request phase durations under load
+    
+    Args:
+        phases (dict): Per-phase summaries from a latency or throughput test
+        pattern_name (str): Name of the architecture pattern
+        
+    Returns:
+        plotly.graph_objects.Figure: Grouped bar chart of p50/p90/p99 per phase
+    """
+    phase_labels = {
+        "dns": "DNS lookup",
+        "connect": "TCP connect",
+        "tls": "TLS handshake",
+        "pool_wait": "Pool wait",
+        "ttfb": "Time to first byte",
+        "transfer": "Transfer"
+    }
+    labels = [phase_labels.get(phase, phase) for phase in phases]
+    
+    fig = go.Figure()
+    for percentile, color in [("p50", "#636EFA"), ("p90", "#00CC96"), ("p99", "#EF553B")]:
+        fig.add_trace(go.Bar(
+            x=labels,
+            y=[summary[percentile] for summary in phases.values()],
+            name=percentile,
+            marker_color=color,
+            customdata=[summary["count"] for summary in phases.values()],
+            hovertemplate="%{x}<br>%{y:.3f} ms<br>%{customdata} samples"
+        ))
+    
+    fig.update_layout(
+        title=f"Where Latency Goes: {pattern_name}",
+        barmode="group",
+        xaxis=dict(title="Request phase"),
+        yaxis=dict(title="Duration (ms)", type="log"),
+        legend=dict(orientation="h")
+    )
+    
+    return fig
+
+def create_live_throughput_chart(intervals):
+    """
+    Create a chart of per-second throughput and latency from a running test
+    
+    Args:
+        intervals (list): Interval summaries yielded by stream_throughput_test
+        
+    Returns:
+        plotly.graph_objects.Figure: Bar (throughput) and line (latency) chart
+    """
+    seconds = [interval["second"] for interval in intervals]
+    
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=seconds,
+        y=[interval["throughput"] for interval in intervals],
+        name="Throughput (req/sec)",
+        marker_color="#636EFA",
+        opacity=0.6
+    ))
+    fig.add_trace(go.Bar(
+        x=seconds,
+        y=[interval["errors"] for interval in intervals],
+        name="Errors",
+        marker_color="#EF553B"
+    ))
+    for field, label in [("p50_latency", "p50 latency (ms)"), ("p99_latency", "p99 latency (ms)")]:
+        fig.add_trace(go.Scatter(
+            x=seconds,
+            y=[interval[field] for interval in intervals],
+            name=label,
+            mode="lines+markers",
+            yaxis="y2"
+        ))
+    
+    fig.update_layout(
+        title="Live Test Progress",
+        barmode="overlay",
+        xaxis=dict(title="Elapsed time (s)"),
+        yaxis=dict(title="Requests per second"),
+        yaxis2=dict(title="Latency (ms)", overlaying="y", side="right"),
+        legend=dict(orientation="h")
+    )
+    
+    return fig
+
+def create_resource_usage_chart(samples, pattern_name):
+    """
+    Create a chart of a target process's CPU and memory over a test
+    
+    Args:
+        samples (list): ProcessSampler samples
+        pattern_name (str): Name of the pattern under test
+        
+    Returns:
+        plotly.graph_objects.Figure: CPU utilization (%) and RSS (MB) lines
+    """
+    times = [sample["time"] for sample in samples[1:]]
+    
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=times,
+        y=[sample["cpu_percent"] for sample in samples[1:]],
+        name="CPU (%)",
+        mode="lines",
+        fill="tozeroy"
+    ))
+    fig.add_trace(go.Scatter(
+        x=times,
+        y=[sample["rss_mb"] for sample in samples[1:]],
+        name="RSS (MB)",
+        mode="lines",
+        yaxis="y2"
+    ))
+    
+    fig.update_layout(
+        title=f"{pattern_name} - Target Resource Usage",
+        xaxis=dict(title="Elapsed time (s)"),
+        yaxis=dict(title="CPU utilization (%)", rangemode="tozero"),
+        yaxis2=dict(title="Resident memory (MB)", overlaying="y", side="right", rangemode="tozero"),
+        legend=dict(orientation="h")
+    )
+    
+    return fig
+
+def create_adaptive_concurrency_chart(history, best_concurrency=None):
+    """
+    Create a chart of the concurrency an adaptive controller chose over time
+    
+    Args:
+        history (list): Per-window results of run_adaptive_concurrency_test
+        best_concurrency (int, optional): Concurrency with the best power, marked on the chart
+        
+    Returns:
+        plotly.graph_objects.Figure: Concurrency steps with throughput and mean latency lines
+    """
+    windows = [point["window"] for point in history]
+    
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=windows,
+        y=[point["concurrency"] for point in history],
+        name="Concurrency",
+        mode="lines+markers",
+        line=dict(shape="hv", color="#636EFA")
+    ))
+    fig.add_trace(go.Scatter(
+        x=windows,
+        y=[point["successful_throughput"] for point in history],
+        name="Throughput (req/sec)",
+        mode="lines",
+        line=dict(color="#00CC96"),
+        yaxis="y2"
+    ))
+    fig.add_trace(go.Scatter(
+        x=windows,
+        y=[point["avg_latency"] for point in history],
+        name="Mean latency (ms)",
+        mode="lines",
+        line=dict(color="#EF553B", dash="dot"),
+        yaxis="y3"
+    ))
+    if best_concurrency is not None:
+        fig.add_hline(y=best_concurrency, line_dash="dash", annotation_text="Best throughput per latency")
+    
+    fig.update_layout(
+        title="Adaptive Concurrency",
+        xaxis=dict(title="Window", domain=[0, 0.85]),
+        yaxis=dict(title="Concurrency", rangemode="tozero"),
+        yaxis2=dict(title="Throughput (req/sec)", overlaying="y", side="right", rangemode="tozero"),
+        yaxis3=dict(title="Latency (ms)", overlaying="y", side="right", position=0.95, anchor="free",
+                    rangemode="tozero"),
+        legend=dict(orientation="h")
+    )
+    
+    return fig
+
+def create_metric_history_chart(history, metric, pattern_name, unit=""):
+    """
+    Create a chart of a metric's recorded values across test runs
+    
+    Args:
+        history (pandas.DataFrame): get_rolling_median output
+        metric (str): Metric name
+        pattern_name (str): Name of the pattern
+        unit (str): Unit of the metric for the axis title
+        
+    Returns:
+        plotly.graph_objects.Figure: Per-run markers with the rolling median line
+    """
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=history["timestamp"],
+        y=history["value"],
+        name="Run",
+        mode="markers",
+        marker=dict(size=6, color="#636EFA", opacity=0.6)
+    ))
+    fig.add_trace(go.Scatter(
+        x=history["timestamp"],
+        y=history["rolling_median"],
+        name="Rolling median",
+        mode="lines",
+        line=dict(color="#EF553B")
+    ))
+    
+    fig.update_layout(
+        title=f"{pattern_name} - {metric} History",
+        xaxis=dict(title="Run time"),
+        yaxis=dict(title=f"{metric} ({unit})" if unit else metric),
+        legend=dict(orientation="h")
+    )
+    
+    return fig
+
 def create_latency_throughput_scatter(comparison_df):
     """
     Create a scatter plot of latency vs throughput for all patterns
@@ -272,61 +596,42 @@ def create_latency_throughput_scatter(comparison_df):
     
     return fig
 
-def create_heat_map(comparison_df):
+def create_heat_map(patterns, metrics=None, arch_data=None):
     """
     Create a heat map of all metrics for all patterns
     
     Args:
-        comparison_df (pandas.DataFrame): DataFrame with comparison data
+        patterns (list): List of pattern names to show
+        metrics (list, optional): List of metrics to show. Defaults to all.
+        arch_data (dict, optional): Architecture data. Defaults to None.
         
     Returns:
         plotly.graph_objects.Figure: Heat map figure
     """
-    # Melt the dataframe to get it in the right format for the heat map
-    metrics = [col for col in comparison_df.columns if col != "Pattern"]
-    df_melted = pd.melt(comparison_df, id_vars=["Pattern"], value_vars=metrics, var_name="Metric", value_name="Value")
-    
-    # Create a pivot table
-    df_pivot = df_melted.pivot(index="Pattern", columns="Metric", values="Value")
-    
-    # Handle any potential NaN values
-    df_pivot = df_pivot.fillna(0)
-    
-    # Normalize each column (metric) to 0-1
-    for col in df_pivot.columns:
-        min_val = df_pivot[col].min()
-        max_val = df_pivot[col].max()
-        
-        # Handle case when min and max are equal to avoid division by zero
-        if max_val == min_val:
-            df_pivot[col] = 0.5  # Set to middle value if all values are the same
-        else:
-            if col in ["Latency", "Resource_Utilization"]:
-                # For these metrics, lower is better
-                df_pivot[col] = (max_val - df_pivot[col]) / (max_val - min_val)
-            else:
-                # For all other metrics, higher is better
-                df_pivot[col] = (df_pivot[col] - min_val) / (max_val - min_val)
+    # Scores are 0-1 relative to the shown patterns, best is 1
+    matrix = get_metric_matrix(arch_data)
+    metrics = matrix.metrics if metrics is None else metrics
+    df_scores = pd.DataFrame(matrix.normalized(patterns, metrics), index=patterns, columns=metrics)
     
     # Create heat map
     fig = px.imshow(
-        df_pivot,
+        df_scores,
         labels=dict(x="Metric", y="Pattern", color="Normalized Score"),
-        x=df_pivot.columns,
-        y=df_pivot.index,
+        x=df_scores.columns,
+        y=df_scores.index,
         color_continuous_scale='Viridis',
         title="Architecture Pattern Performance Heat Map"
     )
     
     # Add text annotations
-    for i, pattern in enumerate(df_pivot.index):
-        for j, metric in enumerate(df_pivot.columns):
+    for i, pattern in enumerate(df_scores.index):
+        for j, metric in enumerate(df_scores.columns):
             fig.add_annotation(
                 x=j,
                 y=i,
-                text=f"{df_pivot.iloc[i, j]:.2f}",
+                text=f"{df_scores.iloc[i, j]:.2f}",
                 showarrow=False,
-                font=dict(color="white" if df_pivot.iloc[i, j] < 0.5 else "black")
+                font=dict(color="white" if df_scores.iloc[i, j] < 0.5 else "black")
             )
     
     return fig